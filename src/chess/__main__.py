@@ -38,7 +38,7 @@ while running:
                     # First click: try to select a piece
                     if piece and piece.color == game.current_position.whose_move:
                         selected_piece = piece
-                        valid_moves = game.current_position.legal_moves_.get(piece, set())
+                        valid_moves = game.current_position.legal_moves_for(piece)
                         valid_squares = {valid_move.end_square for valid_move in valid_moves}
                         if not valid_moves:
                             print(f"{repr(selected_piece)} cannot move")
@@ -48,7 +48,7 @@ while running:
                 else:
                     # Second click: try to make a move
                     if clicked_square in valid_squares:
-                        valid_moves = game.current_position.legal_moves_.get(selected_piece, set())
+                        valid_moves = game.current_position.legal_moves_for(selected_piece)
                         corresponding_moves = {valid_move for valid_move in valid_moves if valid_move.end_square == clicked_square}
                         if len(corresponding_moves) == 1:
                             apply_move = game.apply_move(next(iter(corresponding_moves)))
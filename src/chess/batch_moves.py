@@ -0,0 +1,235 @@
+from typing import Iterable
+
+import numpy as np
+
+from .boards import EMPTY, position_arrays
+from .models import tables
+from .models.directions import Direction
+from .models.encoded_move import CASTLING, EN_PASSANT, MoveList, NORMAL, PROMOTION, PROMOTION_PIECES
+from .models.position import Position
+
+# Legal moves of many positions at once, on (N, 64) boards of the boards module. Every position is turned into
+# uint64 bitboards (bit i set for square index i) and each step works on whole arrays : piece attacks for every
+# piece of every position, then one king safety test per candidate move on the board it leaves.
+# Moves come out as the 16 bits codes of the encoded_move module.
+_ZERO = np.uint64(0)
+_ONE = np.uint64(1)
+BITS = np.left_shift(_ONE, np.arange(64, dtype=np.uint64))
+
+# Directions as (column step, row step) : the first four ones go towards higher square indices
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (-1, 1), (0, -1), (-1, 0), (-1, -1), (1, -1))
+STRAIGHT_DIRECTIONS = (0, 1, 4, 5)
+BACK_RANKS = np.uint64(0xFF000000000000FF)
+
+
+def _masks(targets) -> np.ndarray:
+    # One bitboard per square from the square indices of the tables module
+    masks = np.zeros(len(targets), dtype=np.uint64)
+    for index, indices in enumerate(targets):
+        masks[index] = np.bitwise_or.reduce(BITS[list(indices)], initial=_ZERO)
+    return masks
+
+
+KNIGHT_ATTACKS = _masks(tables.KNIGHT_TARGETS)
+KING_ATTACKS = _masks(tables.KING_TARGETS)
+# PAWN_ATTACKS[color index, index] : squares a pawn of that color standing on index attacks
+PAWN_ATTACKS = np.stack([_masks(tables.PAWN_ATTACKS[color]) for color in ("white", "black")])
+# RAYS[direction, index] : squares from index (excluded) to the edge of the board
+RAYS = np.stack([_masks([rays[Direction(*direction)] for rays in tables.RAYS]) for direction in DIRECTIONS])
+
+# Index of a single bit : multiplying by a de Bruijn sequence puts a distinct pattern in the 6 highest bits
+_DE_BRUIJN = 0x03F79D71B4CB0A89
+_DE_BRUIJN_INDICES = np.zeros(64, dtype=np.int64)
+for _index in range(64):
+    _DE_BRUIJN_INDICES[((1 << _index) * _DE_BRUIJN & 0xFFFFFFFFFFFFFFFF) >> 58] = _index
+
+# Castling per color and wing : (castling rights column, king start, king end, squares to be empty,
+# squares the king must not cross while attacked), the rights being in FEN order (K, Q, k, q)
+_CASTLINGS = tuple(
+    (color * 2 + wing, 4 + color * 56, king_end + color * 56, rook + color * 56,
+     np.uint64(sum(1 << (index + color * 56) for index in empty)), tuple(index + color * 56 for index in path))
+    for color in (0, 1)
+    for wing, (king_end, rook, empty, path) in enumerate(((6, 7, (5, 6), (5, 6)), (2, 0, (1, 2, 3), (3, 2))))
+)
+
+
+def _lowest_bit(bitboards: np.ndarray) -> np.ndarray:
+    return bitboards & (~bitboards + _ONE)
+
+
+def _highest_bit(bitboards: np.ndarray) -> np.ndarray:
+    for shift in (1, 2, 4, 8, 16, 32):
+        bitboards = bitboards | (bitboards >> np.uint64(shift))
+    return bitboards ^ (bitboards >> _ONE)
+
+
+def _bit_index(bits: np.ndarray) -> np.ndarray:
+    # Square indices of single bit bitboards (meaningless for empty ones)
+    return _DE_BRUIJN_INDICES[(bits * np.uint64(_DE_BRUIJN)) >> np.uint64(58)]
+
+
+def _nearest_blocker(direction: int, squares: np.ndarray, occupied: np.ndarray) -> np.ndarray:
+    # Bit of the first occupied square seen from each square in the direction, 0 when there is none
+    blockers = RAYS[direction, squares] & occupied
+    return _lowest_bit(blockers) if direction < 4 else _highest_bit(blockers)
+
+
+def _slider_attacks(direction: int, squares: np.ndarray, occupied: np.ndarray) -> np.ndarray:
+    ray = RAYS[direction, squares]
+    blocker = _nearest_blocker(direction, squares, occupied)
+    return np.where(blocker != 0, ray ^ RAYS[direction, _bit_index(blocker)], ray)
+
+
+def _attacked(squares: np.ndarray, colors: np.ndarray, occupied: np.ndarray, attackers: np.ndarray) -> np.ndarray:
+    # Whether each square, defended by colors, is attacked by the (M, 6) bitboards of attackers by piece type
+    attacked = ((KNIGHT_ATTACKS[squares] & attackers[:, 1]) | (KING_ATTACKS[squares] & attackers[:, 5])
+                | (PAWN_ATTACKS[colors, squares] & attackers[:, 0]))
+    straight = attackers[:, 3] | attackers[:, 4]
+    diagonal = attackers[:, 2] | attackers[:, 4]
+    for direction in range(len(DIRECTIONS)):
+        sliders = straight if direction in STRAIGHT_DIRECTIONS else diagonal
+        attacked |= _nearest_blocker(direction, squares, occupied) & sliders
+    return attacked != 0
+
+
+def _expand(targets: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # (row, target square index) for every set bit of the target bitboards
+    rows = np.flatnonzero(targets)
+    targets = targets[rows]
+    all_rows, all_ends = [], []
+    while len(rows):
+        bit = _lowest_bit(targets)
+        all_rows.append(rows)
+        all_ends.append(_bit_index(bit))
+        targets = targets ^ bit
+        remaining = targets != 0
+        rows, targets = rows[remaining], targets[remaining]
+    if not all_rows:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(all_rows), np.concatenate(all_ends)
+
+
+class BatchMoves:
+    # Legal moves of N positions : the codes of position i are codes[offsets[i]:offsets[i + 1]], sorted.
+    # valid tells the positions Position would accept and in_check the ones whose side to move is in check.
+    __slots__ = ("counts", "offsets", "codes", "valid", "in_check")
+
+    def __init__(self, counts: np.ndarray, offsets: np.ndarray, codes: np.ndarray, valid: np.ndarray, in_check: np.ndarray):
+        self.counts = counts
+        self.offsets = offsets
+        self.codes = codes
+        self.valid = valid
+        self.in_check = in_check
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def moves(self, index: int) -> np.ndarray:
+        return self.codes[self.offsets[index]:self.offsets[index + 1]]
+
+    def move_list(self, index: int) -> MoveList:
+        return MoveList(self.moves(index).tolist())
+
+
+def legal_moves_batch(boards: np.ndarray, whose_move: np.ndarray, castling: np.ndarray = None,
+                      en_passant: np.ndarray = None) -> BatchMoves:
+    # Legal moves of (N, 64) boards, with (N,) side to move (0 for white, 1 for black), (N, 4) castling rights
+    # in FEN order and (N,) en passant square indices (-1 for none), as returned by boards.position_arrays.
+    # Positions Position.is_valid_position refuses get no move, as in Position.compute_legal_moves.
+    boards = np.asarray(boards, dtype=np.uint8)
+    count = len(boards)
+    whose_move = np.asarray(whose_move, dtype=np.int64)
+    castling = np.zeros((count, 4), dtype=bool) if castling is None else np.asarray(castling, dtype=bool)
+    en_passant = np.full(count, -1, dtype=np.int64) if en_passant is None else np.asarray(en_passant, dtype=np.int64)
+
+    by_code = np.stack([np.bitwise_or.reduce(np.where(boards == code, BITS, _ZERO), axis=1) for code in range(EMPTY)],
+                       axis=1).reshape(count, EMPTY)
+    rows = np.arange(count)
+    own = by_code[rows[:, None], whose_move[:, None] * 6 + np.arange(6)]
+    enemy = by_code[rows[:, None], (1 - whose_move)[:, None] * 6 + np.arange(6)]
+    own_occupied = np.bitwise_or.reduce(own, axis=1)
+    enemy_occupied = np.bitwise_or.reduce(enemy, axis=1)
+    occupied = own_occupied | enemy_occupied
+    king_square = _bit_index(own[:, 5])
+
+    valid = ((boards == 5).sum(axis=1) == 1) & ((boards == 11).sum(axis=1) == 1)
+    valid &= ((own[:, 0] | enemy[:, 0]) & BACK_RANKS) == 0
+    valid &= ~_attacked(_bit_index(enemy[:, 5]), 1 - whose_move, occupied, own)
+    in_check = _attacked(king_square, whose_move, occupied, enemy)
+
+    # Pseudo legal targets of every piece of the side to move
+    owners, starts = np.nonzero(valid[:, None] & (boards < EMPTY) & ((boards >= 6) == (whose_move[:, None] == 1)))
+    piece_types = boards[owners, starts] % 6
+    colors = whose_move[owners]
+    targets = np.zeros(len(starts), dtype=np.uint64)
+    targets[piece_types == 1] = KNIGHT_ATTACKS[starts[piece_types == 1]]
+    targets[piece_types == 5] = KING_ATTACKS[starts[piece_types == 5]]
+    for direction in range(len(DIRECTIONS)):
+        movers = np.flatnonzero((piece_types == 4) | (piece_types == (3 if direction in STRAIGHT_DIRECTIONS else 2)))
+        targets[movers] |= _slider_attacks(direction, starts[movers], occupied[owners[movers]])
+    targets &= ~own_occupied[owners]
+
+    pawns = np.flatnonzero(piece_types == 0)
+    forward = np.where(colors[pawns] == 0, 8, -8)
+    pawn_occupied = occupied[owners[pawns]]
+    single = BITS[starts[pawns] + forward] & ~pawn_occupied
+    on_start_row = (starts[pawns] >> 3) == np.where(colors[pawns] == 0, 1, 6)
+    double_end = np.where(on_start_row, starts[pawns] + 2 * forward, starts[pawns])
+    double = np.where(on_start_row & (single != 0), BITS[double_end] & ~pawn_occupied, _ZERO)
+    targets[pawns] = single | double | (PAWN_ATTACKS[colors[pawns], starts[pawns]] & enemy_occupied[owners[pawns]])
+
+    moves, ends = _expand(targets)
+    flags = np.full(len(moves), NORMAL, dtype=np.int64)
+
+    # En passant : the pawn to capture stands behind the target square
+    pawn_en_passant = en_passant[owners[pawns]]
+    captured_square = np.where(pawn_en_passant >= 0, pawn_en_passant - forward, 0)
+    takers = (pawn_en_passant >= 0) & (PAWN_ATTACKS[colors[pawns], starts[pawns]] & BITS[np.maximum(pawn_en_passant, 0)] != 0)
+    takers &= enemy[owners[pawns], 0] & BITS[captured_square] != 0
+    moves = np.concatenate([moves, pawns[takers]])
+    ends = np.concatenate([ends, pawn_en_passant[takers]])
+    flags = np.concatenate([flags, np.full(takers.sum(), EN_PASSANT, dtype=np.int64)])
+
+    # King safety on the board left by each move
+    positions = owners[moves]
+    start_bits = BITS[starts[moves]]
+    end_bits = BITS[ends]
+    is_en_passant = flags == EN_PASSANT
+    captured = np.where(is_en_passant, BITS[np.where(is_en_passant, ends - np.where(colors[moves] == 0, 8, -8), 0)],
+                        end_bits & enemy_occupied[positions])
+    occupied_after = (occupied[positions] & ~start_bits & ~captured) | end_bits
+    king_after = np.where(piece_types[moves] == 5, ends, king_square[positions])
+    legal = ~_attacked(king_after, colors[moves], occupied_after, enemy[positions] & ~captured[:, None])
+    moves, ends, flags, positions = moves[legal], ends[legal], flags[legal], positions[legal]
+    move_starts = starts[moves]
+
+    # A pawn reaching the last row gives one move per promotion piece
+    promoting = (piece_types[moves] == 0) & ((ends >> 3 == 0) | (ends >> 3 == 7))
+    promotions = np.repeat(np.flatnonzero(promoting), len(PROMOTION_PIECES))
+    kept = ~promoting
+    codes = [move_starts[kept] | ends[kept] << 6 | flags[kept] << 14,
+             move_starts[promotions] | ends[promotions] << 6
+             | np.tile(np.arange(len(PROMOTION_PIECES)), promoting.sum()) << 12 | PROMOTION << 14]
+    code_positions = [positions[kept], positions[promotions]]
+
+    # Castling, the king standing on its starting square next to an own rook in the corner
+    for column, king_start, king_end, rook, empty, path in _CASTLINGS:
+        color = column // 2
+        castles = valid & castling[:, column] & (whose_move == color) & ~in_check & (king_square == king_start)
+        castles &= ((own[:, 3] & BITS[rook]) != 0) & ((occupied & empty) == 0)
+        for index in path:
+            castles &= ~_attacked(np.full(count, index), whose_move, occupied, enemy)
+        code_positions.append(np.flatnonzero(castles))
+        codes.append(np.full(castles.sum(), king_start | king_end << 6 | CASTLING << 14, dtype=np.int64))
+
+    code_positions = np.concatenate(code_positions)
+    codes = np.concatenate(codes)
+    order = np.lexsort((codes, code_positions))
+    counts = np.bincount(code_positions, minlength=count)
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    return BatchMoves(counts, offsets, codes[order].astype(np.uint16), valid, valid & in_check)
+
+
+def legal_moves_positions(items: Iterable[Position | str]) -> BatchMoves:
+    # Positions or FEN strings, encoded then handled in a single batch
+    return legal_moves_batch(*position_arrays(items))
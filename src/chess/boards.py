@@ -0,0 +1,104 @@
+from typing import Iterable
+
+import numpy as np
+
+from .models.exceptions import InvalidFenError
+from .models.position import Position
+from .models import utils
+
+# Compact board encoding shared by the NumPy modules : one uint8 per square index (a1 = 0, h8 = 63),
+# holding color index * 6 + piece type index, or EMPTY
+COLORS = ("white", "black")
+PIECE_TYPES = ("Pawn", "Knight", "Bishop", "Rook", "Queen", "King")
+PIECE_CODES = {(color, piece_type): color_index * 6 + type_index
+               for color_index, color in enumerate(COLORS) for type_index, piece_type in enumerate(PIECE_TYPES)}
+EMPTY = 12
+_FEN_CODES = {letter.upper() if color == "white" else letter: PIECE_CODES[(color, piece_type)]
+              for letter, piece_type in utils.FEN_PIECE_TYPES.items() for color in COLORS}
+
+
+def board_array(position: Position, out: np.ndarray = None) -> np.ndarray:
+    board = np.full(64, EMPTY, dtype=np.uint8) if out is None else out
+    if out is not None:
+        board.fill(EMPTY)
+    for color, pieces_by_type in position.pieces.items():
+        for piece_type, pieces in pieces_by_type.items():
+            code = PIECE_CODES[(color, piece_type)]
+            for piece in pieces:
+                board[piece.square.index] = code
+    return board
+
+
+def board_arrays(positions: Iterable[Position]) -> tuple[np.ndarray, np.ndarray]:
+    # (N, 64) boards and (N,) side to move, 0 for white and 1 for black
+    positions = list(positions)
+    boards = np.empty((len(positions), 64), dtype=np.uint8)
+    whose_move = np.empty(len(positions), dtype=np.uint8)
+    for row, position in enumerate(positions):
+        board_array(position, out=boards[row])
+        whose_move[row] = position.whose_move == "black"
+    return boards, whose_move
+
+
+def fen_board_array(fen: str, out: np.ndarray = None) -> np.ndarray:
+    # Board encoding read straight from the placement field of a FEN, without building a Position
+    board = np.full(64, EMPTY, dtype=np.uint8) if out is None else out
+    if out is not None:
+        board.fill(EMPTY)
+    ranks = fen.split(" ", 1)[0].split("/")
+    if len(ranks) != 8:
+        raise InvalidFenError(fen, "expected 8 ranks")
+    for rank_index, rank in enumerate(ranks):
+        index = (7 - rank_index) * 8
+        end = index + 8
+        for char in rank:
+            if char.isdigit():
+                index += int(char)
+            elif char in _FEN_CODES and index < end:
+                board[index] = _FEN_CODES[char]
+                index += 1
+            else:
+                raise InvalidFenError(fen, f"unexpected '{char}' in rank {8 - rank_index}")
+        if index != end:
+            raise InvalidFenError(fen, f"rank {8 - rank_index} does not describe 8 squares")
+    return board
+
+
+def position_fields(item: Position | str, board: np.ndarray) -> tuple[int, tuple[bool, ...], int]:
+    # Fills the board row and returns (side to move, castling rights in FEN order, en passant square index or -1)
+    if isinstance(item, Position):
+        board_array(item, out=board)
+        castling = tuple(bool(item.castling_rights.get(right)) for right in utils.FEN_CASTLING_RIGHTS)
+        en_passant = -1
+        if item.en_passant_target:
+            pawn = item.en_passant_target
+            en_passant = pawn.square.index + (-8 if pawn.color == "white" else 8)
+        return item.whose_move == "black", castling, en_passant
+
+    fen_board_array(item, out=board)
+    fields = item.split()
+    if len(fields) < 4 or fields[1] not in ("w", "b"):
+        raise InvalidFenError(item, "expected placement, side to move, castling and en passant fields")
+    castling = tuple(letter in fields[2] for letter in utils.FEN_CASTLING_RIGHTS.values())
+    if fields[3] == "-":
+        en_passant = -1
+    elif utils.is_valid_square_string(fields[3]):
+        column, row = utils.label_to_indices(fields[3])
+        en_passant = row * 8 + column
+    else:
+        raise InvalidFenError(item, f"invalid en passant square '{fields[3]}'")
+    return fields[1] == "b", castling, en_passant
+
+
+def position_arrays(items: Iterable[Position | str]) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    # Positions or FEN strings to (N, 64) boards, (N,) side to move, (N, 4) castling rights (K, Q, k, q)
+    # and (N,) en passant square indices (-1 when there is none)
+    items = list(items)
+    count = len(items)
+    boards = np.empty((count, 64), dtype=np.uint8)
+    whose_move = np.empty(count, dtype=np.uint8)
+    castling = np.empty((count, 4), dtype=np.uint8)
+    en_passant = np.empty(count, dtype=np.int64)
+    for row, item in enumerate(items):
+        whose_move[row], castling[row], en_passant[row] = position_fields(item, boards[row])
+    return boards, whose_move, castling, en_passant
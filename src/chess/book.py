@@ -0,0 +1,150 @@
+import argparse
+import mmap
+import os
+import random
+import struct
+from typing import Iterable, Optional
+
+from .models.encoded_move import EncodedMove, PROMOTION_PIECES, encode
+from .models.move import Move
+from .models.position import Position
+from .models import polyglot, utils
+
+# Polyglot opening books : 16 bytes big endian entries (key, move, weight, learn) sorted by position key.
+# Moves hold the end square (bits 0-5), the start square (bits 6-11) and the promotion piece (bits 12-14,
+# 1 for a knight up to 4 for a queen), castling being written as the king taking its own rook.
+ENTRY = struct.Struct(">QHHI")
+_KEY = struct.Struct(">Q")
+_CASTLING_ENDS = {(4, 7): 6, (4, 0): 2, (60, 63): 62, (60, 56): 58}
+_CASTLING_ROOKS = {(start, end): rook for (start, rook), end in _CASTLING_ENDS.items()}
+
+
+class BookEntry:
+    __slots__ = ("key", "raw_move", "weight", "learn")
+
+    def __init__(self, key: int, raw_move: int, weight: int, learn: int = 0):
+        self.key = key
+        self.raw_move = raw_move
+        self.weight = weight
+        self.learn = learn
+
+    def encoded_move(self, position: Position) -> EncodedMove:
+        start, end, promotion = self.raw_move >> 6 & 0x3F, self.raw_move & 0x3F, self.raw_move >> 12 & 7
+        if promotion:
+            return EncodedMove(encode(start, end, PROMOTION_PIECES[promotion - 1]))
+        piece = position.squares[start].piece
+        if piece and piece.type == "King" and (start, end) in _CASTLING_ENDS:
+            end = _CASTLING_ENDS[(start, end)]
+        return EncodedMove(encode(start, end))
+
+    def to_move(self, position: Position) -> Move:
+        # The legal move of the position, ValueError if the entry does not match one
+        return self.encoded_move(position).to_move(position)
+
+    def __repr__(self):
+        return f"BookEntry(key={self.key:#018x}, raw_move={self.raw_move:#06x}, weight={self.weight})"
+
+
+def polyglot_move(move: Move) -> int:
+    start, end = move.start_square.index, move.end_square.index
+    if move.is_castling:
+        end = _CASTLING_ROOKS[(start, end)]
+    promotion = PROMOTION_PIECES.index(move.promoting_piece_str) + 1 if move.is_promotion else 0
+    return end | start << 6 | promotion << 12
+
+
+def write_book(path: str | os.PathLike, entries: Iterable[BookEntry]):
+    # Sorted by key, then by decreasing weight as books usually are
+    with open(path, "wb") as file:
+        for entry in sorted(entries, key=lambda entry: (entry.key, -entry.weight)):
+            file.write(ENTRY.pack(entry.key, entry.raw_move, entry.weight, entry.learn))
+
+
+class OpeningBook:
+    # Read through a memory map : nothing is loaded at opening, each lookup is a binary search touching a few
+    # pages, and the pages are shared by every process mapping the same file
+    def __init__(self, path: str | os.PathLike):
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        if size % ENTRY.size:
+            self._file.close()
+            raise ValueError(f"{path} is not a Polyglot book, its size is not a multiple of {ENTRY.size} bytes")
+        self._count = size // ENTRY.size
+        # Empty files can not be mapped
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __enter__(self) -> "OpeningBook":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def _lower_bound(self, key: int) -> int:
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if _KEY.unpack_from(self._map, middle * ENTRY.size)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def entries(self, position: Position | int) -> list[BookEntry]:
+        # Every entry of the position (or Polyglot key), in file order
+        key = position if isinstance(position, int) else polyglot.compute_key(position)
+        entries = []
+        for index in range(self._lower_bound(key), self._count):
+            entry = BookEntry(*ENTRY.unpack_from(self._map, index * ENTRY.size))
+            if entry.key != key:
+                break
+            entries.append(entry)
+        return entries
+
+    def moves(self, position: Position) -> list[tuple[Move, int]]:
+        # Legal book moves with their weights, entries matching no legal move being skipped
+        moves = []
+        for entry in self.entries(position):
+            try:
+                moves.append((entry.to_move(position), entry.weight))
+            except ValueError:
+                continue
+        return moves
+
+    def choose(self, position: Position, generator: random.Random = None) -> Optional[Move]:
+        # Random book move, each one being picked in proportion to its weight, None when out of book
+        moves = [(move, weight) for move, weight in self.moves(position) if weight > 0]
+        if not moves:
+            return None
+        generator = generator or random
+        return generator.choices([move for move, _ in moves], weights=[weight for _, weight in moves])[0]
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m chess.book", description="Lists the moves of a Polyglot opening book")
+    parser.add_argument("book", help="path of the .bin book")
+    parser.add_argument("fen", nargs="?", default=utils.STARTING_FEN, help="position to look up (default: starting position)")
+    args = parser.parse_args(argv)
+
+    position = Position.from_fen(args.fen)
+    with OpeningBook(args.book) as book:
+        moves = book.moves(position)
+        total = sum(weight for _, weight in moves)
+        for move, weight in moves:
+            share = weight / total if total else 0.0
+            print(f"{EncodedMove.from_move(move)}  weight {weight:>6}  {share:6.1%}")
+        if not moves:
+            print("Position not in book")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
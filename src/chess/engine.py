@@ -0,0 +1,451 @@
+import argparse
+import multiprocessing
+import queue
+import time
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Optional
+
+from .book import OpeningBook
+from .psqt import PIECE_SQUARE_TABLES, PIECE_VALUES
+from .tablebase import ProbeResult, Tablebase
+from .models.encoded_move import EncodedMove, encode_move
+from .models.move import Move
+from .models.position import Position
+from .models import utils
+
+INFINITY = 1_000_000
+MATE_SCORE = 100_000
+# Scores beyond this bound are mates, their distance to the root is adjusted when going through the table
+MATE_BOUND = MATE_SCORE - 1_000
+MAX_PLY = 64
+
+# Transposition table entry bounds
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+
+
+def evaluate(position: Position) -> int:
+    # Material and piece square tables, in centipawns from the point of view of the side to move
+    score = 0
+    for color, pieces_by_type in position.pieces.items():
+        mirror = 56 if color == "white" else 0
+        color_score = 0
+        for piece_type, pieces in pieces_by_type.items():
+            table = PIECE_SQUARE_TABLES[piece_type]
+            value = PIECE_VALUES[piece_type]
+            for piece in pieces:
+                color_score += value + table[piece.square.index ^ mirror]
+        score += color_score if color == position.whose_move else -color_score
+    return score
+
+
+class TranspositionTable:
+    # Fixed number of entries, each made of two 64 bits words : the zobrist key and the packed entry
+    # (score, depth, bound and best move code). The words live in a buffer which can be supplied by the caller,
+    # such as shared memory between search processes. The key word holds key ^ entry : an entry torn by
+    # concurrent writers no longer matches its key and is ignored.
+    def __init__(self, size: int = 1 << 18, buffer=None):
+        self.size = size
+        if buffer is None:
+            buffer = bytearray(16 * size)
+        self._bytes = memoryview(buffer).cast("B")[:16 * size]
+        words = self._bytes.cast("Q")
+        self.keys = words[:size]
+        self.entries = words[size:2 * size]
+
+    @staticmethod
+    def buffer_size(size: int) -> int:
+        return 16 * size
+
+    def probe(self, key: int) -> Optional[tuple[int, int, int, int]]:
+        # (depth, score, bound, move code) stored for the key, None if the slot holds another position
+        slot = key % self.size
+        entry = self.entries[slot]
+        if self.keys[slot] ^ entry != key:
+            return None
+        return entry >> 32 & 0xFF, (entry & 0xFFFFFFFF) - (1 << 31), entry >> 40 & 3, entry >> 42 & 0xFFFF
+
+    def store(self, key: int, depth: int, score: int, bound: int, move_code: int):
+        # Depth preferred replacement, a different position always takes the slot
+        slot = key % self.size
+        entry = self.entries[slot]
+        if self.keys[slot] ^ entry == key and entry >> 32 & 0xFF > depth:
+            return
+        entry = (score + (1 << 31)) | depth << 32 | bound << 40 | move_code << 42
+        self.keys[slot] = key ^ entry
+        self.entries[slot] = entry
+
+    def clear(self):
+        self._bytes[:] = bytes(len(self._bytes))
+
+    def release(self):
+        # Views on a shared memory block must be released before the block is closed
+        self.keys.release()
+        self.entries.release()
+        self._bytes.release()
+
+
+class SearchResult:
+    def __init__(self, move: Optional[Move], score: int, depth: int, nodes: int, elapsed: float, principal_variation: list[str]):
+        self.move = move
+        self.score = score
+        self.depth = depth
+        self.nodes = nodes
+        self.elapsed = elapsed
+        self.principal_variation = principal_variation
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.elapsed if self.elapsed > 0 else float("inf")
+
+    def __str__(self):
+        if abs(self.score) > MATE_BOUND:
+            plies = MATE_SCORE - abs(self.score)
+            score = f"mate {(plies + 1) // 2 if self.score > 0 else -((plies + 1) // 2)}"
+        else:
+            score = f"cp {self.score}"
+        return (f"depth {self.depth} score {score} nodes {self.nodes} nps {self.nodes_per_second:,.0f} "
+                f"time {self.elapsed:.3f}s pv {' '.join(self.principal_variation)}")
+
+
+class _SearchTimeout(Exception):
+    pass
+
+
+class Engine:
+    # Negamax alpha-beta with iterative deepening, transposition table, killer and history move ordering
+    # and a quiescence search over captures. Positions are searched on a private copy with push/pop.
+    # Positions below the root found in the tablebase get their exact score, the fifty-move rule aside.
+    def __init__(self, table_size: int = 1 << 18, evaluation: Callable[[Position], int] = evaluate,
+                 table: TranspositionTable = None, tablebase: Tablebase = None):
+        self.table = table or TranspositionTable(table_size)
+        self.evaluate = evaluation
+        self.tablebase = tablebase
+        self.killers: list[list[int]] = [[0, 0] for _ in range(MAX_PLY + 1)]
+        self.history: list[int] = [0] * (1 << 16)
+        self.nodes = 0
+        self._deadline: Optional[float] = None
+        # Set by another process to interrupt the search, as with the time limit
+        self.stop_event = None
+        self._path: list[int] = []
+
+    def search(self, position: Position, max_depth: int = 4, time_limit: Optional[float] = None,
+               info: Callable[[SearchResult], None] = None, start_depth: int = 1,
+               history: Optional[list[int]] = None) -> SearchResult:
+        # Deepens one ply at a time until max_depth or the time limit, the last completed depth gives the result.
+        # history holds the keys of the positions played before this one, by default the ones pushed on it :
+        # the search avoids them as it avoids repeating the positions of its own tree.
+        if history is None:
+            history = position_history(position)
+        start = time.perf_counter()
+        self._deadline = start + time_limit if time_limit else None
+        self.nodes = 0
+        self.killers = [[0, 0] for _ in range(MAX_PLY + 1)]
+        self.history = [0] * (1 << 16)
+        result = SearchResult(None, 0, 0, 0, 0.0, [])
+        for depth in range(start_depth, max_depth + 1):
+            # The working copy is dropped when the search is interrupted in the middle of the tree
+            working_position = Position.from_fen(position.to_fen())
+            self._path = list(history)
+            try:
+                score = self._negamax(working_position, depth, -INFINITY, INFINITY, 0)
+            except _SearchTimeout:
+                break
+            principal_variation = self._principal_variation(working_position, depth)
+            move = EncodedMove(principal_variation[0]).to_move(position) if principal_variation else None
+            result = SearchResult(move, score, depth, self.nodes, time.perf_counter() - start,
+                                  [str(EncodedMove(code)) for code in principal_variation])
+            if info:
+                info(result)
+            if move is None or abs(score) > MATE_BOUND:
+                break
+        result.nodes = self.nodes
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    def _count_node(self):
+        self.nodes += 1
+        if not self.nodes & 1023 and ((self._deadline and time.perf_counter() > self._deadline)
+                                      or (self.stop_event and self.stop_event.is_set())):
+            raise _SearchTimeout()
+
+    def _is_draw(self, position: Position) -> bool:
+        return (position.halfmove_clock >= 100 or position.zobrist_key in self._path
+                or position.has_insufficient_material())
+
+    def _negamax(self, position: Position, depth: int, alpha: int, beta: int, ply: int) -> int:
+        self._count_node()
+        if ply and self._is_draw(position):
+            return 0
+        if ply and self.tablebase:
+            probe = self.tablebase.probe(position)
+            if probe:
+                return _tablebase_score(probe, ply)
+        key = position.zobrist_key
+        original_alpha = alpha
+        tt_move = 0
+        entry = self.table.probe(key)
+        if entry:
+            entry_depth, entry_score, bound, tt_move = entry
+            if ply and entry_depth >= depth:
+                score = _score_from_table(entry_score, ply)
+                if (bound == EXACT or (bound == LOWER_BOUND and score >= beta)
+                        or (bound == UPPER_BOUND and score <= alpha)):
+                    return score
+        if depth <= 0 or ply >= MAX_PLY:
+            return self._quiescence(position, alpha, beta, ply)
+
+        moves = self._ordered_moves(position, tt_move, ply)
+        if not moves:
+            return -MATE_SCORE + ply if self._in_check(position) else 0
+
+        best_score, best_code = -INFINITY, 0
+        self._path.append(key)
+        for move, code in moves:
+            quiet = not move.is_capture() and not move.is_promotion
+            position.push(move)
+            score = -self._negamax(position, depth - 1, -beta, -alpha, ply + 1)
+            position.pop()
+            if score > best_score:
+                best_score, best_code = score, code
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                if quiet:
+                    killers = self.killers[ply]
+                    if killers[0] != code:
+                        killers[0], killers[1] = code, killers[0]
+                    self.history[code] += depth * depth
+                break
+        self._path.pop()
+
+        bound = UPPER_BOUND if best_score <= original_alpha else LOWER_BOUND if best_score >= beta else EXACT
+        self.table.store(key, depth, _score_to_table(best_score, ply), bound, best_code)
+        return best_score
+
+    def _quiescence(self, position: Position, alpha: int, beta: int, ply: int) -> int:
+        # Only captures and promotions are searched, unless the side to move is in check
+        self._count_node()
+        in_check = self._in_check(position)
+        if not in_check:
+            stand_pat = self.evaluate(position)
+            if stand_pat >= beta or ply >= MAX_PLY:
+                return stand_pat
+            alpha = max(alpha, stand_pat)
+        moves = self._ordered_moves(position, 0, ply, tactical_only=not in_check)
+        if in_check and not moves:
+            return -MATE_SCORE + ply
+        for move, _ in moves:
+            position.push(move)
+            score = -self._quiescence(position, -beta, -alpha, ply + 1)
+            position.pop()
+            if score >= beta:
+                return score
+            alpha = max(alpha, score)
+        return alpha
+
+    @staticmethod
+    def _in_check(position: Position) -> bool:
+        return position.king_in_check(next(iter(position.pieces[position.whose_move]["King"])))
+
+    def _ordered_moves(self, position: Position, tt_move: int, ply: int, tactical_only=False) -> list[tuple[Move, int]]:
+        # Table move, then captures by most valuable victim / least valuable attacker, promotions, killers and history
+        killers = self.killers[min(ply, MAX_PLY)]
+        scored_moves = []
+        for moves in position.compute_legal_moves().values():
+            for move in moves:
+                victim = "Pawn" if move.is_en_passant else move.end_square.piece.type if move.end_square.piece else None
+                if tactical_only and not victim and not move.is_promotion:
+                    continue
+                code = encode_move(move)
+                if code == tt_move:
+                    order = 1 << 30
+                elif victim:
+                    order = (1 << 28) + 10 * PIECE_VALUES[victim] - PIECE_VALUES[move.piece.type] // 100
+                elif move.is_promotion:
+                    order = (1 << 27) + PIECE_VALUES[move.promoting_piece_str]
+                elif code in killers:
+                    order = 1 << 26
+                else:
+                    order = self.history[code]
+                scored_moves.append((order, code, move))
+        scored_moves.sort(key=lambda scored_move: (scored_move[0], scored_move[1]), reverse=True)
+        return [(move, code) for _, code, move in scored_moves]
+
+    def _principal_variation(self, position: Position, depth: int) -> list[int]:
+        # Best moves of the table from the root, as long as they are legal
+        codes = []
+        for _ in range(depth):
+            entry = self.table.probe(position.zobrist_key)
+            if not entry or not entry[3]:
+                break
+            try:
+                position.push(EncodedMove(entry[3]))
+            except ValueError:
+                break
+            codes.append(entry[3])
+        for _ in codes:
+            position.pop()
+        return codes
+
+
+def position_history(position: Position) -> list[int]:
+    # Zobrist keys of the positions pushed on position since the last capture or pawn move, the older ones
+    # can not come back
+    records = position.undo_stack[max(0, len(position.undo_stack) - position.halfmove_clock):]
+    return [record.zobrist_key for record in records]
+
+
+def _helper_search(table_name: str, table_size: int, fen: str, max_depth: int, time_limit: Optional[float],
+                   worker_index: int, stop_event, results, tablebase_directory: Optional[str] = None,
+                   history: Optional[list[int]] = None):
+    # Lazy SMP helper : the same search on the shared table, odd helpers starting one ply deeper so that
+    # their entries are ahead of the main search. Always sends back a (depth, score, move codes, nodes) tuple,
+    # even when the setup fails.
+    result = SearchResult(None, 0, 0, 0, 0.0, [])
+    shared_memory = table = tablebase = engine = None
+    try:
+        shared_memory = SharedMemory(name=table_name)
+        table = TranspositionTable(table_size, buffer=shared_memory.buf)
+        # Each process maps the tablebase files itself, their pages being shared
+        tablebase = Tablebase(tablebase_directory) if tablebase_directory else None
+        engine = Engine(table=table, tablebase=tablebase)
+        engine.stop_event = stop_event
+        result = engine.search(Position.from_fen(fen), max_depth=max_depth, time_limit=time_limit,
+                               start_depth=1 + worker_index % 2, history=history)
+    finally:
+        results.put((result.depth, result.score, result.principal_variation, engine.nodes if engine else 0))
+        if table:
+            table.release()
+        if shared_memory:
+            shared_memory.close()
+        if tablebase:
+            tablebase.close()
+
+
+def _collect_results(helpers: list, results, poll_interval: float = 0.1) -> list[tuple]:
+    # Results of the helpers, without waiting for the ones which died (killed) before sending theirs
+    collected = []
+    while len(collected) < len(helpers):
+        try:
+            collected.append(results.get(timeout=poll_interval))
+        except queue.Empty:
+            if not any(helper.is_alive() for helper in helpers):
+                # Every helper is gone : what they sent is already in the queue
+                try:
+                    while len(collected) < len(helpers):
+                        collected.append(results.get(timeout=poll_interval))
+                except queue.Empty:
+                    pass
+                break
+    return collected
+
+
+def parallel_search(position: Position, workers: int = 1, max_depth: int = 4, time_limit: Optional[float] = None,
+                    table_size: int = 1 << 18, info: Callable[[SearchResult], None] = None,
+                    tablebase_directory: Optional[str] = None) -> SearchResult:
+    # Lazy SMP : helper processes search the same position and share what they find through a transposition
+    # table in shared memory, the main search in this process gives the move unless a helper completed a deeper
+    # iteration. With a single worker this is Engine.search, deterministic when there is no time limit.
+    tablebase = Tablebase(tablebase_directory) if tablebase_directory else None
+    if workers <= 1:
+        try:
+            return Engine(table_size=table_size, tablebase=tablebase).search(position, max_depth, time_limit, info)
+        finally:
+            if tablebase:
+                tablebase.close()
+
+    shared_memory = SharedMemory(create=True, size=TranspositionTable.buffer_size(table_size))
+    table = TranspositionTable(table_size, buffer=shared_memory.buf)
+    try:
+        table.clear()
+        context = multiprocessing.get_context()
+        stop_event, results = context.Event(), context.Queue()
+        helpers = [context.Process(target=_helper_search, args=(shared_memory.name, table_size, position.to_fen(), max_depth,
+                                                               time_limit, index, stop_event, results, tablebase_directory,
+                                                               position_history(position)),
+                                          daemon=True)
+                   for index in range(1, workers)]
+        for helper in helpers:
+            helper.start()
+        engine = Engine(table=table, tablebase=tablebase)
+        result = engine.search(position, max_depth, time_limit, info)
+        stop_event.set()
+        helper_results = _collect_results(helpers, results)
+        for helper in helpers:
+            helper.join()
+
+        for depth, score, principal_variation, _ in helper_results:
+            if depth > result.depth and principal_variation:
+                result = SearchResult(_move_from_label(position, principal_variation[0]), score, depth, 0,
+                                      result.elapsed, principal_variation)
+        result.nodes = engine.nodes + sum(nodes for *_, nodes in helper_results)
+        return result
+    finally:
+        table.release()
+        shared_memory.close()
+        shared_memory.unlink()
+        if tablebase:
+            tablebase.close()
+
+
+def _move_from_label(position: Position, label: str) -> Move:
+    for move in position.iter_legal_moves():
+        if str(EncodedMove.from_move(move)) == label:
+            return move
+    raise ValueError(f"No legal move {label} in this position")
+
+
+def _score_to_table(score: int, ply: int) -> int:
+    # Mate scores are stored relative to the stored position instead of the root
+    if score > MATE_BOUND:
+        return score + ply
+    if score < -MATE_BOUND:
+        return score - ply
+    return score
+
+
+def _tablebase_score(probe: ProbeResult, ply: int) -> int:
+    # Mate scores counted from the root, as for mates found by the search
+    if probe.result == "draw":
+        return 0
+    score = MATE_SCORE - ply - probe.plies
+    return score if probe.result == "win" else -score
+
+
+def _score_from_table(score: int, ply: int) -> int:
+    if score > MATE_BOUND:
+        return score - ply
+    if score < -MATE_BOUND:
+        return score + ply
+    return score
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m chess.engine", description="Searches the best move of a position")
+    parser.add_argument("fen", nargs="?", default=utils.STARTING_FEN, help="position to search (default: starting position)")
+    parser.add_argument("-d", "--depth", type=int, default=4, help="maximum search depth in plies (default: 4)")
+    parser.add_argument("-t", "--time", type=float, default=None, help="time limit in seconds")
+    parser.add_argument("--table-size", type=int, default=1 << 18, help="number of transposition table entries")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="number of search processes sharing the transposition table (default: 1, deterministic)")
+    parser.add_argument("--book", default=None, help="Polyglot opening book played from before searching")
+    parser.add_argument("--tablebase", default=None, help="directory of the endgame tables probed during the search")
+    args = parser.parse_args(argv)
+
+    position = Position.from_fen(args.fen)
+    if args.book:
+        with OpeningBook(args.book) as book:
+            book_move = book.choose(position)
+        if book_move:
+            print(f"bestmove {EncodedMove.from_move(book_move)} (book)")
+            return 0
+    result = parallel_search(position, workers=args.workers, max_depth=args.depth, time_limit=args.time,
+                             table_size=args.table_size, info=print, tablebase_directory=args.tablebase)
+    if args.workers > 1:
+        print(f"all workers: {result.nodes} nodes ({result.nodes_per_second:,.0f} nodes/s)")
+    print(f"bestmove {result.principal_variation[0] if result.principal_variation else '(none)'}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,96 @@
+from typing import Iterable
+
+import numpy as np
+
+from .boards import COLORS, EMPTY, PIECE_CODES, PIECE_TYPES, board_array, board_arrays
+from .psqt import PIECE_SQUARE_TABLES, PIECE_VALUES
+from .models.move import Move
+from .models.position import Position
+
+
+def _build_tables() -> np.ndarray:
+    # TABLES[color, piece type, square] : material plus piece square bonus, in centipawns
+    tables = np.zeros((len(COLORS), len(PIECE_TYPES), 64), dtype=np.int32)
+    squares = np.arange(64)
+    for type_index, piece_type in enumerate(PIECE_TYPES):
+        table = np.array(PIECE_SQUARE_TABLES[piece_type], dtype=np.int32)
+        tables[0, type_index] = PIECE_VALUES[piece_type] + table[squares ^ 56]
+        tables[1, type_index] = PIECE_VALUES[piece_type] + table[squares]
+    return tables
+
+
+TABLES = _build_tables()
+# Same terms by board code, signed from white's point of view, the EMPTY row being zero
+SIGNED_TABLES = np.zeros((EMPTY + 1, 64), dtype=np.int32)
+SIGNED_TABLES[:6] = TABLES[0]
+SIGNED_TABLES[6:12] = -TABLES[1]
+_SQUARES = np.arange(64)
+
+
+def white_score(position: Position) -> int:
+    # Full computation, from white's point of view
+    return int(SIGNED_TABLES[board_array(position), _SQUARES].sum())
+
+
+def evaluate(position: Position) -> int:
+    # Same contract as engine.evaluate : score for the side to move
+    score = white_score(position)
+    return score if position.whose_move == "white" else -score
+
+
+def move_delta(move: Move) -> int:
+    # Change of the white point of view score made by the move, read from the move alone
+    piece_code = PIECE_CODES[(move.piece.color, move.piece.type)]
+    start, end = move.start_square.index, move.end_square.index
+    placed_code = PIECE_CODES[(move.piece.color, move.promoting_piece_str)] if move.is_promotion else piece_code
+    delta = SIGNED_TABLES[placed_code, end] - SIGNED_TABLES[piece_code, start]
+    if move.is_en_passant:
+        # The captured pawn stands next to the start square, on the end square column
+        captured_index = (start & ~7) | (end & 7)
+        delta -= SIGNED_TABLES[PIECE_CODES[(move.piece.opposite_color, "Pawn")], captured_index]
+    elif move.end_square.piece:
+        captured = move.end_square.piece
+        delta -= SIGNED_TABLES[PIECE_CODES[(captured.color, captured.type)], end]
+    if move.is_castling:
+        rook_code = PIECE_CODES[(move.piece.color, "Rook")]
+        delta += SIGNED_TABLES[rook_code, move.rook_end.index] - SIGNED_TABLES[rook_code, move.rook_start.index]
+    return int(delta)
+
+
+class IncrementalEvaluator:
+    # White point of view score computed once, then updated by the delta of each move.
+    # push/pop follow Position.push/pop and must be called before the move is pushed on the position.
+    def __init__(self, position: Position):
+        self.score = white_score(position)
+        self._previous_scores: list[int] = []
+
+    def push(self, move: Move):
+        self._previous_scores.append(self.score)
+        self.score += move_delta(move)
+
+    def pop(self):
+        self.score = self._previous_scores.pop()
+
+    def after(self, move: Move) -> "IncrementalEvaluator":
+        # Evaluator of the position returned by make_move(move), this one being left unchanged
+        evaluator = IncrementalEvaluator.__new__(IncrementalEvaluator)
+        evaluator.score = self.score + move_delta(move)
+        evaluator._previous_scores = []
+        return evaluator
+
+    def relative_score(self, whose_move: str) -> int:
+        return self.score if whose_move == "white" else -self.score
+
+
+def evaluate_batch(boards: np.ndarray, whose_move: np.ndarray = None) -> np.ndarray:
+    # Scores of (N, 64) encoded boards in one call, from white's point of view unless whose_move
+    # (0 for white, 1 for black) is given, in which case they are for the side to move
+    scores = SIGNED_TABLES[boards, _SQUARES].sum(axis=1, dtype=np.int64)
+    if whose_move is not None:
+        scores = np.where(np.asarray(whose_move) == 0, scores, -scores)
+    return scores
+
+
+def evaluate_positions(positions: Iterable[Position]) -> np.ndarray:
+    boards, whose_move = board_arrays(positions)
+    return evaluate_batch(boards, whose_move)
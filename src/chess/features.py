@@ -0,0 +1,59 @@
+import os
+from itertools import islice
+from typing import Iterable
+
+import numpy as np
+
+from .boards import PIECE_CODES, position_arrays
+from .models.position import Position
+
+# Planes of a position : one per board code (white pawn ... black king), then side to move (all ones when black
+# is to move), the four castling rights in FEN order (K, Q, k, q) and the en passant target square.
+# Ranks are the first spatial axis, rank 1 first, and files the second one, a file first.
+PIECE_PLANES = len(PIECE_CODES)
+SIDE_TO_MOVE_PLANE = PIECE_PLANES
+CASTLING_PLANES = slice(PIECE_PLANES + 1, PIECE_PLANES + 5)
+EN_PASSANT_PLANE = PIECE_PLANES + 5
+PLANES = PIECE_PLANES + 6
+
+_CODES = np.arange(PIECE_PLANES, dtype=np.uint8).reshape(1, PIECE_PLANES, 1)
+
+
+def _write_chunk(out: np.ndarray, items: list[Position | str]):
+    count = len(items)
+    boards, side, castling, en_passant = position_arrays(items)
+    out[:, :PIECE_PLANES] = (boards[:, None, :] == _CODES).reshape(count, PIECE_PLANES, 8, 8)
+    out[:, SIDE_TO_MOVE_PLANE] = side[:, None, None]
+    out[:, CASTLING_PLANES] = castling[:, :, None, None]
+    out[:, EN_PASSANT_PLANE] = 0
+    rows = np.flatnonzero(en_passant >= 0)
+    out[rows, EN_PASSANT_PLANE, en_passant[rows] >> 3, en_passant[rows] & 7] = 1
+
+
+def featurize(items: Iterable[Position | str], out: np.ndarray = None, dtype=np.float32, chunk_size: int = 1024) -> np.ndarray:
+    # Positions or FEN strings to an (N, PLANES, 8, 8) array. Written in place into out when given (any array,
+    # including a memory map), chunk by chunk so that only chunk_size boards are held as intermediates.
+    # Returns the filled rows.
+    if out is None:
+        items = list(items)
+        out = np.empty((len(items), PLANES, 8, 8), dtype=dtype)
+    elif out.shape[1:] != (PLANES, 8, 8):
+        raise ValueError(f"Feature buffer must have shape (N, {PLANES}, 8, 8), got {out.shape}")
+
+    items = iter(items)
+    filled = 0
+    while chunk := list(islice(items, chunk_size)):
+        if filled + len(chunk) > len(out):
+            raise ValueError(f"Feature buffer has room for {len(out)} positions only")
+        _write_chunk(out[filled:filled + len(chunk)], chunk)
+        filled += len(chunk)
+    return out[:filled]
+
+
+def featurize_to_file(path: str | os.PathLike, items: Iterable[Position | str], count: int, dtype=np.uint8,
+                      chunk_size: int = 4096) -> np.memmap:
+    # Features written into a memory mapped .npy file of count rows, loadable with np.load(path, mmap_mode="r")
+    out = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=(count, PLANES, 8, 8))
+    featurize(items, out=out, chunk_size=chunk_size)
+    out.flush()
+    return out
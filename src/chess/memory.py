@@ -0,0 +1,69 @@
+import argparse
+import contextlib
+import gc
+import io
+import random
+import sys
+from types import FunctionType, ModuleType
+
+from .models.game import Game
+from .models.position import Position
+from .models import utils
+
+# Shared by every instance, not counted as part of an object's footprint
+_SHARED_TYPES = (type, ModuleType, FunctionType)
+
+
+def deep_size(root: object) -> int:
+    # Bytes of root and of every object reachable from it, each object being counted once
+    seen = set()
+    total = 0
+    pending = [root]
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen or isinstance(obj, _SHARED_TYPES):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        pending.extend(gc.get_referents(obj))
+        # Instance dictionaries are not always reported as referents, their size would be missed
+        if hasattr(obj, "__dict__"):
+            pending.append(obj.__dict__)
+    return total
+
+
+def play_random_game(plies: int, seed: int = 0) -> Game:
+    # Random legal moves with a fixed seed, restarting with another seed when the game ends too early
+    generator = random.Random(seed)
+    while True:
+        game = Game()
+        with contextlib.redirect_stdout(io.StringIO()):
+            while len(game.moves_history) < plies and not game.result:
+                moves = sorted((move for moves in game.current_position.compute_legal_moves().values() for move in moves),
+                               key=lambda move: (move.start_square.index, move.end_square.index, move.promoting_piece_str or ""))
+                game.apply_move(generator.choice(moves))
+        if len(game.moves_history) == plies:
+            return game
+
+
+def run(plies: int, seed: int = 0):
+    position = Position(utils.starting_position(), whose_move="white")
+    print(f"Position (start, no legal moves): {deep_size(position):,} bytes")
+    position.compute_legal_moves()
+    print(f"Position (start, with legal moves): {deep_size(position):,} bytes")
+    game = play_random_game(plies, seed)
+    game_size = deep_size(game)
+    print(f"Game ({plies} plies): {game_size:,} bytes ({game_size // plies:,} bytes per ply)")
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m chess.memory", description="Reports the memory footprint of positions and games")
+    parser.add_argument("-n", "--plies", type=int, default=100, help="length of the benchmarked game in plies (default: 100)")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="seed of the random game (default: 0)")
+    args = parser.parse_args(argv)
+    run(args.plies, args.seed)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,300 @@
+from typing import Optional, TYPE_CHECKING
+
+from .directions import Direction
+from . import tables, utils, zobrist
+
+if TYPE_CHECKING:
+    from .move import Move
+    from .position import Position
+
+# Bitboard layout : bit index = row * 8 + column, a1 being bit 0 and h8 bit 63
+COLORS = ("white", "black")
+PIECE_TYPES = ("Pawn", "Knight", "Bishop", "Rook", "Queen", "King")
+PROMOTION_TYPES = ("Knight", "Bishop", "Rook", "Queen")
+FULL_BOARD = (1 << 64) - 1
+
+# A bitboard move is a (start index, end index, promoting piece type or None) tuple
+BitboardMove = tuple[int, int, Optional[str]]
+
+
+def iter_bits(bitboard: int):
+    while bitboard:
+        lowest_bit = bitboard & -bitboard
+        yield lowest_bit.bit_length() - 1
+        bitboard ^= lowest_bit
+
+
+def lowest_index(bitboard: int) -> int:
+    return (bitboard & -bitboard).bit_length() - 1
+
+
+def _mask(indices) -> int:
+    mask = 0
+    for index in indices:
+        mask |= 1 << index
+    return mask
+
+
+# Masks of the index tables of the tables module, the single place the board geometry is derived from
+KNIGHT_ATTACKS = [_mask(targets) for targets in tables.KNIGHT_TARGETS]
+KING_ATTACKS = [_mask(targets) for targets in tables.KING_TARGETS]
+PAWN_ATTACKS = {color: [_mask(targets) for targets in tables.PAWN_ATTACKS[color]] for color in COLORS}
+
+# Rays are stored with a flag telling if indices increase along the ray, which selects the bit giving the first blocker
+RAYS = {direction.as_tuple(): [_mask(tables.RAYS[index][direction]) for index in range(64)] for direction in Direction.lines()}
+BISHOP_RAYS = [(RAYS[direction.as_tuple()], direction.drow * 8 + direction.dcol > 0) for direction in Direction.diagonals()]
+ROOK_RAYS = [(RAYS[direction.as_tuple()], direction.drow * 8 + direction.dcol > 0) for direction in Direction.straights()]
+BISHOP_EMPTY_ATTACKS = [sum(rays[index] for rays, _ in BISHOP_RAYS) for index in range(64)]
+ROOK_EMPTY_ATTACKS = [sum(rays[index] for rays, _ in ROOK_RAYS) for index in range(64)]
+
+
+def _build_between_table() -> list[list[int]]:
+    # BETWEEN[a][b] : squares strictly between two aligned squares, 0 if they are not aligned
+    between = [[0] * 64 for _ in range(64)]
+    for start in range(64):
+        for ray in tables.RAYS[start].values():
+            path = 0
+            # Ray indices are ordered from the closest square
+            for end in ray:
+                between[start][end] = path
+                path |= 1 << end
+    return between
+
+
+BETWEEN = _build_between_table()
+
+
+def sliding_attacks(index: int, occupancy: int, rays: list[tuple[list[int], bool]]) -> int:
+    attacks = 0
+    for ray_table, increasing in rays:
+        ray = ray_table[index]
+        blockers = ray & occupancy
+        if blockers:
+            blocker = (blockers & -blockers).bit_length() - 1 if increasing else blockers.bit_length() - 1
+            ray ^= ray_table[blocker]
+        attacks |= ray
+    return attacks
+
+
+def bishop_attacks(index: int, occupancy: int) -> int:
+    return sliding_attacks(index, occupancy, BISHOP_RAYS)
+
+
+def rook_attacks(index: int, occupancy: int) -> int:
+    return sliding_attacks(index, occupancy, ROOK_RAYS)
+
+
+class BitboardPosition:
+    def __init__(self, bitboards: dict[str, dict[str, int]], whose_move: str = "white", castling_rights: dict[str, bool] = None, en_passant_square: int = None):
+        self.bitboards = bitboards
+        self.whose_move = whose_move
+        self.not_turn_to_move = "black" if whose_move == "white" else "white"
+        self.castling_rights = castling_rights or {
+            "white_kingside": True,
+            "white_queenside": True,
+            "black_kingside": True,
+            "black_queenside": True
+        }
+        # Square a pawn capturing en passant lands on, None if the last move was not a two squares pawn advance
+        self.en_passant_square = en_passant_square
+
+    @staticmethod
+    def empty_bitboards() -> dict[str, dict[str, int]]:
+        return {color: {piece_type: 0 for piece_type in PIECE_TYPES} for color in COLORS}
+
+    @classmethod
+    def from_position(cls, position: "Position") -> "BitboardPosition":
+        bitboards = cls.empty_bitboards()
+        for color, piece_sets in position.pieces.items():
+            for piece_type, piece_set in piece_sets.items():
+                for piece in piece_set:
+                    bitboards[color][piece_type] |= 1 << (piece.square.row * 8 + piece.square.column)
+        en_passant_square = None
+        if position.en_passant_target:
+            pawn_square = position.en_passant_target.square
+            behind = -1 if position.en_passant_target.color == "white" else 1
+            en_passant_square = (pawn_square.row + behind) * 8 + pawn_square.column
+        return cls(bitboards, position.whose_move, position.castling_rights.copy(), en_passant_square)
+
+    def to_position(self) -> "Position":
+        from .position import Position
+        position = Position(self.piece_list(), whose_move=self.whose_move, castling_rights=self.castling_rights.copy())
+        if self.en_passant_square is not None:
+            pawn_index = self.en_passant_square + (-8 if self.whose_move == "white" else 8)
+            position.en_passant_target = position.piece(utils.index_to_label(pawn_index))
+            position.zobrist_key ^= zobrist.en_passant_key(position)
+        return position
+
+    def piece_list(self) -> list[list[str]]:
+        return [[color, piece_type, utils.index_to_label(index)]
+                for color in COLORS
+                for piece_type in PIECE_TYPES
+                for index in iter_bits(self.bitboards[color][piece_type])]
+
+    def copy(self) -> "BitboardPosition":
+        return BitboardPosition({color: boards.copy() for color, boards in self.bitboards.items()},
+                                self.whose_move, self.castling_rights.copy(), self.en_passant_square)
+
+    def occupancy(self, color: str) -> int:
+        boards = self.bitboards[color]
+        return boards["Pawn"] | boards["Knight"] | boards["Bishop"] | boards["Rook"] | boards["Queen"] | boards["King"]
+
+    def piece_on(self, index: int) -> Optional[tuple[str, str]]:
+        bit = 1 << index
+        for color in COLORS:
+            for piece_type, bitboard in self.bitboards[color].items():
+                if bitboard & bit:
+                    return color, piece_type
+        return None
+
+    def attackers_to(self, index: int, color: str, occupancy: int) -> int:
+        # Squares of the pieces of the given color attacking the index square, sliders being blocked by occupancy
+        boards = self.bitboards[color]
+        opposite_color = "black" if color == "white" else "white"
+        return ((KNIGHT_ATTACKS[index] & boards["Knight"]) |
+                (KING_ATTACKS[index] & boards["King"]) |
+                (PAWN_ATTACKS[opposite_color][index] & boards["Pawn"]) |
+                (bishop_attacks(index, occupancy) & (boards["Bishop"] | boards["Queen"])) |
+                (rook_attacks(index, occupancy) & (boards["Rook"] | boards["Queen"])))
+
+    def king_in_check(self, color: str = None) -> bool:
+        color = color or self.whose_move
+        opposite_color = "black" if color == "white" else "white"
+        king_index = lowest_index(self.bitboards[color]["King"])
+        return bool(self.attackers_to(king_index, opposite_color, self.occupancy("white") | self.occupancy("black")))
+
+    def legal_moves(self) -> list[BitboardMove]:
+        us, them = self.whose_move, self.not_turn_to_move
+        own_boards = self.bitboards[us]
+        own = self.occupancy(us)
+        enemy = self.occupancy(them)
+        occupancy = own | enemy
+        king = lowest_index(own_boards["King"])
+        moves = []
+
+        # King moves, the king being removed from the occupancy so that it cannot hide behind itself on a checking line
+        occupancy_without_king = occupancy ^ (1 << king)
+        for end in iter_bits(KING_ATTACKS[king] & ~own):
+            if not self.attackers_to(end, them, occupancy_without_king):
+                moves.append((king, end, None))
+
+        checkers = self.attackers_to(king, them, occupancy)
+        if checkers & (checkers - 1):
+            # Double check : only the king can move
+            return moves
+        target = checkers | BETWEEN[king][lowest_index(checkers)] if checkers else FULL_BOARD
+
+        # Pins : a single own piece between the king and an enemy slider aligned with it
+        enemy_boards = self.bitboards[them]
+        pin_masks = {}
+        snipers = ((BISHOP_EMPTY_ATTACKS[king] & (enemy_boards["Bishop"] | enemy_boards["Queen"])) |
+                   (ROOK_EMPTY_ATTACKS[king] & (enemy_boards["Rook"] | enemy_boards["Queen"])))
+        for sniper in iter_bits(snipers):
+            blockers = BETWEEN[king][sniper] & occupancy
+            if blockers and not blockers & (blockers - 1) and blockers & own:
+                pin_masks[lowest_index(blockers)] = BETWEEN[king][sniper] | (1 << sniper)
+
+        # Pawns
+        forward = 8 if us == "white" else -8
+        starting_row, promotion_row = (1, 7) if us == "white" else (6, 0)
+        for start in iter_bits(own_boards["Pawn"]):
+            allowed = target & pin_masks.get(start, FULL_BOARD)
+            ends = PAWN_ATTACKS[us][start] & enemy
+            one_step = start + forward
+            if not occupancy & (1 << one_step):
+                ends |= 1 << one_step
+                two_steps = one_step + forward
+                if start >> 3 == starting_row and not occupancy & (1 << two_steps):
+                    ends |= 1 << two_steps
+            for end in iter_bits(ends & allowed):
+                if end >> 3 == promotion_row:
+                    moves.extend((start, end, piece_type) for piece_type in PROMOTION_TYPES)
+                else:
+                    moves.append((start, end, None))
+
+        # En passant, checked on the resulting occupancy since two pawns leave the same line at once
+        if self.en_passant_square is not None:
+            captured = self.en_passant_square - forward
+            for start in iter_bits(PAWN_ATTACKS[them][self.en_passant_square] & own_boards["Pawn"]):
+                occupancy_after = occupancy ^ (1 << start) ^ (1 << captured) | (1 << self.en_passant_square)
+                if not self.attackers_to(king, them, occupancy_after) & ~(1 << captured):
+                    moves.append((start, self.en_passant_square, None))
+
+        # Knights (a pinned knight never stays on its pin line)
+        for start in iter_bits(own_boards["Knight"]):
+            for end in iter_bits(KNIGHT_ATTACKS[start] & ~own & target & pin_masks.get(start, FULL_BOARD)):
+                moves.append((start, end, None))
+
+        # Sliders
+        for piece_type, attacks in (("Bishop", bishop_attacks), ("Rook", rook_attacks)):
+            for start in iter_bits(own_boards[piece_type]):
+                for end in iter_bits(attacks(start, occupancy) & ~own & target & pin_masks.get(start, FULL_BOARD)):
+                    moves.append((start, end, None))
+        for start in iter_bits(own_boards["Queen"]):
+            reachable = bishop_attacks(start, occupancy) | rook_attacks(start, occupancy)
+            for end in iter_bits(reachable & ~own & target & pin_masks.get(start, FULL_BOARD)):
+                moves.append((start, end, None))
+
+        # Castling, same rules as Position : rights, king and rook in place, empty path and no controlled square crossed by the king
+        base = 0 if us == "white" else 56
+        if not checkers and king == base + 4:
+            if (self.castling_rights.get(f"{us}_kingside") and own_boards["Rook"] & (1 << (base + 7)) and not occupancy & (0b110 << (base + 4)) and
+                    not self.attackers_to(base + 5, them, occupancy) and not self.attackers_to(base + 6, them, occupancy)):
+                moves.append((king, base + 6, None))
+            if (self.castling_rights.get(f"{us}_queenside") and own_boards["Rook"] & (1 << base) and not occupancy & (0b111 << (base + 1)) and
+                    not self.attackers_to(base + 3, them, occupancy) and not self.attackers_to(base + 2, them, occupancy)):
+                moves.append((king, base + 2, None))
+        return moves
+
+    def make_move(self, move: BitboardMove) -> "BitboardPosition":
+        start, end, promoting_piece_str = move
+        us, them = self.whose_move, self.not_turn_to_move
+        new_position = self.copy()
+        own_boards = new_position.bitboards[us]
+        enemy_boards = new_position.bitboards[them]
+        start_bit, end_bit = 1 << start, 1 << end
+        piece_type = next(piece_type for piece_type, bitboard in own_boards.items() if bitboard & start_bit)
+
+        for captured_type, bitboard in enemy_boards.items():
+            if bitboard & end_bit:
+                enemy_boards[captured_type] ^= end_bit
+                break
+        own_boards[piece_type] ^= start_bit
+        own_boards[promoting_piece_str or piece_type] |= end_bit
+
+        new_position.en_passant_square = None
+        if piece_type == "Pawn":
+            if end == self.en_passant_square:
+                enemy_boards["Pawn"] ^= 1 << (end - 8 if us == "white" else end + 8)
+            elif abs(end - start) == 16:
+                new_position.en_passant_square = (start + end) // 2
+        elif piece_type == "King":
+            new_position.castling_rights[f"{us}_kingside"] = False
+            new_position.castling_rights[f"{us}_queenside"] = False
+            if abs(end - start) == 2:
+                rook_start, rook_end = (start + 3, start + 1) if end > start else (start - 4, start - 1)
+                own_boards["Rook"] ^= (1 << rook_start) | (1 << rook_end)
+
+        # Any move from or to a rook starting square disables the corresponding castle
+        for index, right in ((7, "white_kingside"), (0, "white_queenside"), (63, "black_kingside"), (56, "black_queenside")):
+            if index == start or index == end:
+                new_position.castling_rights[right] = False
+
+        new_position.whose_move, new_position.not_turn_to_move = them, us
+        return new_position
+
+
+def move_from_bitboard_move(position: "Position", move: BitboardMove) -> "Move":
+    # Corresponding Move among the legal moves of an equivalent Position
+    start, end, promoting_piece_str = move
+    piece = position.piece(utils.index_to_label(start))
+    for legal_move in position.legal_moves_for(piece):
+        if legal_move.end_square.name == utils.index_to_label(end) and legal_move.promoting_piece_str == promoting_piece_str:
+            return legal_move
+    raise ValueError(f"No legal move from {utils.index_to_label(start)} to {utils.index_to_label(end)} in the position")
+
+
+def bitboard_move_from_move(move: "Move") -> BitboardMove:
+    return (move.start_square.row * 8 + move.start_square.column,
+            move.end_square.row * 8 + move.end_square.column,
+            move.promoting_piece_str)
@@ -0,0 +1,56 @@
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class LRUCache:
+    # Size bounded mapping evicting the least recently used entry, a capacity of 0 disables it
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable):
+        return key in self._entries
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: Hashable, value: Any):
+        if self.capacity <= 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def resize(self, capacity: int):
+        self.capacity = capacity
+        while len(self._entries) > max(capacity, 0):
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict[str, int | float]:
+        return {"capacity": self.capacity, "size": len(self), "hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate}
+
+
+# Process wide cache of Position.compute_legal_moves results, keyed by zobrist key and castling rights
+legal_moves_cache = LRUCache(capacity=10_000)
@@ -1,25 +1,39 @@
 class Direction:
+    __slots__ = ("dcol", "drow", "_hash")
+
     def __init__(self, dcol: int, drow: int):
         self.dcol = dcol
         self.drow = drow
+        self._hash = hash((dcol, drow))
 
     def as_tuple(self) -> tuple[int, int]:
         return self.dcol, self.drow
 
+    # Direction sets are built once and shared, they are frozen so that callers cannot alter them
+    @classmethod
+    def diagonals(cls) -> frozenset["Direction"]:
+        return DIAGONALS
+
     @classmethod
-    def diagonals(cls) -> set["Direction"]:
-        return {cls(1, 1), cls(1, -1), cls(-1, 1), cls(-1, -1)}
+    def straights(cls) -> frozenset["Direction"]:
+        return STRAIGHTS
 
     @classmethod
-    def straights(cls) -> set["Direction"]:
-        return {cls(0, 1), cls(0, -1), cls(1, 0), cls(-1, 0)}
+    def lines(cls) -> frozenset["Direction"]:
+        return LINES
 
     @classmethod
-    def knight_jumps(cls) -> set["Direction"]:
-        return {cls(1, 2), cls(2, 1), cls(2, -1), cls(1, -2), cls(-1, -2), cls(-2, -1), cls(-2, 1), cls(-1, 2)}
+    def knight_jumps(cls) -> frozenset["Direction"]:
+        return KNIGHT_JUMPS
 
     def __eq__(self, other: "Direction"):
          return self.as_tuple() == other.as_tuple()
 
     def __hash__(self):
-        return hash(self.as_tuple())
\ No newline at end of file
+        return self._hash
+
+
+DIAGONALS = frozenset({Direction(1, 1), Direction(1, -1), Direction(-1, 1), Direction(-1, -1)})
+STRAIGHTS = frozenset({Direction(0, 1), Direction(0, -1), Direction(1, 0), Direction(-1, 0)})
+LINES = DIAGONALS | STRAIGHTS
+KNIGHT_JUMPS = frozenset({Direction(1, 2), Direction(2, 1), Direction(2, -1), Direction(1, -2), Direction(-1, -2), Direction(-2, -1), Direction(-2, 1), Direction(-1, 2)})
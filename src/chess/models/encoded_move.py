@@ -0,0 +1,142 @@
+from array import array
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional
+
+from . import utils
+
+if TYPE_CHECKING:
+    from .move import Move
+    from .position import Position
+
+# 16 bits moves : start index (bits 0-5), end index (bits 6-11), promotion piece (bits 12-13) and flag (bits 14-15).
+# Square indices are the ones of the tables module (row * 8 + column, a1 = 0).
+NORMAL, PROMOTION, EN_PASSANT, CASTLING = 0, 1, 2, 3
+PROMOTION_PIECES = ("Knight", "Bishop", "Rook", "Queen")
+_PROMOTION_CODES = {piece_type: code for code, piece_type in enumerate(PROMOTION_PIECES)}
+
+
+def encode(start_index: int, end_index: int, promoting_piece_str: Optional[str] = None, flag: int = NORMAL) -> int:
+    if promoting_piece_str:
+        return start_index | end_index << 6 | _PROMOTION_CODES[promoting_piece_str] << 12 | PROMOTION << 14
+    return start_index | end_index << 6 | flag << 14
+
+
+def encode_move(move: "Move") -> int:
+    if move.is_promotion:
+        return encode(move.start_square.index, move.end_square.index, move.promoting_piece_str)
+    flag = CASTLING if move.is_castling else EN_PASSANT if move.is_en_passant else NORMAL
+    return encode(move.start_square.index, move.end_square.index, flag=flag)
+
+
+class EncodedMove:
+    # Lightweight view over a 16 bits move code, independent of any position
+    __slots__ = ("code",)
+
+    def __init__(self, code: int):
+        self.code = code
+
+    @classmethod
+    def from_move(cls, move: "Move") -> "EncodedMove":
+        return cls(encode_move(move))
+
+    @property
+    def start_index(self) -> int:
+        return self.code & 0x3F
+
+    @property
+    def end_index(self) -> int:
+        return self.code >> 6 & 0x3F
+
+    @property
+    def flag(self) -> int:
+        return self.code >> 14
+
+    @property
+    def is_promotion(self) -> bool:
+        return self.flag == PROMOTION
+
+    @property
+    def is_en_passant(self) -> bool:
+        return self.flag == EN_PASSANT
+
+    @property
+    def is_castling(self) -> bool:
+        return self.flag == CASTLING
+
+    @property
+    def promoting_piece_str(self) -> Optional[str]:
+        return PROMOTION_PIECES[self.code >> 12 & 3] if self.is_promotion else None
+
+    def to_move(self, position: "Position") -> "Move":
+        # The matching legal move of the position, ValueError if there is none
+        piece = position.squares[self.start_index].piece
+        if piece and piece.color == position.whose_move:
+            end_square = position.squares[self.end_index]
+            promoting_piece_str = self.promoting_piece_str
+            for move in position.legal_moves_for(piece):
+                if move.end_square is end_square and move.promoting_piece_str == promoting_piece_str:
+                    return move
+        raise ValueError(f"Move {self} is not legal in this position")
+
+    def __eq__(self, other):
+        if not isinstance(other, EncodedMove):
+            return NotImplemented
+        return self.code == other.code
+
+    def __hash__(self):
+        return self.code
+
+    def __str__(self):
+        # Coordinate notation, as used by perft divide
+        label = utils.index_to_label(self.start_index) + utils.index_to_label(self.end_index)
+        if self.is_promotion:
+            label += "n" if self.promoting_piece_str == "Knight" else self.promoting_piece_str[0].lower()
+        return label
+
+    def __repr__(self):
+        return f"EncodedMove({self})"
+
+
+class MoveList:
+    # Moves stored as 16 bits codes in an array, two bytes per move instead of a Move object
+    __slots__ = ("codes",)
+
+    def __init__(self, codes: Iterable[int] = ()):
+        self.codes = array("H", codes)
+
+    @classmethod
+    def from_moves(cls, moves: Iterable["Move"]) -> "MoveList":
+        return cls(encode_move(move) for move in moves)
+
+    def append(self, move: "Move | EncodedMove | int"):
+        if isinstance(move, EncodedMove):
+            move = move.code
+        elif not isinstance(move, int):
+            move = encode_move(move)
+        self.codes.append(move)
+
+    def pop(self) -> EncodedMove:
+        return EncodedMove(self.codes.pop())
+
+    def to_moves(self, position: "Position") -> list["Move"]:
+        # Only meaningful for moves of the given position, such as a move list generated from it
+        return [EncodedMove(code).to_move(position) for code in self.codes]
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index: int) -> EncodedMove:
+        return EncodedMove(self.codes[index])
+
+    def __iter__(self) -> Iterator[EncodedMove]:
+        return map(EncodedMove, self.codes)
+
+    def __contains__(self, move: "EncodedMove | int"):
+        return (move.code if isinstance(move, EncodedMove) else move) in self.codes
+
+    def __eq__(self, other):
+        if not isinstance(other, MoveList):
+            return NotImplemented
+        return self.codes == other.codes
+
+    def __repr__(self):
+        return f"MoveList([{', '.join(str(move) for move in self)}])"
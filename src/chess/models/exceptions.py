@@ -24,6 +24,13 @@ class UnimplementedPieceTypeError(Exception):
     def __init__(self, type):
         super().__init__(f"Class {type} is not currently implemented")
 
+class InvalidFenError(ValueError):
+    """Raised when a FEN string cannot be parsed into a position"""
+
+    def __init__(self, fen: str, reason: str):
+        super().__init__(f"Invalid FEN '{fen}': {reason}")
+
+
 class InvalidPositionError(Exception):
     """Base class for invalid position errors"""
     pass
@@ -1,60 +1,117 @@
+from collections import Counter
+
+from .encoded_move import EncodedMove, MoveList
 from .move import Move
 from .position import Position
 from . import utils
 
 
 class Game:
-    def __init__(self):
-        self.current_position: "Position" = Position(utils.starting_position(), whose_move="white")
+    # A single live position is kept, moves are pushed on it and popped back for takebacks.
+    # The history is made of the position's undo records (without their legal moves), the 16 bits move codes
+    # and a FEN checkpoint every CHECKPOINT_INTERVAL plies, from which earlier positions are rebuilt on demand.
+    __slots__ = ("current_position", "move_codes", "checkpoints", "repetitions", "result")
+    CHECKPOINT_INTERVAL = 16
+    FIFTY_MOVE_RULE_PLIES = 100
+
+    def __init__(self, starting_position: Position = None):
+        self.current_position: "Position" = starting_position or Position(utils.starting_position(), whose_move="white")
         self.current_position.compute_legal_moves()
-        self.positions_history : list["Position"] = [self.current_position]
-        self.moves_history : list["Move"] = []
+        self.move_codes = MoveList()
+        # checkpoints[i] is the FEN of the position after i * CHECKPOINT_INTERVAL plies
+        self.checkpoints: list[str] = [self.current_position.to_fen()]
+        # Occurrences of each position of the game by zobrist key, for threefold repetition
+        self.repetitions: Counter[int] = Counter([self.current_position.zobrist_key])
         self.result = None
 
+    @property
+    def moves_history(self) -> list["Move"]:
+        # The moves were played on the live position : their former_position is it, not the position before them
+        return [record.move for record in self.current_position.undo_stack]
+
+    @property
+    def positions_history(self) -> list["Position"]:
+        # Rebuilt from the checkpoints, prefer position_at when a single position is needed
+        return [self.position_at(ply) for ply in range(len(self.move_codes) + 1)]
+
     def apply_move(self, move: Move | str, language="English") -> bool:
+        position = self.current_position
         if isinstance(move, Move):
-            try:
-                new_position = self.current_position.make_move(move, language=language)[0]
-            except AssertionError:
+            # Moves of earlier plies refer to the live position too : the piece has to still stand on the start
+            # square, and the position's own legal move is played rather than the given object
+            if move.former_position is not position or move.piece.square is not move.start_square or not move.is_legal_move():
                 print("Illegal move attempted!")
                 return False
+            move = EncodedMove.from_move(move).to_move(position)
         elif isinstance(move, str):
             try:
-                new_position, move = self.current_position.make_move(move, language=language)
+                move = position.move_from_notation(move, language=language)
             except ValueError:
                 print("Notation doesn't refer to a legal move in the current position")
                 return False
         else:
             raise TypeError("move must be a Move or a string")
 
-        self.moves_history.append(move)
-        self.positions_history.append(new_position)
-        self.current_position = new_position
+        # Notation depends on the position before the move
+        move.base_notation = move.compute_base_notation(language=language)
+        self.move_codes.append(move)
+        position.push(move, keep_legal_moves=False)
+        move.is_check = position.king_in_check(next(iter(position.pieces[position.whose_move]["King"])))
+        if len(self.move_codes) % self.CHECKPOINT_INTERVAL == 0:
+            self.checkpoints.append(position.to_fen())
+        self.repetitions[position.zobrist_key] += 1
         self._check_game_end_conditions()
         #Replace + by # in base_notation if it's a mate
-        if self.result and "Checkmate" in self.result:
-            move.is_checkmate = True
-            move.update_full_notation()
+        move.is_checkmate = bool(self.result and "Checkmate" in self.result)
+        move.update_full_notation()
         print(move.full_notation)
         return True
 
+    def take_back(self) -> Move:
+        # Constant time : the last move is popped from the live position
+        if not self.move_codes:
+            raise IndexError("No move to take back")
+        self.move_codes.pop()
+        if len(self.checkpoints) > len(self.move_codes) // self.CHECKPOINT_INTERVAL + 1:
+            self.checkpoints.pop()
+        self.result = None
+        key = self.current_position.zobrist_key
+        self.repetitions[key] -= 1
+        if not self.repetitions[key]:
+            del self.repetitions[key]
+        return self.current_position.pop()
 
-
+    def position_at(self, ply: int) -> "Position":
+        # New position after the given number of plies, replayed from the closest checkpoint before it
+        if not 0 <= ply <= len(self.move_codes):
+            raise IndexError(f"Ply {ply} is out of the game (0 to {len(self.move_codes)})")
+        checkpoint = ply // self.CHECKPOINT_INTERVAL
+        position = Position.from_fen(self.checkpoints[checkpoint])
+        for code in self.move_codes.codes[checkpoint * self.CHECKPOINT_INTERVAL:ply]:
+            position.push(EncodedMove(code), keep_legal_moves=False)
+        return position
 
     def _check_game_end_conditions(self):
         position = self.current_position
-        position.compute_legal_moves()
-        if all(not moves for moves in position.legal_moves_.values()):
+        # Stops at the first legal move found, the full list is only needed when the game goes on
+        if not position.has_legal_move():
             # Checkmate
             if position.king_in_check(next(iter(position.pieces[position.whose_move]["King"]))):
                 self.result = f"Checkmate ! {position.not_turn_to_move.capitalize()} won."
             #Stalemate
             else:
                 self.result = f"Stalemate !"
+        # Draw rules, each checked in constant time
+        elif position.has_insufficient_material():
+            self.result = "Draw by insufficient material !"
+        elif self.repetitions[position.zobrist_key] >= 3:
+            self.result = "Draw by threefold repetition !"
+        elif position.halfmove_clock >= self.FIFTY_MOVE_RULE_PLIES:
+            self.result = "Draw by the fifty-move rule !"
+        if self.result:
             print(self.result)
-        #TO DO : repetitions, no push pawn and capture ?
 
 if __name__ == "__main__":
     game = Game()
     game.apply_move("Nc3")
-    game.apply_move("Cf6", language="French")
\ No newline at end of file
+    game.apply_move("Cf6", language="French")
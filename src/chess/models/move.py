@@ -5,8 +5,31 @@ if TYPE_CHECKING:
     from .square import Square
     from .position import Position
 
+PIECE_NOTATIONS = {
+    "English": {
+        "Pawn": "",
+        "Knight": "N",
+        "Bishop": "B",
+        "Rook": "R",
+        "Queen": "Q",
+        "King": "K"
+    },
+    "French": {
+        "Pawn": "",
+        "Knight": "C",
+        "Bishop": "F",
+        "Rook": "T",
+        "Queen": "D",
+        "King": "R"
+    }
+}
+
 
 class Move:
+    __slots__ = ("former_position", "piece", "start_square", "end_square", "is_castling", "rook_start", "rook_end",
+                 "is_two_pawn_move", "is_en_passant", "is_promotion", "promoting_piece_str",
+                 "base_notation", "is_check", "is_checkmate", "full_notation")
+
     def __init__(self, position: "Position", piece: "Piece", square: "Square", *, is_castling = False, rook_start = None, rook_end = None, is_two_pawn_move = False, is_en_passant = False, is_promotion = False, promoting_piece_str = None):
         self.former_position = position
         self.piece = piece
@@ -45,29 +68,25 @@ class Move:
         ))
 
     def is_legal_move(self) -> bool:
-        if not self.former_position.legal_moves_:
-            self.former_position.compute_legal_moves()
-        return self in self.former_position.legal_moves_.get(self.piece, set())
-
-    def is_promotion(self) -> bool:
-        return self.piece.type == "Pawn" and self.end_square.row in [0, 7]
+        return self in self.former_position.legal_moves_for(self.piece)
 
     def is_capture(self) -> bool:
         #Assumes move is legal
         return (self.end_square.piece is not None) | self.is_en_passant
 
-    def _multiple_pieces_notation(self):
+    def _multiple_pieces_notation(self, conflicting_pieces: list["Piece"] = None):
+        # conflicting_pieces : other pieces of the same type able to reach the end square, looked up when not given
         if self.piece.type == "Pawn":
             return ""
-        if not self.former_position.legal_moves_:
-            self.former_position.compute_legal_moves()
-        conflicting_pieces = []
-        notation = ""
-        for piece in self.former_position.legal_moves_.keys():
-            if piece != self.piece and piece.type == self.piece.type:
-                for move in self.former_position.legal_moves_[piece]:
-                    if move.end_square == self.end_square:
-                        conflicting_pieces.append(piece)
+        if conflicting_pieces is None:
+            if not self.former_position.legal_moves_:
+                self.former_position.compute_legal_moves()
+            conflicting_pieces = []
+            for piece in self.former_position.legal_moves_.keys():
+                if piece != self.piece and piece.type == self.piece.type:
+                    for move in self.former_position.legal_moves_[piece]:
+                        if move.end_square == self.end_square:
+                            conflicting_pieces.append(piece)
         if not conflicting_pieces:
             return ""
         if not any(piece.square.column == self.piece.square.column for piece in conflicting_pieces):
@@ -82,38 +101,39 @@ class Move:
         else:
             return "x"
 
-    def compute_base_notation(self, language="English"):
-        notations = {
-            "English": {
-                "Pawn": "",
-                "Knight": "N",
-                "Bishop": "B",
-                "Rook": "R",
-                "Queen": "Q",
-                "King": "K"
-            },
-            "French": {
-                "Pawn": "",
-                "Knight": "C",
-                "Bishop": "F",
-                "Rook": "T",
-                "Queen": "D",
-                "King": "R"
-            }
-        }
-
+    def compute_base_notation(self, language="English", conflicting_pieces: list["Piece"] = None):
         if self.is_castling:
             if self.end_square.name in ["g1","g8"]:
                 return "O-O"
             return "O-O-O"
-        piece_cls_to_notation = notations.get(language, notations["English"])
+        piece_cls_to_notation = PIECE_NOTATIONS.get(language, PIECE_NOTATIONS["English"])
         piece_notation = piece_cls_to_notation[self.piece.__class__.__name__]
         target_square_notation = self.end_square.name
         capture_notation = self._capture_notation() if self.is_capture() else ""
-        mutiple_piece_notation = self._multiple_pieces_notation()
+        mutiple_piece_notation = self._multiple_pieces_notation(conflicting_pieces)
         promotion_notation = "=" + piece_cls_to_notation[self.promoting_piece_str] if self.is_promotion else ""
         return piece_notation + mutiple_piece_notation + capture_notation + target_square_notation + promotion_notation
 
+    def gives_check(self) -> bool:
+        # Computed on first use, while the former position is still in the state the move was generated from
+        if self.is_check is None:
+            self._play_and_inspect()
+        return self.is_check
+
+    def gives_checkmate(self) -> bool:
+        if self.is_checkmate is None:
+            self._play_and_inspect()
+        return self.is_checkmate
+
+    def _play_and_inspect(self):
+        position = self.former_position
+        position.push(self)
+        try:
+            self.is_check = position.king_in_check(next(iter(position.pieces[position.whose_move]["King"])))
+            self.is_checkmate = self.is_check and not position.has_legal_move()
+        finally:
+            position.pop()
+
     def update_full_notation(self):
         if self.is_checkmate:
             self.full_notation = self.base_notation + "#"
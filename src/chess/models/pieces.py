@@ -1,10 +1,9 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from pathlib import Path
 from typing import TYPE_CHECKING
 
-from . import utils, exceptions
+from . import utils, exceptions, tables
 from .directions import Direction
 
 if TYPE_CHECKING:
@@ -12,6 +11,9 @@ if TYPE_CHECKING:
 
 
 class Piece(ABC):
+    # Slotted, as positions hold tens of pieces and games many positions. Images are a view concern (see views.piece_view)
+    __slots__ = ("color", "opposite_color", "type", "square", "attacked_indices")
+
     def __init__(self, color: str, type: str, square: Square = None):
         if not utils.is_valid_color(color):
             raise exceptions.InvalidColorError(color)
@@ -19,7 +21,8 @@ class Piece(ABC):
         self.opposite_color = "black" if self.color == "white" else "white"
         self.type = type
         self.square = square
-        self.image_path = Path().resolve() / "images" / (self.type + "_" + self.color + ".svg")
+        # Square indices this piece attacks, as counted in its position's attack maps
+        self.attacked_indices: tuple[int, ...] = ()
 
     @property
     def string_initial(self):
@@ -53,16 +56,26 @@ class Piece(ABC):
 
 
 class RecursiveControlledSquaresMixin:
-    # Inheriting classes must implement attribute square and method moving_directions
+    # Inheriting classes must implement attribute square, method moving_directions and
+    # class attribute rays, the per-square table of rays along their moving directions
+    __slots__ = ()
+    rays: list[tuple[tuple[int, ...], ...]]
+
     def controlled_squares(self) -> set[Square]:
         controlled_squares: set["Square"] = set()
-        directions = self.moving_directions()
-        for direction in directions:
-            controlled_squares = controlled_squares | self.square.explore_in_direction(direction)[0]
+        squares = self.square.position.squares
+        for ray in self.rays[self.square.index]:
+            for index in ray:
+                square = squares[index]
+                controlled_squares.add(square)
+                if square.piece:
+                    break
         return controlled_squares
 
 
 class Pawn(Piece):
+    __slots__ = ("starting_row",)
+
     def __init__(self, color: str):
         super().__init__(color.lower(), "Pawn")
         self.starting_row = 1 if self.color == "white" else 6
@@ -70,44 +83,38 @@ class Pawn(Piece):
         # self.moved_two_squares_forward = False
 
     def controlled_squares(self) -> set[Square]:
-        controlled_squares = set()
-        directions = self.capturing_directions()
-
-        for direction in directions:
-            square = self.square.next_square_in_direction(direction)
-            if square:
-                controlled_squares.add(square)
-        return controlled_squares
+        squares = self.square.position.squares
+        return {squares[index] for index in tables.PAWN_ATTACKS[self.color][self.square.index]}
 
     def moving_squares(self) -> set[Square]:
-        # TO DO : prise en passant. Required : move and last_piece to move
-        column, row = utils.label_to_indices(self.square.name)
+        # En passant captures depend on the previous move, they are handled by Position.compute_legal_moves
+        squares = self.square.position.squares
+        pushes = tables.PAWN_PUSHES[self.color]
         moving_squares = set()
-        moving_direction = next(iter(self.moving_directions()))
 
         # Checking moving forward
-        square = self.square.next_square_in_direction(moving_direction)
-        if square and not square.piece:
-            moving_squares.add(square)
-            if row == self.starting_row:  # If the pawn is on its starting square, check if it can moves two moving_squares ahead
-                square = square.next_square_in_direction(moving_direction)
-                if square and not square.piece:
-                    moving_squares.add(square)
+        index = pushes[self.square.index]
+        if index is not None and not squares[index].piece:
+            moving_squares.add(squares[index])
+            if self.square.row == self.starting_row:  # If the pawn is on its starting square, check if it can moves two moving_squares ahead
+                index = pushes[index]
+                if not squares[index].piece:
+                    moving_squares.add(squares[index])
         # Checking captures
         for square in self.controlled_squares():
             if square.piece and square.piece.color == self.opposite_color:
                 moving_squares.add(square)
         return moving_squares
 
-    def moving_directions(self) -> set["Direction"]:
-        moving_direction = 1 if self.color == "white" else -1
-        return {Direction(0, moving_direction)}
+    def moving_directions(self) -> frozenset["Direction"]:
+        return PAWN_MOVING_DIRECTIONS[self.color]
 
-    def capturing_directions(self) -> set["Direction"]:
-        moving_direction = 1 if self.color == "white" else -1
-        return {Direction(1, moving_direction), Direction(-1, moving_direction)}
+    def capturing_directions(self) -> frozenset["Direction"]:
+        return PAWN_CAPTURING_DIRECTIONS[self.color]
 
 class Knight(Piece):
+    __slots__ = ()
+
     def __init__(self, color: str):
         super().__init__(color.lower(), "Knight")
 
@@ -116,54 +123,55 @@ class Knight(Piece):
         return "N"
 
     def controlled_squares(self) -> set["Square"]:
-        controlled_squares = set()
-        directions = self.moving_directions()
-        for direction in directions:
-            square = self.square.next_square_in_direction(direction)
-            if square:
-                controlled_squares.add(square)
-        return controlled_squares
+        squares = self.square.position.squares
+        return {squares[index] for index in tables.KNIGHT_TARGETS[self.square.index]}
 
-    def moving_directions(self) -> set["Direction"]:
+    def moving_directions(self) -> frozenset["Direction"]:
         return Direction.knight_jumps()
 
 
 class Bishop(RecursiveControlledSquaresMixin, Piece):
+    __slots__ = ()
+    rays = tables.DIAGONAL_RAYS
+
     def __init__(self, color: str):
         super().__init__(color.lower(), "Bishop")
 
-    def moving_directions(self) -> set["Direction"]:
+    def moving_directions(self) -> frozenset["Direction"]:
         return Direction.diagonals()
 
 
 class Rook(RecursiveControlledSquaresMixin, Piece):
+    __slots__ = ()
+    rays = tables.STRAIGHT_RAYS
+
     def __init__(self, color: str):
         super().__init__(color.lower(), "Rook")
 
-    def moving_directions(self) -> set["Direction"]:
+    def moving_directions(self) -> frozenset["Direction"]:
         return Direction.straights()
 
 
 class Queen(RecursiveControlledSquaresMixin, Piece):
+    __slots__ = ()
+    rays = tables.LINE_RAYS
+
     def __init__(self, color: str):
         super().__init__(color.lower(), "Queen")
 
-    def moving_directions(self) -> set["Direction"]:
-        return Direction.diagonals() | Direction.straights()
+    def moving_directions(self) -> frozenset["Direction"]:
+        return Direction.lines()
 
 
 class King(Piece):
+    __slots__ = ()
+
     def __init__(self, color: str):
         super().__init__(color.lower(), "King")
 
     def controlled_squares(self) -> set["Square"]:
-        controlled_squares = set()
-        directions = self.moving_directions()
-        for direction in directions:
-            square = self.square.next_square_in_direction(direction)
-            if square:
-                controlled_squares.add(square)
-        return controlled_squares
+        squares = self.square.position.squares
+        return {squares[index] for index in tables.KING_TARGETS[self.square.index]}
 
     def moving_squares(self) -> set["Square"]:
         moving_squares = set()
@@ -172,5 +180,13 @@ class King(Piece):
                 moving_squares.add(square)
         return moving_squares
 
-    def moving_directions(self) -> set["Direction"]:
-        return Direction.diagonals() | Direction.straights()
\ No newline at end of file
+    def moving_directions(self) -> frozenset["Direction"]:
+        return Direction.lines()
+
+
+# Piece classes by type name, as used by Square.place
+PIECE_CLASSES: dict[str, type[Piece]] = {cls.__name__: cls for cls in (Pawn, Knight, Bishop, Rook, Queen, King)}
+
+PAWN_MOVING_DIRECTIONS = {"white": frozenset({Direction(0, 1)}), "black": frozenset({Direction(0, -1)})}
+PAWN_CAPTURING_DIRECTIONS = {"white": frozenset({Direction(1, 1), Direction(-1, 1)}),
+                             "black": frozenset({Direction(1, -1), Direction(-1, -1)})}
\ No newline at end of file
@@ -1,15 +1,44 @@
-from typing import Optional
+from collections import defaultdict
+from typing import Iterator, Optional
 
 from .directions import Direction
-from .move import Move
+from .move import Move, PIECE_NOTATIONS
+from .encoded_move import EncodedMove, MoveList
 from .square import Square
-from .pieces import Piece, King, RecursiveControlledSquaresMixin, Pawn
-from . import exceptions, utils
+from .pieces import Piece, King, Pawn, PIECE_CLASSES
+from . import exceptions, utils, zobrist, tables
+from .cache import legal_moves_cache
+
+
+# Piece types attacking along diagonal and straight rays
+DIAGONAL_SLIDERS = frozenset({"Bishop", "Queen"})
+STRAIGHT_SLIDERS = frozenset({"Rook", "Queen"})
+
+
+class UndoRecord:
+    # State lost when a move is pushed on a position, restored when it is popped
+    __slots__ = ("move", "castling_rights", "en_passant_target", "legal_moves", "zobrist_key", "halfmove_clock",
+                 "captured_piece", "captured_square")
+
+    def __init__(self, move: "Move", castling_rights: dict[str, bool], en_passant_target: Optional["Piece"], legal_moves: Optional[dict["Piece", set["Move"]]], zobrist_key: int, halfmove_clock: int):
+        self.move = move
+        self.castling_rights = castling_rights
+        self.en_passant_target = en_passant_target
+        self.legal_moves = legal_moves
+        self.zobrist_key = zobrist_key
+        self.halfmove_clock = halfmove_clock
+        self.captured_piece: Optional["Piece"] = None
+        self.captured_square: Optional["Square"] = None
 
 
 # State of the position
 class Position:
-    def __init__(self, pieces_input: list[list[str]] | dict[str, dict[str, set['Piece']]], whose_move: str = None, castling_rights: dict[str, bool] = None, en_passant_target=None):
+    __slots__ = ("whose_move", "not_turn_to_move", "castling_rights", "en_passant_target", "halfmove_clock", "fullmove_number",
+                 "square_by_name", "grid", "squares", "zobrist_key", "attack_counts", "pieces",
+                 "legal_moves_", "san_indexes_", "_san_indexes_moves", "undo_stack")
+
+    def __init__(self, pieces_input: list[list[str]] | dict[str, dict[str, set['Piece']]], whose_move: str = None, castling_rights: dict[str, bool] = None, en_passant_target=None, halfmove_clock: int = 0, fullmove_number: int = 1,
+                 attack_counts: dict[str, list[int]] = None):
         self.whose_move = whose_move
         self.not_turn_to_move = "black" if self.whose_move == "white" else "white"
         self.castling_rights = castling_rights or {
@@ -19,14 +48,21 @@ class Position:
             "black_queenside": True
         }
         self.en_passant_target: "Piece" = en_passant_target
-        # TO DO : Implement en_passant (last piece_who_moved)
+        # Plies since the last capture or pawn move, and number of the move being played (FEN counters)
+        self.halfmove_clock = halfmove_clock
+        self.fullmove_number = fullmove_number
 
         # Construct squares
         self.square_by_name: dict[str, "Square"]
         self.grid: list[list["Square"]]
         self.square_by_name, self.grid = self._build_squares()
+        # Flat access by square index, as used by the tables module
+        self.squares: list["Square"] = [self.grid[index & 7][index >> 3] for index in range(64)]
 
-        # Construct pieces from the input
+        # Construct pieces from the input, each placement updating the zobrist key
+        self.zobrist_key = 0
+        # Number of pieces of each color attacking each square index, built once all pieces are placed
+        self.attack_counts: Optional[dict[str, list[int]]] = None
         self.pieces: dict[str, dict[str, set[Piece]]] = self.pieces_initialize()
         if isinstance(pieces_input, list):
             self._initialize_pieces_from_list(pieces_input)
@@ -34,8 +70,94 @@ class Position:
             self._initialize_pieces_from_dict(pieces_input)
         else:
             raise ValueError("Invalid input type for Position. Expected List[List[str]] or Dict[str, Dict[str, Set[Piece]]]")
+        self.zobrist_key ^= zobrist.side_key(self.whose_move) ^ zobrist.castling_key(self.castling_rights) ^ zobrist.en_passant_key(self)
+        if attack_counts is None:
+            self._compute_attack_counts()
+        else:
+            # Counts of the position the pieces come from (make_move), the pieces bringing their attacked indices along
+            self.attack_counts = {color: counts.copy() for color, counts in attack_counts.items()}
 
         self.legal_moves_: dict["Piece", set["Move"]] = None
+        # Notation to move lookups by language, only valid for the legal_moves_ they were built from
+        self.san_indexes_: dict[str, dict[str, Move]] = {}
+        self._san_indexes_moves: Optional[dict["Piece", set["Move"]]] = None
+        self.undo_stack: list[UndoRecord] = []
+
+    @classmethod
+    def from_fen(cls, fen: str) -> "Position":
+        fields = fen.split()
+        if len(fields) not in (4, 6):
+            raise exceptions.InvalidFenError(fen, "expected 4 or 6 space separated fields")
+        placement, side, castling, en_passant = fields[:4]
+
+        # Placement is read into the list format of the constructor, rank 8 first
+        pieces_input = []
+        ranks = placement.split("/")
+        if len(ranks) != 8:
+            raise exceptions.InvalidFenError(fen, "expected 8 ranks")
+        for rank_index, rank in enumerate(ranks):
+            row_label = str(8 - rank_index)
+            column = 0
+            for char in rank:
+                if char.isdigit():
+                    column += int(char)
+                    continue
+                piece_type = utils.FEN_PIECE_TYPES.get(char.lower())
+                if not piece_type or column > 7:
+                    raise exceptions.InvalidFenError(fen, f"unexpected '{char}' in rank {row_label}")
+                pieces_input.append(["white" if char.isupper() else "black", piece_type, "abcdefgh"[column] + row_label])
+                column += 1
+            if column != 8:
+                raise exceptions.InvalidFenError(fen, f"rank {row_label} does not describe 8 squares")
+
+        if side not in ("w", "b"):
+            raise exceptions.InvalidFenError(fen, f"unknown side to move '{side}'")
+        if castling != "-" and not set(castling) <= set(utils.FEN_CASTLING_RIGHTS.values()):
+            raise exceptions.InvalidFenError(fen, f"unknown castling rights '{castling}'")
+        castling_rights = {right: letter in castling for right, letter in utils.FEN_CASTLING_RIGHTS.items()}
+        try:
+            halfmove_clock, fullmove_number = (int(fields[4]), int(fields[5])) if len(fields) == 6 else (0, 1)
+        except ValueError:
+            raise exceptions.InvalidFenError(fen, "move counters must be integers")
+
+        position = cls(pieces_input, whose_move="white" if side == "w" else "black", castling_rights=castling_rights,
+                       halfmove_clock=halfmove_clock, fullmove_number=fullmove_number)
+
+        # The en passant square is behind the pawn which has just moved two squares
+        if en_passant != "-":
+            if not utils.is_valid_square_string(en_passant) or en_passant[1] != ("6" if side == "w" else "3"):
+                raise exceptions.InvalidFenError(fen, f"invalid en passant square '{en_passant}'")
+            pawn = position.piece(en_passant[0] + ("5" if side == "w" else "4"))
+            if not pawn or pawn.type != "Pawn" or pawn.color != position.not_turn_to_move:
+                raise exceptions.InvalidFenError(fen, f"no pawn can be captured en passant on '{en_passant}'")
+            position.en_passant_target = pawn
+            position.zobrist_key ^= zobrist.en_passant_key(position)
+        return position
+
+    def to_fen(self) -> str:
+        ranks = []
+        for row in range(7, -1, -1):
+            rank = ""
+            empty_squares = 0
+            for column in range(8):
+                piece = self.grid[column][row].piece
+                if not piece:
+                    empty_squares += 1
+                    continue
+                if empty_squares:
+                    rank += str(empty_squares)
+                    empty_squares = 0
+                letter = utils.FEN_PIECE_LETTERS[piece.type]
+                rank += letter.upper() if piece.color == "white" else letter
+            ranks.append(rank + (str(empty_squares) if empty_squares else ""))
+
+        castling = "".join(letter for right, letter in utils.FEN_CASTLING_RIGHTS.items() if self.castling_rights.get(right)) or "-"
+        en_passant = "-"
+        if self.en_passant_target:
+            pawn_square = self.en_passant_target.square
+            en_passant = pawn_square.name[0] + str(pawn_square.row + (0 if self.en_passant_target.color == "white" else 2))
+        side = "w" if self.whose_move == "white" else "b"
+        return f"{'/'.join(ranks)} {side} {castling} {en_passant} {self.halfmove_clock} {self.fullmove_number}"
 
     def __str__(self):
         columns, rows = utils.generate_columns_rows()
@@ -73,9 +195,48 @@ class Position:
                 return False
         return True
 
-    def king_in_check(self, king: King) -> bool:
-        if king.square in self._controlled_squares(king.opposite_color):
+    def has_insufficient_material(self) -> bool:
+        # No mate is possible : bare kings, a single minor piece, or only bishops all standing on squares of one color
+        minor_pieces = []
+        for color in ("white", "black"):
+            if self.pieces[color]["Pawn"] or self.pieces[color]["Rook"] or self.pieces[color]["Queen"]:
+                return False
+            minor_pieces += [*self.pieces[color]["Knight"], *self.pieces[color]["Bishop"]]
+        if len(minor_pieces) <= 1:
             return True
+        return (all(piece.type == "Bishop" for piece in minor_pieces) and
+                len({(piece.square.column + piece.square.row) % 2 for piece in minor_pieces}) == 1)
+
+    def king_in_check(self, king: King) -> bool:
+        return self.is_square_attacked(king.square, king.opposite_color)
+
+    def is_square_attacked(self, square: str | Square, by_color: str) -> bool:
+        # Probes outward from the square: a piece of by_color attacks it if it stands where the same
+        # piece type standing on the square would attack it (pawns being looked up with the opposite color)
+        if isinstance(square, str):
+            square = self.square_by_name[square]
+        squares = self.squares
+        index = square.index
+        for target in tables.KNIGHT_TARGETS[index]:
+            piece = squares[target].piece
+            if piece and piece.type == "Knight" and piece.color == by_color:
+                return True
+        for target in tables.KING_TARGETS[index]:
+            piece = squares[target].piece
+            if piece and piece.type == "King" and piece.color == by_color:
+                return True
+        for target in tables.PAWN_ATTACKS["black" if by_color == "white" else "white"][index]:
+            piece = squares[target].piece
+            if piece and piece.type == "Pawn" and piece.color == by_color:
+                return True
+        for rays, slider_types in ((tables.DIAGONAL_RAYS[index], DIAGONAL_SLIDERS), (tables.STRAIGHT_RAYS[index], STRAIGHT_SLIDERS)):
+            for ray in rays:
+                for target in ray:
+                    piece = squares[target].piece
+                    if piece:
+                        if piece.color == by_color and piece.type in slider_types:
+                            return True
+                        break
         return False
 
     def _has_pawn_on_first_eighth_rank(self):
@@ -94,35 +255,39 @@ class Position:
         checking_pieces = set()
         intercepting_squares = None
         king = next(iter(self.pieces[self.whose_move]["King"]))
-        # Handling of Bishop, Rook, Queen checks and pins
-        for direction in Direction.diagonals() | Direction.straights():
-            squareset1, first_piece = king.square.explore_in_direction(direction)
-            if not first_piece:
-                continue
-            # Checks
-            if first_piece.color == king.opposite_color and isinstance(first_piece, RecursiveControlledSquaresMixin) and direction in first_piece.moving_directions():
-                checking_pieces.add(first_piece)
-                intercepting_squares = squareset1
-            # Pins
-            elif first_piece.color == king.color:
-                squareset2, second_piece = first_piece.square.explore_in_direction(direction)
-                if second_piece and second_piece.color == king.opposite_color and isinstance(second_piece, RecursiveControlledSquaresMixin) and direction in second_piece.moving_directions():
-                    pinned_pieces_squares_dict[first_piece] = (squareset1 | squareset2) - {first_piece.square} if direction in first_piece.moving_directions() else set()
-        # Handling of knight checks
-        for direction in Direction.knight_jumps():
-            square = king.square.next_square_in_direction(direction)
-            if square and square.piece and square.piece.type == "Knight" and square.piece.color == king.opposite_color:
-                checking_pieces.add(square.piece)
-                intercepting_squares = {square}
-        # Handling of pawn checks
-        pawn_checking_directions = {"white": {Direction(1, -1), Direction(1, 1)},
-                                    "black": {Direction(-1, -1), Direction(-1, 1)}
-                                    }
-        for direction in pawn_checking_directions[king.color]:
-            square = king.square.next_square_in_direction(direction)
-            if square and square.piece and square.piece.type == "Pawn" and square.piece.color == king.opposite_color:
-                checking_pieces.add(square.piece)
-                intercepting_squares = {square}
+        squares = self.squares
+        index = king.square.index
+        # Handling of Bishop, Rook, Queen checks and pins, walking the rays outward from the king
+        for rays, slider_types in ((tables.DIAGONAL_RAYS[index], DIAGONAL_SLIDERS), (tables.STRAIGHT_RAYS[index], STRAIGHT_SLIDERS)):
+            for ray in rays:
+                line = set()
+                first_piece = None
+                for target in ray:
+                    square = squares[target]
+                    line.add(square)
+                    piece = square.piece
+                    if not piece:
+                        continue
+                    if first_piece is None:
+                        # Checks
+                        if piece.color == king.opposite_color:
+                            if piece.type in slider_types:
+                                checking_pieces.add(piece)
+                                intercepting_squares = line
+                            break
+                        first_piece = piece
+                    else:
+                        # Pins : a pinned piece may only move along the pin line
+                        if piece.color == king.opposite_color and piece.type in slider_types:
+                            pinned_pieces_squares_dict[first_piece] = first_piece.moving_squares() & line
+                        break
+        # Handling of knight and pawn checks, using the same patterns as is_square_attacked
+        for targets, piece_type in ((tables.KNIGHT_TARGETS[index], "Knight"), (tables.PAWN_ATTACKS[king.color][index], "Pawn")):
+            for target in targets:
+                piece = squares[target].piece
+                if piece and piece.type == piece_type and piece.color == king.opposite_color:
+                    checking_pieces.add(piece)
+                    intercepting_squares = {squares[target]}
 
         # In case of double check, interception is not possible
         if len(checking_pieces) > 1:
@@ -131,9 +296,47 @@ class Position:
         return checking_pieces, intercepting_squares, pinned_pieces_squares_dict
 
     def compute_legal_moves(self) -> dict[Piece, set[Move]]:
-        if not self.is_valid_position():
-            self.legal_moves_ = {}
-        legal_moves = {}
+        # Exhausting the generator stores the legal moves
+        for _ in self.iter_legal_moves():
+            pass
+        return self.legal_moves_
+
+    def iter_legal_moves(self) -> Iterator[Move]:
+        # Lazily yields the legal moves: generation stops as soon as the caller stops iterating,
+        # and legal_moves_ is filled (and cached) only once every move has been yielded.
+        # Invalid positions have no legal moves, whatever the entry point.
+        if self.legal_moves_ is None:
+            # Positions already seen in the process (repeated or transposed) are rebuilt from the cache,
+            # only valid positions being stored in it
+            cached_descriptions = legal_moves_cache.get(self._legal_moves_cache_key())
+            if cached_descriptions is not None:
+                self.legal_moves_ = self._moves_from_descriptions(cached_descriptions)
+            elif not self.is_valid_position():
+                self.legal_moves_ = {}
+        if self.legal_moves_ is not None:
+            for moves in self.legal_moves_.values():
+                yield from moves
+            return
+
+        legal_moves = {piece: set() for piece_set in self.pieces[self.whose_move].values() for piece in piece_set}
+        for move in self._generate_legal_moves():
+            legal_moves[move.piece].add(move)
+            yield move
+        self.legal_moves_ = legal_moves
+        legal_moves_cache.put(self._legal_moves_cache_key(), self._describe_moves(legal_moves))
+
+    def has_legal_move(self) -> bool:
+        return next(self.iter_legal_moves(), None) is not None
+
+    def encoded_legal_moves(self) -> MoveList:
+        return MoveList.from_moves(self.iter_legal_moves())
+
+    def legal_moves_for(self, piece: Piece) -> set[Move]:
+        if self.legal_moves_ is None:
+            self.compute_legal_moves()
+        return self.legal_moves_.get(piece, set())
+
+    def _generate_legal_moves(self) -> Iterator[Move]:
         checking_pieces, intercepting_squares, pinned_pieces = self._explore_checks_and_pins()
         if len(checking_pieces) == 0:
             category = "no check"
@@ -141,52 +344,53 @@ class Position:
             category = "simple check"
         else:
             category = "double check"
-        for piece in (p for s in self.pieces[self.whose_move].values() for p in s):
+        # The pieces are listed up front since callers may push and pop moves between two yields
+        for piece in [p for s in self.pieces[self.whose_move].values() for p in s]:
             if isinstance(piece, King):
-                opposite_color_controlled_squares = self._controlled_squares(piece.opposite_color)
-                accessible_squares = piece.moving_squares() - opposite_color_controlled_squares
-                if accessible_squares:
-                    legal_moves[piece] = set()
+                opposite_attack_counts = self.attack_counts[piece.opposite_color]
+                forbidden_indices = self._squares_behind_king(piece, checking_pieces)
+                accessible_squares = {square for square in piece.moving_squares()
+                                      if not opposite_attack_counts[square.index] and square.index not in forbidden_indices}
                 for square in accessible_squares:
-                    legal_moves[piece].add(Move(self, piece, square))
+                    yield Move(self, piece, square)
                 # Castling moves
                 # Rule 1 : Can only be performed if the king is not in check
-                if self.king_in_check(piece):
+                if opposite_attack_counts[piece.square.index]:
                     continue
                 castling_rows = {"white": "1", "black": "8"}
                 rank = castling_rows[piece.color]
                 # Rule 2 : king and rook have to be on their starting squares and not have moved
-                if self.castling_rights.get(f"{piece.color}_kingside"):
+                if piece.square.name != f"e{rank}":
+                    continue
+                if self.castling_rights.get(f"{piece.color}_kingside") and self._is_own_rook(f"h{rank}", piece.color):
                     square_f_file = self.square(f"f{rank}")
                     square_g_file = self.square(f"g{rank}")
                     square_h_file = self.square(f"h{rank}")
                     # Rule 3 : Squares on the path have to be empty and not controlled by opposite color pieces
                     if (
                             not any(square.piece for square in [square_f_file, square_g_file]) and
-                            not any(square in opposite_color_controlled_squares for square in [square_f_file, square_g_file])
+                            not any(opposite_attack_counts[square.index] for square in [square_f_file, square_g_file])
                     ):
-                        legal_moves[piece].add(Move(self, piece, square_g_file, is_castling=True, rook_start=square_h_file, rook_end=square_f_file))
-                if self.castling_rights.get(f"{piece.color}_queenside"):
+                        yield Move(self, piece, square_g_file, is_castling=True, rook_start=square_h_file, rook_end=square_f_file)
+                if self.castling_rights.get(f"{piece.color}_queenside") and self._is_own_rook(f"a{rank}", piece.color):
                     square_a_file = self.square(f"a{rank}")
                     square_b_file = self.square(f"b{rank}")
                     square_c_file = self.square(f"c{rank}")
                     square_d_file = self.square(f"d{rank}")
+                    # The b-file square has to be empty but may be controlled, the king does not cross it
                     if (
                             not any(square.piece for square in [square_b_file, square_c_file, square_d_file]) and
-                            not any(square in opposite_color_controlled_squares for square in [square_b_file, square_c_file, square_d_file])
+                            not any(opposite_attack_counts[square.index] for square in [square_c_file, square_d_file])
                     ):
-                        legal_moves[piece].add(Move(self, piece, square_c_file, is_castling=True, rook_start=square_a_file, rook_end=square_d_file))
+                        yield Move(self, piece, square_c_file, is_castling=True, rook_start=square_a_file, rook_end=square_d_file)
                 continue
             if category == "double check":
-                legal_moves[piece] = set()
                 continue
             restricted_squares = pinned_pieces[piece] if piece in pinned_pieces.keys() else piece.moving_squares()
             if category == "no check":
                 accessible_squares = restricted_squares
             else:  # category == "simple check" -> Intercepting squares
                 accessible_squares = restricted_squares & intercepting_squares
-            if accessible_squares:
-                legal_moves[piece] = set()
             # Checking en passant
             if self.en_passant_target and isinstance(piece, Pawn):
                 # Keys : direction to check where the pawn previously pushed is
@@ -203,20 +407,74 @@ class Position:
                 for pawn_check_direction, capture_direction_dict in en_passant_directions.items():
                     potential_captured_pawn_square = piece.square.next_square_in_direction(pawn_check_direction)
                     if potential_captured_pawn_square and potential_captured_pawn_square == self.en_passant_target.square:
-                        legal_moves[piece].add(Move(self, piece, piece.square.next_square_in_direction(capture_direction_dict[piece.color]), is_en_passant=True))
+                        end_square = piece.square.next_square_in_direction(capture_direction_dict[piece.color])
+                        if self._is_en_passant_safe(piece, end_square):
+                            yield Move(self, piece, end_square, is_en_passant=True)
 
             for square in accessible_squares:
                 # Records two-pawn advances for en passant
                 if piece.type == "Pawn" and abs(piece.square.row - square.row) == 2:
-                    legal_moves[piece].add(Move(self, piece, square, is_two_pawn_move=True))
+                    yield Move(self, piece, square, is_two_pawn_move=True)
                 # Promotion of pawns
                 elif piece.type == "Pawn" and square.row in [0, 7]:
                     for string in ["Knight", "Bishop", "Rook", "Queen"]:
-                        legal_moves[piece].add(Move(self, piece, square, is_promotion=True, promoting_piece_str=string))
+                        yield Move(self, piece, square, is_promotion=True, promoting_piece_str=string)
                 else:
-                    legal_moves[piece].add(Move(self, piece, square))
+                    yield Move(self, piece, square)
 
-        self.legal_moves_ = legal_moves
+
+    def _legal_moves_cache_key(self) -> tuple[int, frozenset[str]]:
+        # Castling rights are part of the key since they can be edited directly, without updating the zobrist key
+        return self.zobrist_key, frozenset(right for right, enabled in self.castling_rights.items() if enabled)
+
+    @staticmethod
+    def _describe_moves(legal_moves: dict[Piece, set[Move]]) -> tuple[tuple, ...]:
+        # Square names and flags only, cached moves must not keep a reference to the position they were computed on
+        return tuple(
+            (move.start_square.name, move.end_square.name, move.is_castling,
+             move.rook_start.name if move.rook_start else None, move.rook_end.name if move.rook_end else None,
+             move.is_two_pawn_move, move.is_en_passant, move.is_promotion, move.promoting_piece_str)
+            for moves in legal_moves.values() for move in moves
+        )
+
+    def _moves_from_descriptions(self, descriptions: tuple[tuple, ...]) -> dict[Piece, set[Move]]:
+        legal_moves = {piece: set() for piece_set in self.pieces[self.whose_move].values() for piece in piece_set}
+        square_by_name = self.square_by_name
+        for start, end, is_castling, rook_start, rook_end, is_two_pawn_move, is_en_passant, is_promotion, promoting_piece_str in descriptions:
+            piece = square_by_name[start].piece
+            legal_moves[piece].add(Move(self, piece, square_by_name[end], is_castling=is_castling,
+                                        rook_start=square_by_name[rook_start] if rook_start else None,
+                                        rook_end=square_by_name[rook_end] if rook_end else None,
+                                        is_two_pawn_move=is_two_pawn_move, is_en_passant=is_en_passant,
+                                        is_promotion=is_promotion, promoting_piece_str=promoting_piece_str))
+        return legal_moves
+
+    @staticmethod
+    def _squares_behind_king(king: King, checking_pieces: set[Piece]) -> set[int]:
+        # The king hides these squares from the checking sliders' attacks, they become attacked once it steps there
+        indices = set()
+        for checking_piece in checking_pieces:
+            if checking_piece.type in DIAGONAL_SLIDERS | STRAIGHT_SLIDERS:
+                dcol = (king.square.column > checking_piece.square.column) - (king.square.column < checking_piece.square.column)
+                drow = (king.square.row > checking_piece.square.row) - (king.square.row < checking_piece.square.row)
+                column, row = king.square.column + dcol, king.square.row + drow
+                if 0 <= column < 8 and 0 <= row < 8:
+                    indices.add(row * 8 + column)
+        return indices
+
+    def _is_own_rook(self, square_name: str, color: str) -> bool:
+        rook = self.square_by_name[square_name].piece
+        return rook is not None and rook.type == "Rook" and rook.color == color
+
+    def _is_en_passant_safe(self, pawn: Pawn, end_square: "Square") -> bool:
+        # En passant removes two pawns from the board at once, which pins and checks detection cannot foresee:
+        # the capture is laid on the squares for the time of an attack probe from the king
+        king = next(iter(self.pieces[self.whose_move]["King"]))
+        captured_square = self.en_passant_target.square
+        pawn.square.piece, captured_square.piece, end_square.piece = None, None, pawn
+        is_safe = not self.is_square_attacked(king.square, king.opposite_color)
+        pawn.square.piece, captured_square.piece, end_square.piece = pawn, self.en_passant_target, None
+        return is_safe
 
     def _build_squares(self) -> tuple[dict[str, "Square"], list[list["Square"]]]:
         columns, rows = utils.generate_columns_rows()
@@ -269,7 +527,7 @@ class Position:
                 raise KeyError(f"Unsupported piece type(s): {set(pieces_input[color].keys()) - piece_types}")
             for piece_type, piece_set in pieces_input[color].items():
                 for piece in piece_set:
-                    self.place_piece(piece.color, piece.type, piece.square)
+                    self.place_piece(piece.color, piece.type, piece.square).attacked_indices = piece.attacked_indices
 
     def place_piece(self, color: str, piece_type: str, square: str | Square) -> Piece:
         if isinstance(square, str):
@@ -277,8 +535,16 @@ class Position:
         elif isinstance(square, Square):
             square = self.square_by_name[square.name]
         assert isinstance(square, Square), "Wrong argument type passed in Position.place_piece()"
+        # Checked before the attack maps are touched
+        if not utils.is_valid_color(color):
+            raise exceptions.InvalidColorError(color)
+        if piece_type not in PIECE_CLASSES:
+            raise exceptions.UnimplementedPieceTypeError(piece_type)
+        affected_sliders = self._retract_attacks_through([square.index])
         piece = square.place(color, piece_type)
         self.pieces[color][piece_type].add(piece)
+        self.zobrist_key ^= zobrist.piece_key(piece.color, piece.type, square.column, square.row)
+        self._restate_attacks(affected_sliders, piece)
         self.legal_moves_ = None
         return piece
 
@@ -289,7 +555,13 @@ class Position:
             square = self.square_by_name[square.name]
         assert isinstance(square, Square), "Wrong argument type passed in Position.remove_piece()"
         self.legal_moves_ = None
-        return square.remove_piece()
+        if not square.piece:
+            return square.remove_piece()
+        self.zobrist_key ^= zobrist.piece_key(square.piece.color, square.piece.type, square.column, square.row)
+        affected_sliders = self._retract_attacks_through([square.index], square.piece)
+        removed = square.remove_piece()
+        self._restate_attacks(affected_sliders)
+        return removed
 
     def square(self, key: str | list | tuple) -> Optional["Square"]:
         # Returns None if the label or indices point at a square not in the grid.
@@ -323,7 +595,10 @@ class Position:
             assert move_or_notation.is_legal_move(), "Illegal move passed to make_move()"
             ###Castling rights update
             updated_castling_rights = self._update_castling_rights(move_or_notation)
-            new_position = Position(self.pieces, whose_move=self.not_turn_to_move, castling_rights=updated_castling_rights)
+            new_position = Position(self.pieces, whose_move=self.not_turn_to_move, castling_rights=updated_castling_rights,
+                                    halfmove_clock=self._next_halfmove_clock(move_or_notation),
+                                    fullmove_number=self.fullmove_number + (self.whose_move == "black"),
+                                    attack_counts=self.attack_counts)
             # Step 1 : Remove the moved piece from its original square
             new_position.remove_piece(move_or_notation.start_square)
             # Step 2 : Remove captured piece if there is one
@@ -342,6 +617,7 @@ class Position:
                 new_position.place_piece(move_or_notation.piece.color, "Rook", move_or_notation.rook_end)
             if move_or_notation.is_two_pawn_move:
                 new_position.en_passant_target = piece
+                new_position.zobrist_key ^= zobrist.en_passant_key(new_position)
 
             move_or_notation.base_notation = move_or_notation.compute_base_notation(language=language)
             # Append + sign if check identified
@@ -351,33 +627,234 @@ class Position:
             return new_position, move_or_notation
 
         if isinstance(move_or_notation, str):
-            # Normalize incoming notation (remove + or #)
-            normalized_input = move_or_notation.rstrip("+#")
-
-            legal_moves = self.legal_moves_
-
-            for piece, moves in legal_moves.items():
-                for move in moves:
-                    base_notation = move.compute_base_notation(language)
-                    if base_notation == normalized_input:
-                        return self.make_move(move, language)
-
-            raise ValueError(f"No legal move matches notation '{move_or_notation}' in {language}")
+            return self.make_move(self.move_from_notation(move_or_notation, language), language)
+
+    def move_from_notation(self, notation: str, language="English") -> Move:
+        # Check, mate and annotation signs are not part of the index keys
+        move = self.san_index(language).get(notation.rstrip("+#!?"))
+        if move is None:
+            raise ValueError(f"No legal move matches notation '{notation}' in {language}")
+        return move
+
+    def san_index(self, language="English") -> dict[str, Move]:
+        if self.legal_moves_ is None:
+            self.compute_legal_moves()
+        if self._san_indexes_moves is not self.legal_moves_:
+            self.san_indexes_ = {}
+            self._san_indexes_moves = self.legal_moves_
+        index = self.san_indexes_.get(language)
+        if index is None:
+            index = self.san_indexes_[language] = self._build_san_index(language)
+        return index
+
+    def legal_move_notations(self, language="English", with_suffixes=False) -> list[tuple[Move, str]]:
+        # Notation of every legal move in one pass : moves are grouped by piece type and end square,
+        # so disambiguation only looks at the moves of the same group.
+        # Check and mate suffixes need the move to be played, they are only added when asked for.
+        if self.legal_moves_ is None:
+            self.compute_legal_moves()
+        groups: dict[tuple[str, Square], list[Move]] = defaultdict(list)
+        for moves in self.legal_moves_.values():
+            for move in moves:
+                groups[(move.piece.type, move.end_square)].append(move)
+
+        notations = []
+        for moves in groups.values():
+            for move in moves:
+                conflicting_pieces = [other.piece for other in moves if other.piece is not move.piece]
+                notation = move.compute_base_notation(language, conflicting_pieces)
+                if with_suffixes:
+                    notation += "#" if move.gives_checkmate() else "+" if move.gives_check() else ""
+                notations.append((move, notation))
+        return notations
+
+    def _build_san_index(self, language: str) -> dict[str, Move]:
+        letters = PIECE_NOTATIONS.get(language, PIECE_NOTATIONS["English"])
+        index: dict[str, Move] = {}
+        # Alias to move, None once an alias turns out to match several moves
+        aliases: dict[str, Optional[Move]] = {}
+        for move, notation in self.legal_move_notations(language):
+            index[notation] = move
+            # Tolerated variants : castling with zeros, promotion without '=', any amount of disambiguation
+            if move.is_castling:
+                variants = [notation.replace("O", "0")]
+            elif move.is_promotion:
+                variants = [notation.replace("=", "")]
+            elif move.piece.type != "Pawn":
+                capture = "x" if move.is_capture() else ""
+                start = move.start_square.name
+                variants = [letters[move.piece.type] + disambiguation + capture + move.end_square.name
+                            for disambiguation in ("", start[0], start[1], start)]
+            else:
+                continue
+            for alias in variants:
+                aliases[alias] = move if aliases.get(alias, move) is move else None
+        for alias, move in aliases.items():
+            if move is not None and alias not in index:
+                index[alias] = move
+        return index
+
+    def push(self, move_or_notation: Move | EncodedMove | str, language="English", keep_legal_moves=True) -> Move:
+        # Applies the move in place, pieces keep their identity and only the squares involved are touched.
+        # Without keep_legal_moves the undo record does not hold the legal moves, they are generated again after pop
+        if isinstance(move_or_notation, str):
+            move = self.move_from_notation(move_or_notation, language)
+        elif isinstance(move_or_notation, EncodedMove):
+            move = move_or_notation.to_move(self)
+        else:
+            move = move_or_notation
+            assert move.former_position is self and move.is_legal_move(), "Illegal move passed to push()"
+        record = UndoRecord(move, self.castling_rights, self.en_passant_target, self.legal_moves_ if keep_legal_moves else None,
+                            self.zobrist_key, self.halfmove_clock)
+        self.halfmove_clock = self._next_halfmove_clock(move)
+        self.fullmove_number += self.whose_move == "black"
+        self.zobrist_key ^= zobrist.en_passant_key(self)
+        # The undo record holds the current rights, they are only copied when the move loses one
+        lost_rights = self._lost_castling_rights(move)
+        if lost_rights:
+            self.zobrist_key ^= zobrist.castling_key(self.castling_rights)
+            self.castling_rights = self._update_castling_rights(move, lost_rights)
+            self.zobrist_key ^= zobrist.castling_key(self.castling_rights)
+
+        # Step 1 : Remove captured piece if there is one
+        if move.is_en_passant:
+            record.captured_square = self.en_passant_target.square
+        elif move.end_square.piece:
+            record.captured_square = move.end_square
+        if record.captured_square:
+            record.captured_piece = record.captured_square.piece
+            self.remove_piece(record.captured_square)
+        # Step 2 : Move the piece, a promoted pawn being replaced by a new piece
+        if move.is_promotion:
+            self.remove_piece(move.start_square)
+            self.place_piece(move.piece.color, move.promoting_piece_str, move.end_square)
+        else:
+            self._relocate_piece(move.piece, move.end_square)
+        if move.is_castling:
+            self._relocate_piece(move.rook_start.piece, move.rook_end)
 
-    def _update_castling_rights(self, move: "Move") -> dict:
-        updated_castling_rights = self.castling_rights.copy()
+        self.en_passant_target = move.piece if move.is_two_pawn_move else None
+        self.whose_move, self.not_turn_to_move = self.not_turn_to_move, self.whose_move
+        self.zobrist_key ^= zobrist.BLACK_TO_MOVE_KEY ^ zobrist.en_passant_key(self)
+        self.legal_moves_ = None
+        self.undo_stack.append(record)
+        return move
+
+    def pop(self) -> Move:
+        # Takes back the last pushed move
+        record = self.undo_stack.pop()
+        move = record.move
+        if move.is_castling:
+            self._relocate_piece(move.rook_end.piece, move.rook_start)
+        if move.is_promotion:
+            self.remove_piece(move.end_square)
+            self._restore_piece(move.piece, move.start_square)
+        else:
+            self._relocate_piece(move.piece, move.start_square)
+        if record.captured_piece:
+            self._restore_piece(record.captured_piece, record.captured_square)
+
+        self.whose_move, self.not_turn_to_move = self.not_turn_to_move, self.whose_move
+        self.castling_rights = record.castling_rights
+        self.en_passant_target = record.en_passant_target
+        self.legal_moves_ = record.legal_moves
+        self.zobrist_key = record.zobrist_key
+        self.halfmove_clock = record.halfmove_clock
+        self.fullmove_number -= self.whose_move == "black"
+        return move
+
+    def _relocate_piece(self, piece: Piece, square: Square):
+        # Pieces hash on their square: the piece leaves its set while it moves
+        piece_set = self.pieces[piece.color][piece.type]
+        piece_set.remove(piece)
+        self.zobrist_key ^= zobrist.piece_key(piece.color, piece.type, piece.square.column, piece.square.row) ^ zobrist.piece_key(piece.color, piece.type, square.column, square.row)
+        affected_sliders = self._retract_attacks_through([piece.square.index, square.index], piece)
+        piece.square.piece = None
+        piece.square = square
+        square.piece = piece
+        piece_set.add(piece)
+        self._restate_attacks(affected_sliders, piece)
+
+    def _restore_piece(self, piece: Piece, square: Square):
+        affected_sliders = self._retract_attacks_through([square.index])
+        piece.square = square
+        square.piece = piece
+        self.pieces[piece.color][piece.type].add(piece)
+        self.zobrist_key ^= zobrist.piece_key(piece.color, piece.type, square.column, square.row)
+        self._restate_attacks(affected_sliders, piece)
+
+    def _compute_attack_counts(self):
+        self.attack_counts = {"white": [0] * 64, "black": [0] * 64}
+        for piece in self.all_pieces:
+            self._add_attacks(piece)
+
+    def _add_attacks(self, piece: Piece):
+        piece.attacked_indices = tuple(square.index for square in piece.controlled_squares())
+        counts = self.attack_counts[piece.color]
+        for index in piece.attacked_indices:
+            counts[index] += 1
+
+    def _subtract_attacks(self, piece: Piece):
+        counts = self.attack_counts[piece.color]
+        for index in piece.attacked_indices:
+            counts[index] -= 1
+        piece.attacked_indices = ()
+
+    def _retract_attacks_through(self, indices: list[int], moving_piece: Piece = None) -> list[Piece]:
+        # Before the occupancy of the squares changes: withdraws the attacks of the moving piece and of the
+        # sliders whose lines reach the squares, the only pieces whose attacks can change.
+        # Returns the sliders, whose attacks are restated once the board has changed
+        if self.attack_counts is None:
+            return []
+        squares = self.squares
+        affected_sliders = {}
+        for index in indices:
+            for rays, slider_types in ((tables.DIAGONAL_RAYS[index], DIAGONAL_SLIDERS), (tables.STRAIGHT_RAYS[index], STRAIGHT_SLIDERS)):
+                for ray in rays:
+                    for target in ray:
+                        piece = squares[target].piece
+                        if piece:
+                            if piece.type in slider_types and piece is not moving_piece:
+                                affected_sliders[id(piece)] = piece
+                            break
+        for piece in affected_sliders.values():
+            self._subtract_attacks(piece)
+        if moving_piece:
+            self._subtract_attacks(moving_piece)
+        return list(affected_sliders.values())
+
+    def _restate_attacks(self, affected_sliders: list[Piece], placed_piece: Piece = None):
+        if self.attack_counts is None:
+            return
+        for piece in affected_sliders:
+            self._add_attacks(piece)
+        if placed_piece:
+            self._add_attacks(placed_piece)
+
+    def _next_halfmove_clock(self, move: "Move") -> int:
+        return 0 if move.piece.type == "Pawn" or move.is_capture() else self.halfmove_clock + 1
+
+    def _lost_castling_rights(self, move: "Move") -> list[str]:
+        # Enabled rights the move disables
         starting_rook_squares = {"h1": "white_kingside",
                                  "a1": "white_queenside",
                                  "h8": "black_kingside",
                                  "a8": "black_queenside"}
+        lost_rights = []
         # Rule 1 : King moves, both kingside and queenside castles are disabled for the corresponding color
         if move.piece.type == "King":
-            updated_castling_rights[f"{move.piece.color}_kingside"] = False
-            updated_castling_rights[f"{move.piece.color}_queenside"] = False
+            lost_rights += [f"{move.piece.color}_kingside", f"{move.piece.color}_queenside"]
         # Rule 2 : Rook moves from its starting square, corresponding castle is disabled
         if move.piece.type == "Rook" and move.start_square.name in starting_rook_squares.keys():
-            updated_castling_rights[starting_rook_squares[move.start_square.name]] = False
+            lost_rights.append(starting_rook_squares[move.start_square.name])
         # Rule 3 : Any piece ends its turn on one of the rook starting squares, corresponding castle is disabled
         if move.end_square.name in starting_rook_squares.keys():
-            updated_castling_rights[starting_rook_squares[move.end_square.name]] = False
+            lost_rights.append(starting_rook_squares[move.end_square.name])
+        return [right for right in lost_rights if self.castling_rights.get(right)]
+
+    def _update_castling_rights(self, move: "Move", lost_rights: list[str] = None) -> dict:
+        # Always a new dictionary : rights may be edited in place, a child position must not share its parent's
+        updated_castling_rights = self.castling_rights.copy()
+        for right in self._lost_castling_rights(move) if lost_rights is None else lost_rights:
+            updated_castling_rights[right] = False
         return updated_castling_rights
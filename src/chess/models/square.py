@@ -1,5 +1,4 @@
-from . import utils, exceptions, pieces
-import inspect
+from . import utils, exceptions, pieces, tables
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -7,10 +6,13 @@ if TYPE_CHECKING:
     from .directions import Direction
 
 class Square:
+    __slots__ = ("column", "row", "index", "name", "position", "piece")
+
     def __init__(self, string_square: str, position: "Position"):
         if not utils.is_valid_square_string(string_square):
             raise ValueError(f"Invalid square label: {string_square}")
         self.column, self.row = utils.label_to_indices(string_square)
+        self.index = utils.label_to_index(string_square)
         self.name = string_square
         self.position = position
         self.piece = None
@@ -33,14 +35,7 @@ class Square:
         return hash(self.name)
 
     def place(self, color_string, piece_string) -> "pieces.Piece":
-        piece_string_to_cls = {
-            name: cls
-            for name, cls in vars(pieces).items()
-            if inspect.isclass(cls)
-               and issubclass(cls, pieces.Piece)
-               and not inspect.isabstract(cls)
-        }
-        piece_cls = piece_string_to_cls.get(piece_string)
+        piece_cls = pieces.PIECE_CLASSES.get(piece_string)
         if not piece_cls:
             raise exceptions.UnimplementedPieceTypeError(piece_string)
 
@@ -62,18 +57,20 @@ class Square:
         return True
 
     def next_square_in_direction(self, direction: "Direction") -> "Square":
-        return self.position.square([self.column + direction.dcol, self.row + direction.drow])
+        column, row = self.column + direction.dcol, self.row + direction.drow
+        if 0 <= column < 8 and 0 <= row < 8:
+            return self.position.grid[column][row]
+        return None
 
     def explore_in_direction(self, direction: "Direction") -> tuple[set["Square"], "pieces.Piece"]:
         squares: set["Square"] = set()
-        square = self.next_square_in_direction(direction)
-        while square:
+        position_squares = self.position.squares
+        blocking_piece = None
+        for index in tables.RAYS[self.index][direction]:
+            square = position_squares[index]
             squares.add(square)
             if square.piece:
                 blocking_piece = square.piece
                 break
-            square = square.next_square_in_direction(direction)
-        else:
-            blocking_piece = None
 
         return squares, blocking_piece
\ No newline at end of file
@@ -0,0 +1,41 @@
+from .directions import Direction
+
+# Per-square tables built once at import. Squares are indexed by row * 8 + column (a1 = 0, h8 = 63)
+# and tables hold indices, which Position.squares turns into the Square objects of a given position.
+
+
+def _step_targets(directions: frozenset[Direction]) -> list[tuple[int, ...]]:
+    targets = []
+    for index in range(64):
+        column, row = index & 7, index >> 3
+        targets.append(tuple(
+            (row + direction.drow) * 8 + column + direction.dcol
+            for direction in directions
+            if 0 <= column + direction.dcol < 8 and 0 <= row + direction.drow < 8
+        ))
+    return targets
+
+
+def _ray(index: int, direction: Direction) -> tuple[int, ...]:
+    # Squares met when moving away from index in the direction, ordered from the closest
+    column, row = (index & 7) + direction.dcol, (index >> 3) + direction.drow
+    ray = []
+    while 0 <= column < 8 and 0 <= row < 8:
+        ray.append(row * 8 + column)
+        column, row = column + direction.dcol, row + direction.drow
+    return tuple(ray)
+
+
+KNIGHT_TARGETS = _step_targets(Direction.knight_jumps())
+KING_TARGETS = _step_targets(Direction.lines())
+# Squares attacked by a pawn of the given color standing on the index square
+PAWN_ATTACKS = {"white": _step_targets(frozenset({Direction(-1, 1), Direction(1, 1)})),
+                "black": _step_targets(frozenset({Direction(-1, -1), Direction(1, -1)}))}
+# Square in front of a pawn of the given color, None on the last row
+PAWN_PUSHES = {"white": [index + 8 if index < 56 else None for index in range(64)],
+               "black": [index - 8 if index >= 8 else None for index in range(64)]}
+
+RAYS: list[dict[Direction, tuple[int, ...]]] = [{direction: _ray(index, direction) for direction in Direction.lines()} for index in range(64)]
+DIAGONAL_RAYS = [tuple(RAYS[index][direction] for direction in Direction.diagonals() if RAYS[index][direction]) for index in range(64)]
+STRAIGHT_RAYS = [tuple(RAYS[index][direction] for direction in Direction.straights() if RAYS[index][direction]) for index in range(64)]
+LINE_RAYS = [DIAGONAL_RAYS[index] + STRAIGHT_RAYS[index] for index in range(64)]
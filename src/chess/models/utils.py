@@ -34,6 +34,13 @@ def starting_position():
             ]
 
 
+# FEN letters (lower case) of each piece type and castling right
+FEN_PIECE_TYPES = {"p": "Pawn", "n": "Knight", "b": "Bishop", "r": "Rook", "q": "Queen", "k": "King"}
+FEN_PIECE_LETTERS = {piece_type: letter for letter, piece_type in FEN_PIECE_TYPES.items()}
+FEN_CASTLING_RIGHTS = {"white_kingside": "K", "white_queenside": "Q", "black_kingside": "k", "black_queenside": "q"}
+STARTING_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+
 def generate_columns_rows():
     return list("abcdefgh"), [str(i) for i in range(1, 9)]
 
@@ -58,3 +65,13 @@ def label_to_indices(label):
     col = ord(label[0]) - ord('a')
     row = int(label[1]) - 1
     return col, row
+
+
+# Square indices as used by the tables, bitboards and move codes : row * 8 + column, a1 = 0 and h8 = 63
+def label_to_index(label: str) -> int:
+    column, row = label_to_indices(label)
+    return row * 8 + column
+
+
+def index_to_label(index: int) -> str:
+    return "abcdefgh"[index & 7] + str((index >> 3) + 1)
@@ -0,0 +1,54 @@
+import random
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .position import Position
+
+# Fixed seed : keys are identical from one process to another, so they can be stored or shared between workers
+_generator = random.Random(20240901)
+
+PIECE_KEYS: dict[str, dict[str, list[int]]] = {
+    color: {piece_type: [_generator.getrandbits(64) for _ in range(64)]
+            for piece_type in ("Pawn", "Knight", "Bishop", "Rook", "Queen", "King")}
+    for color in ("white", "black")
+}
+BLACK_TO_MOVE_KEY = _generator.getrandbits(64)
+CASTLING_KEYS = {right: _generator.getrandbits(64) for right in ("white_kingside", "white_queenside", "black_kingside", "black_queenside")}
+EN_PASSANT_FILE_KEYS = [_generator.getrandbits(64) for _ in range(8)]
+
+
+def piece_key(color: str, piece_type: str, column: int, row: int) -> int:
+    return PIECE_KEYS[color][piece_type][row * 8 + column]
+
+
+def side_key(whose_move: str) -> int:
+    return BLACK_TO_MOVE_KEY if whose_move == "black" else 0
+
+
+def castling_key(castling_rights: dict[str, bool]) -> int:
+    key = 0
+    for right, enabled in castling_rights.items():
+        if enabled:
+            key ^= CASTLING_KEYS[right]
+    return key
+
+
+def en_passant_key(position: "Position") -> int:
+    # Only hashed when an opposite pawn stands next to the target, so that transpositions get the same key
+    target = position.en_passant_target
+    if not target or not target.square:
+        return 0
+    column, row = target.square.column, target.square.row
+    for dcol in (-1, 1):
+        neighbour = position.piece([column + dcol, row])
+        if neighbour and neighbour.type == "Pawn" and neighbour.color != target.color:
+            return EN_PASSANT_FILE_KEYS[column]
+    return 0
+
+
+def compute_key(position: "Position") -> int:
+    # Full computation, Position keeps its zobrist_key up to date incrementally
+    key = side_key(position.whose_move) ^ castling_key(position.castling_rights) ^ en_passant_key(position)
+    for piece in position.all_pieces:
+        key ^= piece_key(piece.color, piece.type, piece.square.column, piece.square.row)
+    return key
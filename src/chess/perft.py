@@ -0,0 +1,176 @@
+import argparse
+import time
+
+from .models.cache import legal_moves_cache
+from .models.bitboard import BitboardPosition
+from .models.move import Move
+from .models.position import Position
+from .models import utils
+
+# Reference positions with their known node counts, expected[i] being the count at depth i + 1
+PERFT_POSITIONS = {
+    "start": {
+        "fen": utils.STARTING_FEN,
+        "expected": [20, 400, 8902, 197281, 4865609],
+    },
+    "kiwipete": {
+        "fen": "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+        "expected": [48, 2039, 97862, 4085603],
+    },
+    "position_3": {
+        "fen": "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+        "expected": [14, 191, 2812, 43238, 674624],
+    },
+    "position_4": {
+        "fen": "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+        "expected": [6, 264, 9467, 422333],
+    },
+    "position_5": {
+        "fen": "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+        "expected": [44, 1486, 62379, 2103487],
+    },
+}
+
+
+def build_position(name: str) -> Position:
+    return Position.from_fen(PERFT_POSITIONS[name]["fen"])
+
+
+def coordinate_label(start_square_name: str, end_square_name: str, promoting_piece_str: str = None) -> str:
+    # Coordinate notation (e.g. e7e8q), so that divide outputs can be compared with other engines
+    label = start_square_name + end_square_name
+    if promoting_piece_str:
+        label += "n" if promoting_piece_str == "Knight" else promoting_piece_str[0].lower()
+    return label
+
+
+def move_label(move: Move) -> str:
+    return coordinate_label(move.start_square.name, move.end_square.name, move.promoting_piece_str)
+
+
+def perft(position: Position, depth: int) -> int:
+    # Counts the leaf nodes of the legal moves tree, driving the position the same way Game does
+    if depth == 0:
+        return 1
+    position.compute_legal_moves()
+    if depth == 1:
+        return sum(len(moves) for moves in position.legal_moves_.values())
+    nodes = 0
+    for moves in position.legal_moves_.values():
+        for move in moves:
+            new_position = position.make_move(move)[0]
+            nodes += perft(new_position, depth - 1)
+    return nodes
+
+
+def divide(position: Position, depth: int) -> dict[str, int]:
+    # Node count below each root move
+    position.compute_legal_moves()
+    result = {}
+    for moves in position.legal_moves_.values():
+        for move in moves:
+            new_position = position.make_move(move)[0]
+            result[move_label(move)] = perft(new_position, depth - 1)
+    return dict(sorted(result.items()))
+
+
+def push_perft(position: Position, depth: int) -> int:
+    # Same count walking a single position with push/pop instead of building a new one per move
+    if depth == 0:
+        return 1
+    position.compute_legal_moves()
+    if depth == 1:
+        return sum(len(moves) for moves in position.legal_moves_.values())
+    nodes = 0
+    for moves in list(position.legal_moves_.values()):
+        for move in moves:
+            position.push(move)
+            nodes += push_perft(position, depth - 1)
+            position.pop()
+    return nodes
+
+
+def push_divide(position: Position, depth: int) -> dict[str, int]:
+    position.compute_legal_moves()
+    result = {}
+    for moves in list(position.legal_moves_.values()):
+        for move in moves:
+            position.push(move)
+            result[move_label(move)] = push_perft(position, depth - 1)
+            position.pop()
+    return dict(sorted(result.items()))
+
+
+def bitboard_perft(position: BitboardPosition, depth: int) -> int:
+    if depth == 0:
+        return 1
+    moves = position.legal_moves()
+    if depth == 1:
+        return len(moves)
+    return sum(bitboard_perft(position.make_move(move), depth - 1) for move in moves)
+
+
+def bitboard_divide(position: BitboardPosition, depth: int) -> dict[str, int]:
+    result = {}
+    for move in position.legal_moves():
+        start, end, promoting_piece_str = move
+        label = coordinate_label(utils.index_to_label(start), utils.index_to_label(end), promoting_piece_str)
+        result[label] = bitboard_perft(position.make_move(move), depth - 1)
+    return dict(sorted(result.items()))
+
+
+def run(name: str, depth: int, show_divide: bool = False, bitboard: bool = False, push: bool = False) -> bool:
+    position = build_position(name)
+    if bitboard:
+        position = BitboardPosition.from_position(position)
+        perft_function, divide_function = bitboard_perft, bitboard_divide
+    elif push:
+        perft_function, divide_function = push_perft, push_divide
+    else:
+        perft_function, divide_function = perft, divide
+    start = time.perf_counter()
+    if show_divide:
+        breakdown = divide_function(position, depth)
+        nodes = sum(breakdown.values())
+    else:
+        breakdown = {}
+        nodes = perft_function(position, depth)
+    elapsed = time.perf_counter() - start
+
+    for label, count in breakdown.items():
+        print(f"{label}: {count}")
+    nodes_per_second = nodes / elapsed if elapsed > 0 else float("inf")
+    print(f"{name} depth {depth}: {nodes} nodes in {elapsed:.3f}s ({nodes_per_second:,.0f} nodes/s)")
+
+    expected = PERFT_POSITIONS[name]["expected"]
+    if depth <= len(expected) and nodes != expected[depth - 1]:
+        print(f"MISMATCH: expected {expected[depth - 1]} nodes")
+        return False
+    return True
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m chess.perft", description="Counts move generation leaf nodes to a given depth")
+    parser.add_argument("depth", type=int, help="search depth in plies")
+    parser.add_argument("-p", "--position", choices=[*PERFT_POSITIONS, "all"], default="start",
+                        help="reference position to start from (default: start)")
+    parser.add_argument("-d", "--divide", action="store_true", help="print the node count below each root move")
+    parser.add_argument("-b", "--bitboard", action="store_true", help="use the bitboard move generator instead of Position")
+    parser.add_argument("--push", action="store_true", help="walk the tree with Position.push/pop instead of make_move")
+    parser.add_argument("--cache-size", type=int, default=0,
+                        help="capacity of the legal moves cache (default: 0, disabled so that move generation itself is measured)")
+    args = parser.parse_args(argv)
+    legal_moves_cache.clear()
+    legal_moves_cache.resize(args.cache_size)
+
+    names = list(PERFT_POSITIONS) if args.position == "all" else [args.position]
+    success = True
+    for name in names:
+        success = run(name, args.depth, args.divide, args.bitboard, args.push) and success
+    if args.cache_size:
+        print(f"legal moves cache: {legal_moves_cache.stats()}")
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
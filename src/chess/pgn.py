@@ -0,0 +1,220 @@
+import argparse
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, Optional, TextIO
+
+from .models import exceptions
+from .models.position import Position
+from .models import utils
+
+RESULT_TOKENS = {"1-0", "0-1", "1/2-1/2", "*"}
+
+_TAG_PAIR = re.compile(r'^\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]\s*$')
+# Comments, variation brackets, NAGs and everything else separated by white space
+_MOVETEXT_TOKENS = re.compile(r"\{[^}]*\}|;[^\n]*|\(|\)|\$\d+|[^\s{}();]+")
+_MOVE_NUMBER = re.compile(r"^\d+\.*")
+_ANNOTATION_SUFFIX = re.compile(r"[!?]+$")
+
+
+class PgnGame:
+    # One game of a PGN file : tag pairs, main line SAN moves and the result token
+    def __init__(self, headers: dict[str, str], moves: list[str], result: Optional[str] = None):
+        self.headers = headers
+        self.moves = moves
+        self.result = result
+
+    def __repr__(self):
+        return f"PgnGame({self.headers.get('White', '?')} - {self.headers.get('Black', '?')}, {len(self.moves)} plies)"
+
+    def starting_position(self) -> Position:
+        fen = self.headers.get("FEN")
+        if fen:
+            return Position.from_fen(fen)
+        return Position(utils.starting_position(), whose_move="white")
+
+
+class GameValidation:
+    # Replay outcome of one game, failed_ply being the 1-based ply of the first move which could not be played
+    def __init__(self, index: int, headers: dict[str, str], plies: int, failed_ply: Optional[int] = None,
+                 error: Optional[str] = None, final_fen: Optional[str] = None):
+        self.index = index
+        self.headers = headers
+        self.plies = plies
+        self.failed_ply = failed_ply
+        self.error = error
+        self.final_fen = final_fen
+
+    @property
+    def is_valid(self) -> bool:
+        return self.error is None
+
+    def __repr__(self):
+        if self.is_valid:
+            return f"GameValidation(#{self.index}, valid, {self.plies} plies)"
+        return f"GameValidation(#{self.index}, invalid at ply {self.failed_ply}: {self.error})"
+
+
+def normalize_san(san: str) -> str:
+    # PGN specific decorations are removed, check and mate signs are handled by Position.move_from_notation
+    san = _ANNOTATION_SUFFIX.sub("", san)
+    return san.replace("0-0-0", "O-O-O").replace("0-0", "O-O")
+
+
+def parse_movetext(movetext: str) -> tuple[list[str], Optional[str]]:
+    # Main line moves only : comments, NAGs, move numbers and variations are skipped
+    moves = []
+    result = None
+    variation_depth = 0
+    for token in _MOVETEXT_TOKENS.findall(movetext):
+        if token == "(":
+            variation_depth += 1
+        elif token == ")":
+            variation_depth = max(variation_depth - 1, 0)
+        elif variation_depth or token[0] in "{;$":
+            continue
+        elif token in RESULT_TOKENS:
+            result = token
+        else:
+            # Move numbers can be glued to the move (e.g. 12.Nf3 or 12...Nf3)
+            move = _MOVE_NUMBER.sub("", token)
+            if move:
+                moves.append(move)
+    return moves, result
+
+
+def read_games(source: str | os.PathLike | TextIO) -> Iterator[PgnGame]:
+    # Games are yielded one at a time, only the lines of the game being read are kept in memory
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding="utf-8", errors="replace") as stream:
+            yield from read_games(stream)
+        return
+
+    headers: dict[str, str] = {}
+    movetext_lines: list[str] = []
+    for line in source:
+        stripped = line.strip()
+        # Escape lines are reserved for external tools
+        if line.startswith("%"):
+            continue
+        tag_pair = _TAG_PAIR.match(stripped)
+        if tag_pair:
+            # A tag pair after some movetext starts the next game
+            if movetext_lines:
+                yield _build_game(headers, movetext_lines)
+                headers, movetext_lines = {}, []
+            headers[tag_pair.group(1)] = tag_pair.group(2).replace('\\"', '"').replace("\\\\", "\\")
+        elif stripped:
+            movetext_lines.append(stripped)
+    if headers or movetext_lines:
+        yield _build_game(headers, movetext_lines)
+
+
+def _build_game(headers: dict[str, str], movetext_lines: list[str]) -> PgnGame:
+    moves, result = parse_movetext("\n".join(movetext_lines))
+    return PgnGame(headers, moves, result or headers.get("Result"))
+
+
+def validate_game(game: PgnGame, index: int = 0) -> GameValidation:
+    # Replays the main line through Position.make_move, previous positions are dropped as soon as they are replaced
+    try:
+        position = game.starting_position()
+    except (ValueError, exceptions.InvalidPositionError) as error:
+        return GameValidation(index, game.headers, 0, failed_ply=0, error=str(error))
+    for ply, san in enumerate(game.moves, start=1):
+        try:
+            position = position.make_move(normalize_san(san))[0]
+        except ValueError as error:
+            return GameValidation(index, game.headers, ply - 1, failed_ply=ply, error=str(error))
+    return GameValidation(index, game.headers, len(game.moves), final_fen=position.to_fen())
+
+
+def validate_games(games: Iterable[PgnGame]) -> Iterator[GameValidation]:
+    for index, game in enumerate(games):
+        yield validate_game(game, index)
+
+
+def validate_pgn(source: str | os.PathLike | TextIO) -> Iterator[GameValidation]:
+    return validate_games(read_games(source))
+
+
+def _validate_chunk(first_index: int, games: list[PgnGame]) -> list[GameValidation]:
+    # Runs in the worker processes
+    return [validate_game(game, first_index + offset) for offset, game in enumerate(games)]
+
+
+def validate_games_parallel(games: Iterable[PgnGame], workers: Optional[int] = None, chunk_size: int = 64) -> Iterator[GameValidation]:
+    # Games are sent to the workers by chunks and the results come back in input order.
+    # At most two chunks per worker are in flight, so memory stays bounded whatever the size of the collection.
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        yield from validate_games(games)
+        return
+
+    games = iter(games)
+    pending: deque[Future] = deque()
+    next_index = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while True:
+            while len(pending) < 2 * workers:
+                chunk = list(islice(games, chunk_size))
+                if not chunk:
+                    break
+                pending.append(executor.submit(_validate_chunk, next_index, chunk))
+                next_index += len(chunk)
+            if not pending:
+                return
+            yield from pending.popleft().result()
+
+
+class ValidationStats:
+    # Running totals over the validation results of a collection
+    def __init__(self):
+        self.games = 0
+        self.invalid_games = 0
+        self.plies = 0
+        self.start_time = time.perf_counter()
+
+    def add(self, result: GameValidation):
+        self.games += 1
+        self.plies += result.plies
+        if not result.is_valid:
+            self.invalid_games += 1
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start_time
+
+    def __str__(self):
+        elapsed = self.elapsed
+        games_per_second = self.games / elapsed if elapsed > 0 else float("inf")
+        plies_per_second = self.plies / elapsed if elapsed > 0 else float("inf")
+        return (f"{self.games} games ({self.invalid_games} invalid), {self.plies} plies in {elapsed:.3f}s "
+                f"({games_per_second:,.1f} games/s, {plies_per_second:,.0f} plies/s)")
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m chess.pgn", description="Replays and validates every game of PGN files")
+    parser.add_argument("paths", nargs="+", help="PGN files to validate")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="number of worker processes (default: number of cores, 1 validates in this process)")
+    parser.add_argument("--chunk-size", type=int, default=64, help="number of games sent to a worker at once (default: 64)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="only print the summary")
+    args = parser.parse_args(argv)
+
+    stats = ValidationStats()
+    for path in args.paths:
+        for result in validate_games_parallel(read_games(path), args.workers, args.chunk_size):
+            stats.add(result)
+            if not result.is_valid and not args.quiet:
+                players = f"{result.headers.get('White', '?')} - {result.headers.get('Black', '?')}"
+                print(f"{path} game #{result.index + 1} ({players}): invalid at ply {result.failed_ply}: {result.error}")
+    print(stats)
+    return 0 if stats.invalid_games == 0 else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,165 @@
+import argparse
+import os
+import time
+from typing import Iterable
+
+import numpy as np
+
+from . import tablebase
+from .batch_moves import legal_moves_batch
+from .boards import EMPTY, PIECE_CODES
+from .models.encoded_move import PROMOTION, PROMOTION_PIECES
+
+# Tables of the tablebase module computed backward from the checkmates. The legal moves of every position come
+# from batch_moves (the rules of Position, at array speed) and are turned into successor table indices once, then
+# distances are found ply after ply : a position wins in n plies when a move leads to a loss in n - 1 plies,
+# and loses in n plies when every move leads to a win, the longest one being in n - 1 plies.
+# Working distances : plies to mate, or one of these markers
+_UNKNOWN = -1
+_INVALID = -2
+_DRAW = -3
+_DEPENDENCIES = {"KPK": ("KQK", "KRK")}
+
+
+def _distances(values: np.ndarray) -> np.ndarray:
+    # Stored table values to working distances
+    values = values.astype(np.int16)
+    return np.where(values == tablebase.DRAW, _DRAW, np.where(values == tablebase.INVALID, _INVALID, values - 1))
+
+
+def _successors(name: str, tables: dict[str, np.ndarray], chunk_size: int):
+    # Every legal move of every table position : the index of the position it leads to in the same table, or -1
+    # with the distance of the position it reaches out of the table (a capture or a promotion)
+    indices = np.arange(tablebase.TABLE_SIZE)
+    weak_to_move, strong_king, piece, weak_king = indices >> 18, indices >> 12 & 63, indices >> 6 & 63, indices & 63
+    distinct = np.flatnonzero((strong_king != piece) & (strong_king != weak_king) & (piece != weak_king))
+    piece_code = PIECE_CODES[("white", tablebase.MATERIALS[name])]
+    promotions = {piece_type: _distances(tables[material]) if material in tables else None
+                  for piece_type, material in (("Queen", "KQK"), ("Rook", "KRK"))}
+
+    valid = np.zeros(tablebase.TABLE_SIZE, dtype=bool)
+    in_check = np.zeros(tablebase.TABLE_SIZE, dtype=bool)
+    counts = np.zeros(tablebase.TABLE_SIZE, dtype=np.int64)
+    all_successors, all_externals = [], []
+    for first in range(0, len(distinct), chunk_size):
+        chunk = distinct[first:first + chunk_size]
+        rows = np.arange(len(chunk))
+        boards = np.full((len(chunk), 64), EMPTY, dtype=np.uint8)
+        boards[rows, strong_king[chunk]] = PIECE_CODES[("white", "King")]
+        boards[rows, piece[chunk]] = piece_code
+        boards[rows, weak_king[chunk]] = PIECE_CODES[("black", "King")]
+        batch = legal_moves_batch(boards, weak_to_move[chunk])
+        valid[chunk], in_check[chunk], counts[chunk] = batch.valid, batch.in_check, batch.counts
+
+        movers = np.repeat(chunk, batch.counts)
+        codes = batch.codes.astype(np.int64)
+        starts, ends = codes & 63, codes >> 6 & 63
+        moved = [np.where(starts == squares[movers], ends, squares[movers]) for squares in (strong_king, piece, weak_king)]
+        successors = tablebase.index(1 - weak_to_move[movers], *moved)
+        externals = np.full(len(codes), _UNKNOWN, dtype=np.int16)
+        # The weak king taking the piece leaves two bare kings
+        captures = (starts == weak_king[movers]) & (ends == piece[movers])
+        externals[captures] = _DRAW
+        successors[captures] = -1
+        promoting = np.flatnonzero(codes >> 14 == PROMOTION)
+        for code, piece_type in enumerate(PROMOTION_PIECES):
+            promoted = promoting[(codes[promoting] >> 12 & 3) == code]
+            if not len(promoted):
+                continue
+            distances = promotions.get(piece_type)
+            if piece_type in promotions and distances is None:
+                raise ValueError(f"{name} needs the {', '.join(_DEPENDENCIES[name])} tables")
+            # A single minor piece can not mate
+            externals[promoted] = _DRAW if distances is None else distances[successors[promoted]]
+            successors[promoted] = -1
+        all_successors.append(successors)
+        all_externals.append(externals)
+    return valid, in_check, counts, np.concatenate(all_successors), np.concatenate(all_externals)
+
+
+def _solve(valid, in_check, counts, successors, externals) -> np.ndarray:
+    distances = np.full(tablebase.TABLE_SIZE, _UNKNOWN, dtype=np.int16)
+    distances[~valid] = _INVALID
+    terminal = valid & (counts == 0)
+    distances[terminal & in_check] = 0
+    distances[terminal & ~in_check] = _DRAW
+
+    # Segments of the successor arrays, for the positions having moves
+    playing = np.flatnonzero(valid & (counts > 0))
+    starts = np.concatenate([[0], np.cumsum(counts)])[playing]
+    in_table = successors >= 0
+    table_successors = np.where(in_table, successors, 0)
+    longest_external = int(externals.max(initial=0))
+    ply = 1
+    while True:
+        values = np.where(in_table, distances[table_successors], externals)
+        if ply % 2:
+            found = np.logical_or.reduceat(values == ply - 1, starts)
+        else:
+            wins = (values >= 0) & (values % 2 == 1)
+            found = np.logical_and.reduceat(wins, starts) & (np.maximum.reduceat(values, starts) == ply - 1)
+        new = playing[found & (distances[playing] == _UNKNOWN)]
+        distances[new] = ply
+        if not len(new) and ply > longest_external:
+            break
+        ply += 1
+    distances[distances == _UNKNOWN] = _DRAW
+    return distances
+
+
+def generate(name: str, tables: dict[str, np.ndarray] = None, chunk_size: int = 1 << 15) -> np.ndarray:
+    # Stored values of a table, tables giving the already generated ones promotions lead to (KQK and KRK for KPK)
+    if name not in tablebase.MATERIALS:
+        raise ValueError(f"Unknown table '{name}', expected one of {', '.join(tablebase.MATERIALS)}")
+    distances = _solve(*_successors(name, tables or {}, chunk_size))
+    if distances.max() + 1 >= tablebase.INVALID:
+        raise ValueError(f"Distances of {name} do not fit in a byte")
+    values = np.where(distances >= 0, distances + 1, np.where(distances == _INVALID, tablebase.INVALID, tablebase.DRAW))
+    return values.astype(np.uint8)
+
+
+def load_table(directory: str | os.PathLike, name: str) -> np.ndarray:
+    return np.memmap(tablebase.table_path(directory, name), dtype=np.uint8, mode="r",
+                     offset=tablebase.HEADER.size, shape=(tablebase.TABLE_SIZE,))
+
+
+def generate_tables(directory: str | os.PathLike, names: Iterable[str] = tuple(tablebase.MATERIALS)) -> dict[str, np.ndarray]:
+    # Tables written into directory, the ones a table depends on being generated first unless already there
+    os.makedirs(directory, exist_ok=True)
+    tables = {}
+    pending = list(names)
+    while pending:
+        name = pending[0]
+        missing = [dependency for dependency in _DEPENDENCIES.get(name, ()) if dependency not in tables]
+        for dependency in missing:
+            if tablebase.table_path(directory, dependency).exists():
+                tables[dependency] = load_table(directory, dependency)
+            else:
+                pending.insert(0, dependency)
+        if pending[0] != name:
+            continue
+        tables[name] = generate(name, tables)
+        tablebase.write_table(tablebase.table_path(directory, name), name, tables[name].tobytes())
+        pending.pop(0)
+    return tables
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m chess.retrograde", description="Generates endgame tables")
+    parser.add_argument("directory", help="directory the tables are written into")
+    parser.add_argument("-m", "--materials", nargs="+", default=list(tablebase.MATERIALS), choices=list(tablebase.MATERIALS),
+                        help="tables to generate (default: all of them)")
+    args = parser.parse_args(argv)
+
+    for name in args.materials:
+        start = time.perf_counter()
+        values = generate_tables(args.directory, [name])[name]
+        distances = values[(values != tablebase.DRAW) & (values != tablebase.INVALID)].astype(np.int64) - 1
+        print(f"{name}: {np.count_nonzero(distances % 2)} wins, {np.count_nonzero(distances % 2 == 0)} losses, "
+              f"{np.count_nonzero(values == tablebase.DRAW)} draws, longest mate {distances.max(initial=0)} plies "
+              f"({time.perf_counter() - start:.1f} s)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,122 @@
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Optional
+
+from .models.position import Position
+
+# Endgame tables of a king and one piece against a bare king. Tables are written for the strong side being white
+# and positions where black has the piece are looked up flipped vertically, colors swapped.
+# One byte per position, at index(strong side to move, strong king, piece, weak king) :
+# DRAW, INVALID for positions Position refuses, otherwise the distance to mate in plies + 1, even distances
+# being losses for the side to move and odd ones wins.
+MATERIALS = {"KQK": "Queen", "KRK": "Rook", "KPK": "Pawn"}
+TABLE_SIZE = 2 * 64 ** 3
+DRAW = 0
+INVALID = 255
+HEADER = struct.Struct("<4s4sI")
+MAGIC = b"CHTB"
+EXTENSION = ".tb"
+_PIECE_MATERIALS = {piece_type: name for name, piece_type in MATERIALS.items()}
+
+
+def index(weak_to_move: int, strong_king: int, piece: int, weak_king: int) -> int:
+    return weak_to_move << 18 | strong_king << 12 | piece << 6 | weak_king
+
+
+def table_path(directory: str | os.PathLike, name: str) -> Path:
+    return Path(directory) / f"{name}{EXTENSION}"
+
+
+def write_table(path: str | os.PathLike, name: str, values: bytes):
+    if len(values) != TABLE_SIZE:
+        raise ValueError(f"A table holds {TABLE_SIZE} values, got {len(values)}")
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, name.encode().ljust(4), TABLE_SIZE))
+        file.write(values)
+
+
+class ProbeResult:
+    __slots__ = ("result", "plies")
+
+    def __init__(self, result: str, plies: Optional[int]):
+        # result is "win", "draw" or "loss" for the side to move, plies the distance to mate (None for draws)
+        self.result = result
+        self.plies = plies
+
+    def __eq__(self, other):
+        if not isinstance(other, ProbeResult):
+            return NotImplemented
+        return (self.result, self.plies) == (other.result, other.plies)
+
+    def __repr__(self):
+        return f"ProbeResult({self.result!r}, {self.plies})"
+
+
+def decode(value: int) -> Optional[ProbeResult]:
+    if value == INVALID:
+        return None
+    if value == DRAW:
+        return ProbeResult("draw", None)
+    plies = value - 1
+    return ProbeResult("win" if plies % 2 else "loss", plies)
+
+
+class Tablebase:
+    # Tables found in a directory, memory mapped : a probe reads one byte, no table is loaded in memory
+    def __init__(self, directory: str | os.PathLike):
+        self.directory = Path(directory)
+        self._files = {}
+        self._maps: dict[str, mmap.mmap] = {}
+        for name in MATERIALS:
+            path = table_path(self.directory, name)
+            if not path.exists():
+                continue
+            file = open(path, "rb")
+            table = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, table_name, size = HEADER.unpack_from(table)
+            if magic != MAGIC or table_name.rstrip() != name.encode() or len(table) != HEADER.size + size:
+                table.close()
+                file.close()
+                raise ValueError(f"{path} is not a {name} table")
+            self._files[name] = file
+            self._maps[name] = table
+
+    @property
+    def names(self) -> list[str]:
+        return list(self._maps)
+
+    def __enter__(self) -> "Tablebase":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        for table in self._maps.values():
+            table.close()
+        for file in self._files.values():
+            file.close()
+        self._maps.clear()
+        self._files.clear()
+
+    def value(self, name: str, table_index: int) -> int:
+        return self._maps[name][HEADER.size + table_index]
+
+    def probe(self, position: Position) -> Optional[ProbeResult]:
+        # None when the material has no table or castling rights are left, which the tables do not cover
+        pieces = position.all_pieces
+        if len(pieces) != 3 or any(position.castling_rights.values()):
+            return None
+        [piece] = [piece for piece in pieces if piece.type != "King"] or [None]
+        name = _PIECE_MATERIALS.get(piece.type) if piece else None
+        if name not in self._maps:
+            return None
+        strong, weak = piece.color, piece.opposite_color
+        # Black strong side : the board is flipped so that the strong side plays up the board
+        flip = 56 if strong == "black" else 0
+        strong_king = next(iter(position.pieces[strong]["King"])).square.index ^ flip
+        weak_king = next(iter(position.pieces[weak]["King"])).square.index ^ flip
+        table_index = index(position.whose_move == weak, strong_king, piece.square.index ^ flip, weak_king)
+        return decode(self.value(name, table_index))
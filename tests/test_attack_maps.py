@@ -0,0 +1,54 @@
+import pytest
+
+from chess import perft
+from chess.models.position import Position
+
+
+def recomputed_counts(position):
+    counts = {"white": [0] * 64, "black": [0] * 64}
+    for piece in position.all_pieces:
+        for square in piece.controlled_squares():
+            counts[piece.color][square.index] += 1
+    return counts
+
+
+def walk(position, depth):
+    assert position.attack_counts == recomputed_counts(position)
+    if depth == 0:
+        return
+    for move in list(position.iter_legal_moves()):
+        position.push(move)
+        walk(position, depth - 1)
+        position.pop()
+        assert position.attack_counts == recomputed_counts(position)
+
+
+@pytest.mark.parametrize("name", ["kiwipete", "position_3", "position_4"])
+def test_attack_counts_follow_push_and_pop(name):
+    walk(perft.build_position(name), 2)
+
+
+def test_attack_counts_follow_place_and_remove():
+    position = Position([["white", "King", "e1"], ["white", "Rook", "a1"], ["black", "King", "e8"]], whose_move="white")
+    assert position.attack_counts["white"][position.square("d1").index] == 2
+    position.place_piece("black", "Bishop", "c1")
+    assert position.attack_counts["white"][position.square("d1").index] == 1
+    assert position.attack_counts["black"][position.square("d2").index] == 1
+    position.remove_piece("c1")
+    assert position.attack_counts == recomputed_counts(position)
+
+
+def test_king_cannot_step_back_along_checking_line():
+    position = Position([["white", "King", "e2"], ["black", "King", "h8"], ["black", "Rook", "e8"]], whose_move="white")
+    assert {move.end_square.name for move in position.legal_moves_for(position.piece("e2"))} == {"d1", "d2", "d3", "f1", "f2", "f3"}
+
+
+@pytest.mark.parametrize("name", ["kiwipete", "position_3", "position_4"])
+def test_attack_counts_follow_make_move(name):
+    # The new position starts from a copy of the counts, updated for the pieces the move touches only
+    position = perft.build_position(name)
+    counts = recomputed_counts(position)
+    for move in list(position.iter_legal_moves()):
+        new_position, _ = position.make_move(move)
+        assert new_position.attack_counts == recomputed_counts(new_position)
+    assert position.attack_counts == counts
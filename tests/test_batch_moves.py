@@ -0,0 +1,79 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from chess import batch_moves, perft
+from chess.boards import position_arrays
+from chess.models.encoded_move import EncodedMove, encode_move
+from chess.models.position import Position
+from chess.models import utils
+
+
+def _expected_codes(position: Position) -> list[int]:
+    return sorted(encode_move(move) for moves in position.compute_legal_moves().values() for move in moves)
+
+
+@pytest.mark.parametrize("name", perft.PERFT_POSITIONS.keys())
+def test_matches_position_two_plies_deep(name):
+    # Every position one and two plies away, covering pins, checks, castling, en passant and promotions
+    position = perft.build_position(name)
+    positions, expected = [position.to_fen()], [_expected_codes(position)]
+    for move in [move for moves in position.compute_legal_moves().values() for move in moves]:
+        position.push(move)
+        positions.append(position.to_fen())
+        expected.append(_expected_codes(position))
+        for reply in [reply for replies in position.compute_legal_moves().values() for reply in replies]:
+            position.push(reply)
+            positions.append(position.to_fen())
+            expected.append(_expected_codes(position))
+            position.pop()
+        position.pop()
+
+    batch = batch_moves.legal_moves_positions(positions)
+    assert len(batch) == len(positions)
+    assert batch.counts.tolist() == [len(codes) for codes in expected]
+    for index, codes in enumerate(expected):
+        assert batch.moves(index).tolist() == codes
+
+
+@pytest.mark.parametrize("name", perft.PERFT_POSITIONS.keys())
+def test_counts_match_perft_depth_one(name):
+    fen = perft.PERFT_POSITIONS[name]["fen"]
+    batch = batch_moves.legal_moves_batch(*position_arrays([fen]))
+    assert batch.counts[0] == perft.PERFT_POSITIONS[name]["expected"][0]
+
+
+def test_pinned_en_passant_capture():
+    # Taking en passant would leave both pawns off the fifth rank and the king attacked by the rook
+    fen = "8/8/8/K2pP2r/8/8/8/7k w - d6 0 1"
+    codes = batch_moves.legal_moves_positions([fen]).moves(0).tolist()
+    assert codes == _expected_codes(Position.from_fen(fen))
+    assert all(not EncodedMove(code).is_en_passant for code in codes)
+
+
+def test_castling_through_attacked_square():
+    codes = batch_moves.legal_moves_positions(["4k3/8/8/8/8/8/5r2/R3K2R w KQ - 0 1"]).moves(0)
+    castles = [str(EncodedMove(code)) for code in codes if EncodedMove(code).is_castling]
+    assert castles == ["e1c1"]
+
+
+def test_invalid_positions_have_no_moves():
+    boards, whose_move, castling, en_passant = position_arrays([utils.STARTING_FEN, "8/8/8/8/8/8/8/4K3 w - - 0 1"])
+    batch = batch_moves.legal_moves_batch(boards, whose_move, castling, en_passant)
+    assert batch.counts.tolist() == [20, 0]
+    assert batch.offsets.tolist() == [0, 20, 20]
+    assert batch.valid.tolist() == [True, False]
+
+
+def test_checkmate_and_stalemate():
+    batch = batch_moves.legal_moves_positions(["7k/6Q1/6K1/8/8/8/8/8 b - - 0 1", "7k/8/6QK/8/8/8/8/8 b - - 0 1"])
+    assert batch.counts.tolist() == [0, 0]
+    assert batch.in_check.tolist() == [True, False]
+
+
+def test_move_list_converts_to_moves():
+    position = Position.from_fen(utils.STARTING_FEN)
+    move_list = batch_moves.legal_moves_positions([position]).move_list(0)
+    moves = move_list.to_moves(position)
+    assert [encode_move(move) for move in moves] == move_list.codes.tolist()
+    assert all(move.is_legal_move() for move in moves)
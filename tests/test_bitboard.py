@@ -0,0 +1,67 @@
+import pytest
+
+from chess import perft
+from chess.models.bitboard import BitboardPosition, bitboard_move_from_move, move_from_bitboard_move
+from chess.models.position import Position
+from chess.models import utils, zobrist
+
+
+def position_move_set(position):
+    position.compute_legal_moves()
+    return {bitboard_move_from_move(move) for moves in position.legal_moves_.values() for move in moves}
+
+
+def test_square_index_round_trip():
+    assert utils.label_to_index("a1") == 0
+    assert utils.label_to_index("h8") == 63
+    assert all(utils.label_to_index(utils.index_to_label(index)) == index for index in range(64))
+
+
+def test_position_round_trip():
+    position = Position(utils.starting_position(), whose_move="white")
+    board = BitboardPosition.from_position(position)
+    assert sorted(board.piece_list()) == sorted(utils.starting_position())
+    assert sorted(BitboardPosition.from_position(board.to_position()).piece_list()) == sorted(board.piece_list())
+    assert board.piece_on(utils.label_to_index("e1")) == ("white", "King")
+    assert board.piece_on(utils.label_to_index("e4")) is None
+
+
+def test_en_passant_round_trip():
+    position = Position(utils.starting_position(), whose_move="white")
+    position.compute_legal_moves()
+    position = position.make_move("e4")[0]
+    board = BitboardPosition.from_position(position)
+    assert board.en_passant_square == utils.label_to_index("e3")
+    assert board.to_position().en_passant_target.square.name == "e4"
+
+
+def test_en_passant_round_trip_keeps_zobrist_key():
+    # A live en passant capture is part of the key the legal moves cache relies on
+    position = Position.from_fen("rnbqkbnr/ppp1pppp/8/8/3pPp2/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1")
+    Position.from_fen("rnbqkbnr/ppp1pppp/8/8/3pPp2/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1").compute_legal_moves()
+    round_trip = BitboardPosition.from_position(position).to_position()
+    assert round_trip.zobrist_key == zobrist.compute_key(round_trip) == position.zobrist_key
+    assert position_move_set(round_trip) == set(BitboardPosition.from_position(position).legal_moves())
+
+
+@pytest.mark.parametrize("name", list(perft.PERFT_POSITIONS))
+def test_same_legal_moves_as_position(name):
+    # Root and every child position of the reference positions
+    position = perft.build_position(name)
+    board = BitboardPosition.from_position(position)
+    assert set(board.legal_moves()) == position_move_set(position)
+    for move in board.legal_moves():
+        child_position = position.make_move(move_from_bitboard_move(position, move))[0]
+        assert set(board.make_move(move).legal_moves()) == position_move_set(child_position)
+
+
+@pytest.mark.parametrize("name", list(perft.PERFT_POSITIONS))
+def test_bitboard_perft_reference_counts(name):
+    board = BitboardPosition.from_position(perft.build_position(name))
+    assert perft.bitboard_perft(board, 3) == perft.PERFT_POSITIONS[name]["expected"][2]
+
+
+def test_move_from_bitboard_move_rejects_illegal_move():
+    position = Position(utils.starting_position(), whose_move="white")
+    with pytest.raises(ValueError):
+        move_from_bitboard_move(position, (utils.label_to_index("e2"), utils.label_to_index("e5"), None))
@@ -0,0 +1,96 @@
+import random
+
+import pytest
+
+from chess import book, engine
+from chess.models import polyglot, utils
+from chess.models.encoded_move import EncodedMove
+from chess.models.position import Position
+
+# Keys given by the Polyglot format specification
+KEY_SEQUENCES = [
+    [(None, 0x463B96181691FC9C), ("e4", 0x823C9B50FD114196), ("d5", 0x0756B94461C50FB0), ("e5", 0x662FAFB965DB29D4),
+     ("f5", 0x22A48B5A8E47FF78), ("Ke2", 0x652A607CA3F242C1), ("Kf7", 0x00FDD303C946BDD9)],
+    [(None, 0x463B96181691FC9C), ("a4", None), ("b5", None), ("h4", None), ("b4", None), ("c4", 0x3C8123EA7B067637),
+     ("bxc3", None), ("Ra3", 0x5C3F9B829B279560)],
+]
+
+
+@pytest.mark.parametrize("sequence", KEY_SEQUENCES)
+def test_specification_keys(sequence):
+    position = Position.from_fen(utils.STARTING_FEN)
+    for notation, key in sequence:
+        if notation:
+            position.push(notation)
+        if key is not None:
+            assert polyglot.compute_key(position) == key
+
+
+def _entry(position: Position, notation: str, weight: int) -> book.BookEntry:
+    move = position.move_from_notation(notation)
+    return book.BookEntry(polyglot.compute_key(position), book.polyglot_move(move), weight)
+
+
+@pytest.fixture
+def book_path(tmp_path):
+    start = Position.from_fen(utils.STARTING_FEN)
+    castling = Position.from_fen("r3k2r/pppq1ppp/2npbn2/4p3/4P3/2NPBN2/PPPQ1PPP/R3K2R w KQkq - 0 1")
+    promotion = Position.from_fen("8/4P1k1/8/8/8/8/8/4K3 w - - 0 1")
+    # Positions with no entry around the ones looked up, so the binary search has neighbours on both sides
+    others = [book.BookEntry(key, 0, 1) for key in (0, 1, polyglot.compute_key(start) + 1, (1 << 64) - 1)]
+    path = tmp_path / "book.bin"
+    book.write_book(path, [_entry(start, "e4", 60), _entry(start, "d4", 30), _entry(start, "Nf3", 10),
+                           _entry(castling, "O-O", 5), _entry(castling, "O-O-O", 5), _entry(promotion, "e8=N", 1),
+                           *others])
+    return path
+
+
+def test_lookup(book_path):
+    start = Position.from_fen(utils.STARTING_FEN)
+    with book.OpeningBook(book_path) as opening_book:
+        assert len(opening_book) == 10
+        assert [entry.weight for entry in opening_book.entries(start)] == [60, 30, 10]
+        assert [(str(EncodedMove.from_move(move)), weight) for move, weight in opening_book.moves(start)] == \
+            [("e2e4", 60), ("d2d4", 30), ("g1f3", 10)]
+        assert opening_book.entries(polyglot.compute_key(start) - 1) == []
+        assert opening_book.choose(Position.from_fen("4k3/8/8/8/8/8/8/4K3 w - - 0 1")) is None
+
+
+def test_castling_and_promotion_entries(book_path):
+    castling = Position.from_fen("r3k2r/pppq1ppp/2npbn2/4p3/4P3/2NPBN2/PPPQ1PPP/R3K2R w KQkq - 0 1")
+    promotion = Position.from_fen("8/4P1k1/8/8/8/8/8/4K3 w - - 0 1")
+    with book.OpeningBook(book_path) as opening_book:
+        assert [entry.raw_move & 0x3F for entry in opening_book.entries(castling)] == [7, 0]
+        assert [move.end_square.name for move, _ in opening_book.moves(castling)] == ["g1", "c1"]
+        assert all(move.is_castling for move, _ in opening_book.moves(castling))
+        [(move, _)] = opening_book.moves(promotion)
+        assert move.promoting_piece_str == "Knight"
+
+
+def test_weighted_choice(book_path):
+    start = Position.from_fen(utils.STARTING_FEN)
+    generator = random.Random(0)
+    with book.OpeningBook(book_path) as opening_book:
+        picks = [opening_book.choose(start, generator).end_square.name for _ in range(1000)]
+    assert set(picks) == {"e4", "d4", "f3"}
+    assert picks.count("e4") > picks.count("d4") > picks.count("f3")
+
+
+def test_rejects_truncated_file(tmp_path):
+    path = tmp_path / "broken.bin"
+    path.write_bytes(bytes(20))
+    with pytest.raises(ValueError):
+        book.OpeningBook(path)
+
+
+def test_empty_book(tmp_path):
+    path = tmp_path / "empty.bin"
+    path.write_bytes(b"")
+    with book.OpeningBook(path) as opening_book:
+        assert len(opening_book) == 0
+        assert opening_book.moves(Position.from_fen(utils.STARTING_FEN)) == []
+
+
+def test_engine_plays_book_move(book_path, capsys):
+    assert engine.main(["--book", str(book_path), "-d", "1"]) == 0
+    assert "(book)" in capsys.readouterr().out
@@ -0,0 +1,66 @@
+import pytest
+
+from chess.models.cache import LRUCache, legal_moves_cache
+from chess.models.position import Position
+from chess.models import utils
+
+
+@pytest.fixture
+def empty_legal_moves_cache():
+    capacity = legal_moves_cache.capacity
+    legal_moves_cache.clear()
+    yield legal_moves_cache
+    legal_moves_cache.clear()
+    legal_moves_cache.resize(capacity)
+
+
+def test_lru_eviction_and_counters():
+    cache = LRUCache(capacity=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert "b" not in cache
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert (cache.hits, cache.misses) == (2, 1)
+    cache.resize(1)
+    assert len(cache) == 1 and "c" in cache
+
+
+def test_zero_capacity_disables_cache():
+    cache = LRUCache(capacity=0)
+    cache.put("a", 1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_transposition_served_from_cache(empty_legal_moves_cache):
+    first = Position(utils.starting_position(), whose_move="white")
+    for notation in ["Nf3", "Nf6", "Nc3"]:
+        first.push(notation)
+    first.compute_legal_moves()
+    second = Position(utils.starting_position(), whose_move="white")
+    for notation in ["Nc3", "Nf6", "Nf3"]:
+        second.push(notation)
+    hits = empty_legal_moves_cache.hits
+    second.compute_legal_moves()
+    assert empty_legal_moves_cache.hits == hits + 1
+    assert all(move.former_position is second and move.piece is piece and move.start_square is piece.square
+               for piece, moves in second.legal_moves_.items() for move in moves)
+    assert ({(move.start_square.name, move.end_square.name) for moves in first.legal_moves_.values() for move in moves} ==
+            {(move.start_square.name, move.end_square.name) for moves in second.legal_moves_.values() for move in moves})
+    second.push("e5")
+    assert second.piece("e5").type == "Pawn"
+
+
+def test_edited_castling_rights_are_not_served_stale(empty_legal_moves_cache):
+    pieces = [["white", "King", "e1"], ["white", "Rook", "h1"], ["black", "King", "e8"]]
+    castling_rights = {"white_kingside": True, "white_queenside": False, "black_kingside": False, "black_queenside": False}
+    position = Position(pieces, whose_move="white", castling_rights=castling_rights.copy())
+    position.compute_legal_moves()
+    edited_position = Position(pieces, whose_move="white", castling_rights=castling_rights.copy())
+    edited_position.castling_rights["white_kingside"] = False
+    edited_position.compute_legal_moves()
+    assert any(move.is_castling for move in position.legal_moves_[position.piece("e1")])
+    assert not any(move.is_castling for move in edited_position.legal_moves_[edited_position.piece("e1")])
@@ -0,0 +1,82 @@
+import pytest
+
+from chess.models.game import Game
+from chess.models.position import Position
+
+KNIGHT_SHUFFLE = ["Nf3", "Nf6", "Ng1", "Ng8"]
+
+
+@pytest.fixture(autouse=True)
+def quiet(capsys):
+    yield
+    capsys.readouterr()
+
+
+def test_threefold_repetition():
+    game = Game()
+    for notation in KNIGHT_SHUFFLE:
+        game.apply_move(notation)
+    assert game.result is None
+    for notation in KNIGHT_SHUFFLE[:-1]:
+        game.apply_move(notation)
+        assert game.result is None
+    game.apply_move(KNIGHT_SHUFFLE[-1])
+    assert game.result == "Draw by threefold repetition !"
+    assert game.repetitions[game.current_position.zobrist_key] == 3
+
+
+def test_take_back_forgets_repetition():
+    game = Game()
+    for notation in KNIGHT_SHUFFLE * 2:
+        game.apply_move(notation)
+    game.take_back()
+    game.apply_move(KNIGHT_SHUFFLE[-1])
+    assert game.result == "Draw by threefold repetition !"
+    game.take_back()
+    assert game.result is None
+    assert game.repetitions[game.position_at(0).zobrist_key] == 2
+
+
+def test_castling_rights_make_positions_different():
+    game = Game(Position.from_fen("r3k3/8/8/8/8/8/8/4K2R w Kq - 0 1"))
+    # The first king move loses castling rights, the following returns are not repetitions of the start
+    for notation in ["Kf1", "Kd8", "Ke1", "Ke8"] * 2:
+        game.apply_move(notation)
+    assert game.result is None
+    for notation in ["Kf1", "Kd8", "Ke1", "Ke8"]:
+        game.apply_move(notation)
+    assert game.result == "Draw by threefold repetition !"
+
+
+def test_fifty_move_rule():
+    game = Game(Position.from_fen("4k3/8/8/8/8/8/8/R3K3 w - - 98 80"))
+    game.apply_move("Ra2")
+    assert game.result is None
+    game.apply_move("Kd8")
+    assert game.result == "Draw by the fifty-move rule !"
+
+
+def test_checkmate_takes_precedence_over_fifty_move_rule():
+    game = Game(Position.from_fen("6k1/5ppp/8/8/8/8/8/R5K1 w - - 99 80"))
+    game.apply_move("Ra8")
+    assert game.result == "Checkmate ! White won."
+
+
+@pytest.mark.parametrize("fen, insufficient", [
+    ("4k3/8/8/8/8/8/8/4K3 w - - 0 1", True),
+    ("4k3/8/8/8/8/8/8/2B1K3 w - - 0 1", True),
+    ("4k3/8/8/8/8/8/8/1N2K3 w - - 0 1", True),
+    ("2b1k3/8/8/8/8/8/8/2B1K3 w - - 0 1", False),
+    ("3bk3/8/8/8/8/8/8/2B1K3 w - - 0 1", True),
+    ("4k3/8/8/8/8/8/8/1NB1K3 w - - 0 1", False),
+    ("4k3/8/8/8/8/8/4P3/4K3 w - - 0 1", False),
+    ("4k3/8/8/8/8/8/8/R3K3 w - - 0 1", False),
+])
+def test_insufficient_material(fen, insufficient):
+    assert Position.from_fen(fen).has_insufficient_material() is insufficient
+
+
+def test_game_ends_on_insufficient_material():
+    game = Game(Position.from_fen("4k3/8/8/8/8/8/3r4/4K3 w - - 0 1"))
+    game.apply_move("Kxd2")
+    assert game.result == "Draw by insufficient material !"
@@ -0,0 +1,55 @@
+import sys
+
+import pytest
+
+from chess import perft
+from chess.models.encoded_move import EncodedMove, MoveList, encode, CASTLING, EN_PASSANT
+from chess.models.position import Position
+from chess.models import utils
+
+
+@pytest.mark.parametrize("name", perft.PERFT_POSITIONS.keys())
+def test_round_trip_through_codes(name):
+    position = perft.build_position(name)
+    moves = [move for moves in position.compute_legal_moves().values() for move in moves]
+    move_list = MoveList.from_moves(moves)
+    assert len(move_list) == len(moves) == len(set(move_list.codes))
+    assert all(code < 1 << 16 for code in move_list.codes)
+    assert move_list.to_moves(position) == moves
+    assert move_list.codes.itemsize == 2
+
+
+def test_encoded_move_fields():
+    move = EncodedMove(encode(52, 60, "Queen"))
+    assert (move.start_index, move.end_index) == (52, 60)
+    assert move.is_promotion and move.promoting_piece_str == "Queen"
+    assert str(move) == "e7e8q"
+    castling = EncodedMove(encode(4, 6, flag=CASTLING))
+    assert castling.is_castling and not castling.is_promotion and castling.promoting_piece_str is None
+    assert EncodedMove(encode(36, 43, flag=EN_PASSANT)).is_en_passant
+    assert not hasattr(move, "__dict__")
+
+
+def test_flags_follow_move_kind():
+    position = Position.from_fen("r3k2r/8/8/3pP3/8/8/8/R3K2R w KQkq d6 0 1")
+    encoded = {str(move): move for move in position.encoded_legal_moves()}
+    assert encoded["e1g1"].is_castling and encoded["e1c1"].is_castling
+    assert encoded["e5d6"].is_en_passant
+    assert not encoded["a1a8"].is_castling
+
+
+def test_push_encoded_move():
+    position = Position(utils.starting_position(), whose_move="white")
+    move = position.push(EncodedMove(encode(12, 28)))
+    assert move.piece is position.piece("e4")
+    with pytest.raises(ValueError):
+        position.push(EncodedMove(encode(12, 28)))
+
+
+def test_move_list_is_compact():
+    position = perft.build_position("kiwipete")
+    move_list = position.encoded_legal_moves()
+    move_list.append(move_list[0])
+    assert move_list.pop() == move_list[0]
+    assert move_list[0] in move_list
+    assert sys.getsizeof(move_list.codes) < 64 + 2 * 64
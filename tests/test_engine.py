@@ -0,0 +1,127 @@
+import multiprocessing
+import queue
+import time
+
+import pytest
+
+from chess import engine
+from chess.engine import Engine, TranspositionTable
+from chess.models.position import Position
+from chess.models import utils
+
+
+def test_evaluation_is_symmetric():
+    assert engine.evaluate(Position.from_fen(utils.STARTING_FEN)) == 0
+    white_up = Position.from_fen("4k3/8/8/8/8/8/8/3QK3 w - - 0 1")
+    black_to_move = Position.from_fen("4k3/8/8/8/8/8/8/3QK3 b - - 0 1")
+    assert engine.evaluate(white_up) > 800
+    assert engine.evaluate(black_to_move) == -engine.evaluate(white_up)
+
+
+def test_transposition_table_packing():
+    table = TranspositionTable(size=1024)
+    key = (1 << 63) + 12345
+    table.store(key, 5, -engine.MATE_SCORE + 3, engine.UPPER_BOUND, 0xFFFF)
+    assert table.probe(key) == (5, -engine.MATE_SCORE + 3, engine.UPPER_BOUND, 0xFFFF)
+    assert table.probe(key + 1024) is None
+    # Shallower results do not replace deeper ones of the same position
+    table.store(key, 2, 10, engine.EXACT, 1)
+    assert table.probe(key)[0] == 5
+    table.store(key + 1024, 1, 10, engine.EXACT, 1)
+    assert table.probe(key) is None and table.probe(key + 1024) == (1, 10, engine.EXACT, 1)
+    table.clear()
+    assert table.probe(key + 1024) is None
+
+
+def test_finds_mate_in_one():
+    result = Engine().search(Position.from_fen("6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1"), max_depth=3)
+    assert result.principal_variation[0] == "a1a8"
+    assert result.score == engine.MATE_SCORE - 1
+    assert "mate 1" in str(result)
+
+
+def test_finds_mate_in_two():
+    # Back rank with doubled rooks : the first check is taken by the a8 rook, the second one mates
+    result = Engine().search(Position.from_fen("r5k1/5ppp/8/8/8/8/3R1PPP/3R2K1 w - - 0 1"), max_depth=4)
+    assert result.score == engine.MATE_SCORE - 3
+    assert result.principal_variation[0] == "d2d8"
+
+
+def test_wins_material_and_keeps_position_untouched():
+    position = Position.from_fen("4k3/8/8/3q4/8/8/3R4/4K3 w - - 0 1")
+    fen = position.to_fen()
+    result = Engine().search(position, max_depth=2)
+    assert result.principal_variation[0] == "d2d5"
+    assert result.move.former_position is position and result.move.end_square.name == "d5"
+    assert position.to_fen() == fen and position.undo_stack == []
+    assert result.depth == 2 and result.nodes > 0 and result.nodes_per_second > 0
+
+
+def test_repeats_positions_of_the_game():
+    # A rook down, black goes back to the position after 1... Nf6 of the game, even when searching from a FEN
+    position = Position.from_fen("4k1n1/8/8/8/8/8/8/R3K1N1 w - - 0 1")
+    for move in ("Nf3", "Nf6", "Ng1", "Ng8", "Nf3"):
+        position.push(move)
+    assert len(engine.position_history(position)) == 5
+    result = Engine().search(position, max_depth=2)
+    assert result.principal_variation[0] == "g8f6" and result.score == 0
+    result = Engine().search(Position.from_fen(position.to_fen()), max_depth=2, history=engine.position_history(position))
+    assert result.principal_variation[0] == "g8f6" and result.score == 0
+    assert Engine().search(Position.from_fen(position.to_fen()), max_depth=2).score < -300
+
+
+def test_no_move_in_checkmate():
+    result = Engine().search(Position.from_fen("R5k1/5ppp/8/8/8/8/8/6K1 b - - 0 1"), max_depth=2)
+    assert result.move is None and result.principal_variation == []
+
+
+def test_time_limit_stops_iterative_deepening():
+    reports = []
+    start = time.perf_counter()
+    result = Engine().search(Position.from_fen(utils.STARTING_FEN), max_depth=30, time_limit=0.3, info=reports.append)
+    assert time.perf_counter() - start < 2
+    assert result.depth == reports[-1].depth < 30
+    assert [report.depth for report in reports] == list(range(1, result.depth + 1))
+    assert result.move is not None
+
+
+def test_torn_table_entries_are_ignored():
+    table = TranspositionTable(size=64)
+    table.store(7, 3, 25, engine.EXACT, 100)
+    table.entries[7] ^= 1 << 40
+    assert table.probe(7) is None
+
+
+def test_single_worker_search_is_deterministic():
+    position = Position.from_fen(utils.STARTING_FEN)
+    first = engine.parallel_search(position, workers=1, max_depth=3)
+    second = engine.parallel_search(position, workers=1, max_depth=3)
+    assert (first.principal_variation, first.score, first.nodes) == (second.principal_variation, second.score, second.nodes)
+
+
+def test_parallel_search_with_shared_table():
+    position = Position.from_fen("r5k1/5ppp/8/8/8/8/3R1PPP/3R2K1 w - - 0 1")
+    result = engine.parallel_search(position, workers=2, max_depth=3, table_size=1 << 12)
+    assert result.principal_variation[0] == "d2d8"
+    assert result.move.former_position is position
+    assert result.score == engine.MATE_SCORE - 3
+    assert result.nodes > 0
+
+
+def test_helper_reports_when_setup_fails():
+    results = queue.Queue()
+    with pytest.raises(FileNotFoundError):
+        engine._helper_search("no_such_table", 1 << 12, utils.STARTING_FEN, 2, None, 1, None, results)
+    assert results.get_nowait() == (0, 0, [], 0)
+
+
+def test_dead_helpers_do_not_block_the_search():
+    context = multiprocessing.get_context()
+    results = context.Queue()
+    # Exits without sending a result, as a killed helper would
+    helper = context.Process(target=time.sleep, args=(0,))
+    helper.start()
+    start = time.perf_counter()
+    assert engine._collect_results([helper], results) == []
+    assert time.perf_counter() - start < 5
+    helper.join()
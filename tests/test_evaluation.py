@@ -0,0 +1,60 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from chess import engine, evaluation, perft
+from chess.boards import EMPTY, board_array
+from chess.models.position import Position
+from chess.models import utils
+
+
+@pytest.mark.parametrize("name", perft.PERFT_POSITIONS.keys())
+def test_matches_engine_evaluation(name):
+    position = perft.build_position(name)
+    assert evaluation.evaluate(position) == engine.evaluate(position)
+
+
+@pytest.mark.parametrize("name", perft.PERFT_POSITIONS.keys())
+def test_incremental_updates_match_full_evaluation(name):
+    # Every move two plies deep, covering castling, en passant, promotions and captures
+    position = perft.build_position(name)
+    evaluator = evaluation.IncrementalEvaluator(position)
+    for move in [move for moves in position.compute_legal_moves().values() for move in moves]:
+        evaluator.push(move)
+        position.push(move)
+        assert evaluator.score == evaluation.white_score(position)
+        for reply in [reply for replies in position.compute_legal_moves().values() for reply in replies]:
+            evaluator.push(reply)
+            position.push(reply)
+            assert evaluator.score == evaluation.white_score(position)
+            position.pop()
+            evaluator.pop()
+        position.pop()
+        evaluator.pop()
+    assert evaluator.score == evaluation.white_score(position)
+
+
+def test_after_follows_make_move():
+    position = Position.from_fen("rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3")
+    evaluator = evaluation.IncrementalEvaluator(position)
+    new_position, move = position.make_move(position.move_from_notation("exf6"))
+    new_evaluator = evaluator.after(move)
+    assert new_evaluator.score == evaluation.white_score(new_position)
+    assert evaluator.score == evaluation.white_score(position)
+    assert new_evaluator.relative_score("black") == evaluation.evaluate(new_position)
+
+
+def test_batch_scores():
+    positions = [perft.build_position(name) for name in perft.PERFT_POSITIONS]
+    scores = evaluation.evaluate_positions(positions)
+    assert scores.shape == (len(positions),)
+    assert list(scores) == [evaluation.evaluate(position) for position in positions]
+    boards = np.stack([board_array(position) for position in positions])
+    assert list(evaluation.evaluate_batch(boards)) == [evaluation.white_score(position) for position in positions]
+
+
+def test_board_encoding():
+    board = board_array(Position(utils.starting_position(), whose_move="white"))
+    assert board.dtype == np.uint8 and board.shape == (64,)
+    assert board[4] == 5 and board[60] == 11 and board[12] == 0 and board[52] == 6
+    assert (board[16:48] == EMPTY).all()
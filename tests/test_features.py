@@ -0,0 +1,65 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from chess import features, perft
+from chess.boards import board_array, fen_board_array
+from chess.models.exceptions import InvalidFenError
+from chess.models.position import Position
+from chess.models import utils
+
+EN_PASSANT_FEN = "rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3"
+
+
+def test_starting_position_planes():
+    planes = features.featurize([utils.STARTING_FEN])[0]
+    assert planes.shape == (features.PLANES, 8, 8)
+    # White pawns on rank 2, black king on e8
+    assert planes[0, 1].tolist() == [1] * 8 and planes[0].sum() == 8
+    assert planes[11, 7, 4] == 1 and planes[11].sum() == 1
+    assert planes[features.SIDE_TO_MOVE_PLANE].sum() == 0
+    assert planes[features.CASTLING_PLANES].sum() == 4 * 64
+    assert planes[features.EN_PASSANT_PLANE].sum() == 0
+
+
+@pytest.mark.parametrize("fen", [perft.PERFT_POSITIONS[name]["fen"] for name in perft.PERFT_POSITIONS] + [EN_PASSANT_FEN])
+def test_positions_and_fens_give_the_same_features(fen):
+    position = Position.from_fen(fen)
+    from_fen, from_position = features.featurize([fen, position])
+    assert (from_fen == from_position).all()
+    assert (fen_board_array(fen) == board_array(position)).all()
+
+
+def test_en_passant_and_side_to_move_planes():
+    planes = features.featurize([EN_PASSANT_FEN, "4k3/8/8/8/8/8/8/4K3 b - - 0 1"])
+    assert planes[0, features.EN_PASSANT_PLANE, 5, 5] == 1 and planes[0, features.EN_PASSANT_PLANE].sum() == 1
+    assert planes[1, features.SIDE_TO_MOVE_PLANE].sum() == 64
+    assert planes[1, features.CASTLING_PLANES].sum() == 0
+
+
+def test_writes_into_caller_buffer():
+    out = np.full((5, features.PLANES, 8, 8), 7, dtype=np.uint8)
+    filled = features.featurize(iter([utils.STARTING_FEN] * 3), out=out, chunk_size=2)
+    assert filled.base is out or filled.base is out.base
+    assert len(filled) == 3 and set(np.unique(out[:3])) <= {0, 1}
+    assert (out[3:] == 7).all()
+    with pytest.raises(ValueError):
+        features.featurize([utils.STARTING_FEN] * 6, out=out)
+    with pytest.raises(ValueError):
+        features.featurize([utils.STARTING_FEN], out=np.zeros((1, 12, 8, 8)))
+
+
+def test_memory_mapped_file(tmp_path):
+    path = tmp_path / "features.npy"
+    fens = [perft.PERFT_POSITIONS[name]["fen"] for name in perft.PERFT_POSITIONS]
+    features.featurize_to_file(path, fens, count=len(fens), chunk_size=2)
+    loaded = np.load(path, mmap_mode="r")
+    assert loaded.dtype == np.uint8
+    assert (loaded == features.featurize(fens, dtype=np.uint8)).all()
+
+
+def test_invalid_fen():
+    with pytest.raises(InvalidFenError):
+        features.featurize(["rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNX w KQkq - 0 1"])
+    with pytest.raises(InvalidFenError):
+        features.featurize(["8/8/8/8/8/8/8/8"])
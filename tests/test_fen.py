@@ -0,0 +1,66 @@
+import pytest
+
+from chess import perft
+from chess.models.exceptions import InvalidFenError
+from chess.models.position import Position
+from chess.models import utils, zobrist
+
+
+@pytest.mark.parametrize("name", perft.PERFT_POSITIONS.keys())
+def test_fen_round_trip(name):
+    fen = perft.PERFT_POSITIONS[name]["fen"]
+    assert Position.from_fen(fen).to_fen() == fen
+
+
+def test_starting_fen_matches_starting_position():
+    from_fen = Position.from_fen(utils.STARTING_FEN)
+    from_list = Position(utils.starting_position(), whose_move="white")
+    assert from_fen.zobrist_key == from_list.zobrist_key
+    assert from_list.to_fen() == utils.STARTING_FEN
+
+
+def test_short_fen_defaults_move_counters():
+    position = Position.from_fen("8/8/8/8/8/8/8/K6k b - -")
+    assert position.whose_move == "black"
+    assert (position.halfmove_clock, position.fullmove_number) == (0, 1)
+    assert not any(position.castling_rights.values())
+
+
+def test_en_passant_square():
+    fen = "rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3"
+    position = Position.from_fen(fen)
+    assert position.en_passant_target is position.piece("f5")
+    assert position.zobrist_key == zobrist.compute_key(position)
+    assert "exf6" in {move.compute_base_notation() for move in position.legal_moves_for(position.piece("e5"))}
+    assert position.to_fen() == fen
+
+
+def test_move_counters_follow_moves():
+    position = Position.from_fen(utils.STARTING_FEN)
+    for notation in ["Nf3", "Nf6", "Ng1"]:
+        position.push(notation)
+    assert position.to_fen() == "rnbqkb1r/pppppppp/5n2/8/8/8/PPPPPPPP/RNBQKBNR b KQkq - 3 2"
+    position.push("e5")
+    assert (position.halfmove_clock, position.fullmove_number) == (0, 3)
+    position.pop()
+    assert (position.halfmove_clock, position.fullmove_number) == (3, 2)
+
+    position = Position.from_fen(utils.STARTING_FEN)
+    position.compute_legal_moves()
+    new_position, _ = position.make_move("e4")
+    assert new_position.to_fen() == "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1"
+
+
+@pytest.mark.parametrize("fen", [
+    "",
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP w KQkq - 0 1",
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNX w KQkq - 0 1",
+    "rnbqkbnr/pppppppp/9/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR x KQkq - 0 1",
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkz - 0 1",
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq e6 0 1",
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - zero 1",
+])
+def test_invalid_fen(fen):
+    with pytest.raises(InvalidFenError):
+        Position.from_fen(fen)
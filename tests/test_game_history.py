@@ -0,0 +1,99 @@
+import pytest
+
+from chess import memory
+from chess.models.game import Game
+from chess.models.position import Position
+from chess.models import utils
+
+OPENING = ["e4", "c5", "Nf3", "d6", "d4", "cxd4", "Nxd4", "Nf6", "Nc3", "a6", "Be3", "e5", "Nb3", "Be6", "f3", "Be7",
+           "Qd2", "O-O", "O-O-O", "Nbd7", "g4", "b5", "g5", "b4", "Ne2", "Ne8", "f4", "a5", "f5", "a4", "Nbd4", "exd4",
+           "Nxd4", "b3", "Kb1", "bxc2+", "Nxc2"]
+
+
+@pytest.fixture
+def game(capsys):
+    game = Game()
+    for notation in OPENING:
+        assert game.apply_move(notation)
+    capsys.readouterr()
+    return game
+
+
+def reference_fens() -> list[str]:
+    position = Position(utils.starting_position(), whose_move="white")
+    fens = [position.to_fen()]
+    for notation in OPENING:
+        position.push(notation)
+        fens.append(position.to_fen())
+    return fens
+
+
+def test_history_is_stored_as_codes_and_checkpoints(game):
+    assert len(game.move_codes) == len(OPENING)
+    assert game.move_codes.codes.itemsize == 2
+    assert len(game.checkpoints) == len(OPENING) // Game.CHECKPOINT_INTERVAL + 1
+    assert [move.full_notation for move in game.moves_history] == OPENING
+    assert all(record.legal_moves is None for record in game.current_position.undo_stack)
+
+
+def test_position_at_rebuilds_any_ply(game):
+    fens = reference_fens()
+    for ply in range(len(OPENING) + 1):
+        assert game.position_at(ply).to_fen() == fens[ply]
+    assert [position.to_fen() for position in game.positions_history] == fens
+    with pytest.raises(IndexError):
+        game.position_at(len(OPENING) + 1)
+
+
+def test_take_back(game, capsys):
+    fens = reference_fens()
+    for ply in range(len(OPENING), 0, -1):
+        assert game.current_position.to_fen() == fens[ply]
+        assert game.take_back().full_notation == OPENING[ply - 1]
+        assert len(game.checkpoints) == (ply - 1) // Game.CHECKPOINT_INTERVAL + 1
+    assert game.current_position.to_fen() == fens[0]
+    with pytest.raises(IndexError):
+        game.take_back()
+    # The game can go on after takebacks
+    assert game.apply_move("d4")
+    assert game.position_at(1).to_fen() == game.current_position.to_fen()
+
+
+def test_take_back_after_checkmate(capsys):
+    game = Game()
+    for notation in ["f3", "e5", "g4", "Qh4"]:
+        game.apply_move(notation)
+    assert game.result and game.moves_history[-1].full_notation == "Qh4#"
+    game.take_back()
+    assert game.result is None
+    assert game.apply_move("Nc6")
+
+
+def test_illegal_moves_are_rejected(capsys):
+    game = Game()
+    other = Position(utils.starting_position(), whose_move="white")
+    assert not game.apply_move(other.move_from_notation("e4"))
+    assert not game.apply_move("e5")
+    assert len(game.move_codes) == 0
+
+
+def test_moves_of_earlier_plies(capsys):
+    game = Game()
+    for notation in ["Nf3", "Nf6", "Ng1", "Ng8"]:
+        assert game.apply_move(notation)
+    knight_move = game.moves_history[0]
+    # Back on g1 the knight can play the same move again, a new move object being recorded
+    assert game.apply_move(knight_move)
+    assert game.moves_history[-1] is not knight_move
+    assert knight_move.full_notation == "Nf3"
+    assert game.apply_move("e5")
+    pawn_move = game.moves_history[-1]
+    assert game.apply_move("Ng1") and game.apply_move("Nc6")
+    # The pawn is no longer on e7
+    assert not game.apply_move(pawn_move)
+    assert len(game.move_codes) == 8
+
+
+def test_game_memory_does_not_grow_with_positions():
+    game = memory.play_random_game(100, seed=0)
+    assert memory.deep_size(game) < 3 * memory.deep_size(game.position_at(0))
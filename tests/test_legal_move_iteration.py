@@ -0,0 +1,58 @@
+from chess import perft
+from chess.models.game import Game
+from chess.models.position import Position
+from chess.models import utils
+
+
+def test_iter_legal_moves_matches_compute_legal_moves():
+    position = perft.build_position("kiwipete")
+    iterated_moves = list(position.iter_legal_moves())
+    assert position.legal_moves_ is not None
+    assert len(iterated_moves) == 48
+    assert set(iterated_moves) == {move for moves in position.compute_legal_moves().values() for move in moves}
+
+
+def test_early_exit_does_not_store_partial_moves():
+    position = Position(utils.starting_position(), whose_move="black")
+    assert position.has_legal_move()
+    assert position.legal_moves_ is None
+    moves = position.iter_legal_moves()
+    next(moves)
+    moves.close()
+    assert position.legal_moves_ is None
+
+
+def test_has_legal_move_in_checkmate_and_stalemate():
+    checkmate = Position([["white", "King", "h1"], ["white", "Pawn", "g2"], ["white", "Pawn", "h2"],
+                          ["black", "King", "h8"], ["black", "Rook", "a1"]], whose_move="white")
+    assert not checkmate.has_legal_move()
+    stalemate = Position([["white", "King", "h1"], ["black", "King", "f2"], ["black", "Queen", "g3"]], whose_move="white")
+    assert not stalemate.has_legal_move()
+    assert not stalemate.king_in_check(stalemate.piece("h1"))
+
+
+def test_game_detects_checkmate():
+    game = Game()
+    for notation in ["f3", "e5", "g4", "Qh4"]:
+        assert game.apply_move(notation)
+    assert game.result == "Checkmate ! Black won."
+    assert game.moves_history[-1].full_notation == "Qh4#"
+
+
+def test_move_from_notation_stops_at_matching_move():
+    position = Position(utils.starting_position(), whose_move="white")
+    move = position.move_from_notation("Nf3")
+    assert (move.start_square.name, move.end_square.name) == ("g1", "f3")
+
+
+def test_invalid_position_has_no_moves_from_any_entry_point():
+    # The side not to move is in check
+    fen = "4k3/4R3/8/8/8/8/8/4K3 w - - 0 1"
+    assert list(Position.from_fen(fen).iter_legal_moves()) == []
+    assert not Position.from_fen(fen).has_legal_move()
+    assert len(Position.from_fen(fen).encoded_legal_moves()) == 0
+    position = Position.from_fen(fen)
+    assert position.legal_moves_for(position.piece("e7")) == set()
+    assert position.compute_legal_moves() == {}
+    # No king at all
+    assert not Position.from_fen("8/8/8/8/8/8/8/4K3 w - - 0 1").has_legal_move()
@@ -18,3 +18,10 @@ def test_simple_move():
     assert new_position.piece("e8").color == "black"
     assert new_position.piece("e8").type == "King"
 
+
+
+def test_child_castling_rights_are_not_shared():
+    position = Position.from_fen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1")
+    new_position, _ = position.make_move("e4")
+    new_position.castling_rights["white_kingside"] = False
+    assert position.castling_rights["white_kingside"]
@@ -0,0 +1,33 @@
+from chess import memory
+from chess.models.directions import Direction
+from chess.models.game import Game
+from chess.models.position import Position
+from chess.models import utils
+
+
+def test_model_objects_have_no_instance_dict():
+    position = Position(utils.starting_position(), whose_move="white")
+    position.compute_legal_moves()
+    move = next(iter(position.legal_moves_for(position.piece("e2"))))
+    objects = [position, position.square("e2"), move, Direction(1, 0), Game()]
+    objects += [next(iter(pieces)) for pieces in position.pieces["white"].values()]
+    for obj in objects:
+        assert not hasattr(obj, "__dict__"), type(obj).__name__
+
+
+def test_pieces_do_not_hold_image_paths():
+    position = Position(utils.starting_position(), whose_move="white")
+    assert not hasattr(position.piece("e1"), "image_path")
+
+
+def test_deep_size_counts_shared_objects_once():
+    position = Position(utils.starting_position(), whose_move="white")
+    single = memory.deep_size(position)
+    assert 0 < single < 40_000
+    assert memory.deep_size([position, position]) < single + 200
+
+
+def test_random_game_length():
+    game = memory.play_random_game(20, seed=1)
+    assert len(game.moves_history) == 20
+    assert memory.deep_size(game) > memory.deep_size(game.current_position)
@@ -0,0 +1,35 @@
+import pytest
+
+from chess import perft
+from chess.models.position import Position
+
+
+@pytest.mark.parametrize("name", perft.PERFT_POSITIONS.keys())
+@pytest.mark.parametrize("language", ["English", "French"])
+def test_batch_matches_single_move_notation(name, language):
+    position = perft.build_position(name)
+    notations = position.legal_move_notations(language)
+    assert len(notations) == sum(len(moves) for moves in position.legal_moves_.values())
+    for move, notation in notations:
+        assert notation == move.compute_base_notation(language)
+
+
+def test_suffixes_are_lazy():
+    position = Position.from_fen("6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1")
+    position.legal_move_notations()
+    assert all(move.is_check is None for moves in position.legal_moves_.values() for move in moves)
+
+    notations = dict((notation, move) for move, notation in position.legal_move_notations(with_suffixes=True))
+    assert "Ra8#" in notations and "Ra7" in notations
+    assert notations["Ra8#"].gives_check() and notations["Ra8#"].gives_checkmate()
+    assert not notations["Ra7"].gives_check()
+
+
+def test_check_detection_leaves_position_unchanged():
+    position = perft.build_position("position_3")
+    fen, key = position.to_fen(), position.zobrist_key
+    checks = {notation for move, notation in position.legal_move_notations(with_suffixes=True) if move.gives_check()}
+    # Known perft statistics : 2 checks at depth 1
+    assert checks == {"Rxf4+", "g3+"}
+    assert position.to_fen() == fen and position.zobrist_key == key
+    assert position.undo_stack == []
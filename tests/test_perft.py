@@ -0,0 +1,25 @@
+import pytest
+
+from chess import perft
+
+# Depths kept shallow so the whole suite stays fast, deeper counts are checked with python -m chess.perft
+SHALLOW_DEPTHS = {"start": 3, "kiwipete": 2, "position_3": 3, "position_4": 3, "position_5": 2}
+
+
+@pytest.mark.parametrize("name", list(perft.PERFT_POSITIONS))
+def test_perft_reference_counts(name):
+    expected = perft.PERFT_POSITIONS[name]["expected"]
+    for depth in range(1, SHALLOW_DEPTHS[name] + 1):
+        assert perft.perft(perft.build_position(name), depth) == expected[depth - 1]
+
+
+def test_divide_sums_to_perft():
+    breakdown = perft.divide(perft.build_position("start"), 2)
+    assert len(breakdown) == 20
+    assert breakdown["e2e4"] == 20
+    assert sum(breakdown.values()) == 400
+
+
+def test_main_reports_node_count(capsys):
+    assert perft.main(["1", "--position", "position_3"]) == 0
+    assert "14 nodes" in capsys.readouterr().out
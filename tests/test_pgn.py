@@ -0,0 +1,99 @@
+import io
+
+from chess import pgn
+
+OPERA_GAME = """[Event "Paris"]
+[White "Morphy, Paul"]
+[Black "Duke Karl / Count Isouard"]
+[Result "1-0"]
+
+1. e4 e5 2. Nf3 d6 3. d4 Bg4 {This is a weak move} 4. dxe5 Bxf3 5. Qxf3 dxe5
+6. Bc4 Nf6 7. Qb3 Qe7 8. Nc3 (8. Qxb7 Qb4+) c6 9. Bg5 b5 $6 10. Nxb5! cxb5
+11. Bxb5+ Nbd7 12. O-O-O Rd8 13. Rxd7 Rxd7 14. Rd1 Qe6 15. Bxd7+ Nxd7
+16. Qb8+ Nxb8 17. Rd8# 1-0
+"""
+
+ILLEGAL_GAME = """[White "A"]
+[Black "B"]
+[Result "*"]
+
+1. e4 e5 2. Ke3 *
+"""
+
+FEN_GAME = """[SetUp "1"]
+[FEN "rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3"]
+
+3. exf6 exf6 4. Qh5+ g6 *
+"""
+
+
+def test_read_games_splits_headers_and_moves():
+    games = list(pgn.read_games(io.StringIO(OPERA_GAME + "\n" + ILLEGAL_GAME)))
+    assert len(games) == 2
+    opera, illegal = games
+    assert opera.headers["White"] == "Morphy, Paul"
+    assert opera.result == "1-0"
+    assert len(opera.moves) == 33
+    assert opera.moves[:3] == ["e4", "e5", "Nf3"]
+    # Variation, comment and NAG are not part of the main line
+    assert "Qxb7" not in opera.moves and "Qb4+" not in opera.moves
+    assert opera.moves[-1] == "Rd8#"
+    assert illegal.moves == ["e4", "e5", "Ke3"]
+
+
+def test_validate_pgn_reports_failed_ply():
+    results = list(pgn.validate_pgn(io.StringIO(OPERA_GAME + ILLEGAL_GAME)))
+    assert [result.index for result in results] == [0, 1]
+    opera, illegal = results
+    assert opera.is_valid and opera.plies == 33
+    assert opera.final_fen.startswith("1n1Rkb1r/p4ppp/4q3/4p1B1/4P3/8/PPP2PPP/2K5 b k")
+    assert not illegal.is_valid
+    assert illegal.failed_ply == 3 and illegal.plies == 2
+    assert "Ke3" in illegal.error
+
+
+def test_validate_game_from_fen_header():
+    result = next(pgn.validate_pgn(io.StringIO(FEN_GAME)))
+    assert result.is_valid and result.plies == 4
+
+
+def test_invalid_fen_header_fails_at_ply_zero():
+    result = next(pgn.validate_pgn(io.StringIO('[FEN "not a fen"]\n\n1. e4 *\n')))
+    assert not result.is_valid and result.failed_ply == 0
+
+
+def test_read_games_from_file(tmp_path):
+    path = tmp_path / "games.pgn"
+    path.write_text(OPERA_GAME * 3, encoding="utf-8")
+    assert [result.is_valid for result in pgn.validate_pgn(path)] == [True, True, True]
+
+
+def test_normalize_san():
+    assert pgn.normalize_san("Nxb5!") == "Nxb5"
+    assert pgn.normalize_san("0-0-0?!") == "O-O-O"
+    assert pgn.normalize_san("0-0+") == "O-O+"
+
+
+def test_parallel_validation_keeps_input_order():
+    games = list(pgn.read_games(io.StringIO((OPERA_GAME + ILLEGAL_GAME) * 5)))
+    sequential = [(result.index, result.is_valid, result.failed_ply) for result in pgn.validate_games(games)]
+    parallel = [(result.index, result.is_valid, result.failed_ply)
+                for result in pgn.validate_games_parallel(games, workers=2, chunk_size=3)]
+    assert parallel == sequential
+    assert [index for index, _, _ in parallel] == list(range(10))
+
+
+def test_validation_stats():
+    stats = pgn.ValidationStats()
+    for result in pgn.validate_pgn(io.StringIO(OPERA_GAME + ILLEGAL_GAME)):
+        stats.add(result)
+    assert (stats.games, stats.invalid_games, stats.plies) == (2, 1, 35)
+    assert "2 games (1 invalid), 35 plies" in str(stats)
+
+
+def test_cli_exit_code(tmp_path, capsys):
+    path = tmp_path / "games.pgn"
+    path.write_text(OPERA_GAME + ILLEGAL_GAME, encoding="utf-8")
+    assert pgn.main([str(path), "-j", "1"]) == 1
+    output = capsys.readouterr().out
+    assert "game #2 (A - B): invalid at ply 3" in output
@@ -0,0 +1,76 @@
+import pytest
+
+from chess import perft
+from chess.models.position import Position
+from chess.models import utils
+
+
+def snapshot(position):
+    return ({piece.square.name: (piece.color, piece.type, piece) for piece in position.all_pieces},
+            position.whose_move, position.castling_rights.copy(), position.en_passant_target)
+
+
+def test_push_moves_pieces_in_place():
+    position = Position(utils.starting_position(), whose_move="white")
+    knight = position.piece("g1")
+    move = position.push("Nf3")
+    assert move.piece is knight
+    assert position.piece("f3") is knight
+    assert position.square("g1").piece is None
+    assert knight in position.pieces["white"]["Knight"]
+    assert position.whose_move == "black"
+
+
+def test_pop_restores_position():
+    position = Position(utils.starting_position(), whose_move="white")
+    before = snapshot(position)
+    for notation in ["e4", "d5", "exd5", "Qxd5"]:
+        position.push(notation)
+    for _ in range(4):
+        position.pop()
+    assert snapshot(position) == before
+    assert not position.undo_stack
+
+
+def test_push_pop_special_moves():
+    position = Position([["white", "King", "e1"], ["white", "Rook", "h1"], ["white", "Pawn", "b7"], ["white", "Pawn", "e5"],
+                         ["black", "King", "e8"], ["black", "Rook", "a8"], ["black", "Pawn", "d7"]],
+                        whose_move="black",
+                        castling_rights={"white_kingside": True, "white_queenside": False, "black_kingside": False, "black_queenside": False})
+    before = snapshot(position)
+    position.push("d5")
+    assert position.en_passant_target is position.piece("d5")
+    position.push("exd6")
+    assert position.piece("d5") is None
+    assert position.piece("d6").type == "Pawn"
+    position.push("Kf7")
+    position.push("bxa8=Q")
+    assert position.piece("a8").type == "Queen"
+    assert not position.pieces["black"]["Rook"]
+    position.push("Kg6")
+    position.push("O-O")
+    assert position.piece("g1").type == "King"
+    assert position.piece("f1").type == "Rook"
+    assert not position.castling_rights["white_kingside"]
+    for _ in range(6):
+        position.pop()
+    assert snapshot(position) == before
+
+
+def test_push_rejects_illegal_move():
+    position = Position(utils.starting_position(), whose_move="white")
+    other_position = Position(utils.starting_position(), whose_move="white")
+    other_position.compute_legal_moves()
+    move = next(iter(other_position.legal_moves_[other_position.piece("g1")]))
+    with pytest.raises(AssertionError):
+        position.push(move)
+    with pytest.raises(ValueError):
+        position.push("Nf6")
+
+
+@pytest.mark.parametrize("name", list(perft.PERFT_POSITIONS))
+def test_push_perft_reference_counts(name):
+    position = perft.build_position(name)
+    before = snapshot(position)
+    assert perft.push_perft(position, 2) == perft.PERFT_POSITIONS[name]["expected"][1]
+    assert snapshot(position) == before
@@ -0,0 +1,58 @@
+import pytest
+
+from chess import perft
+from chess.models.position import Position
+from chess.models import utils
+
+
+@pytest.mark.parametrize("name", perft.PERFT_POSITIONS.keys())
+@pytest.mark.parametrize("language", ["English", "French"])
+def test_index_matches_move_notation(name, language):
+    position = perft.build_position(name)
+    index = position.san_index(language)
+    moves = [move for moves in position.compute_legal_moves().values() for move in moves]
+    for move in moves:
+        assert index[move.compute_base_notation(language)] is move
+    assert set(index.values()) == set(moves)
+
+
+def test_index_is_built_once_per_language():
+    position = Position(utils.starting_position(), whose_move="white")
+    assert position.san_index() is position.san_index("English")
+    assert position.san_index("French") is not position.san_index()
+    assert "Cf3" in position.san_index("French") and "Nf3" in position.san_index()
+
+
+def test_index_follows_push_and_pop():
+    position = Position(utils.starting_position(), whose_move="white")
+    before = position.san_index()
+    position.push("e4")
+    assert "e5" in position.san_index() and "e4" not in position.san_index()
+    position.pop()
+    assert "e4" in position.san_index()
+    assert position.san_index() is not before
+
+
+def test_tolerated_notations():
+    position = perft.build_position("kiwipete")
+    # Check, mate and annotation signs are ignored
+    assert position.move_from_notation("Qxf6!") is position.move_from_notation("Qxf6+")
+    assert position.move_from_notation("Nxf7#").piece is position.piece("e5")
+    assert position.move_from_notation("0-0") is position.move_from_notation("O-O")
+    # Over disambiguated notations point to the same move
+    assert position.move_from_notation("Rhf1") is position.move_from_notation("Rf1")
+    assert position.move_from_notation("Rh1f1") is position.move_from_notation("Rf1")
+
+
+def test_ambiguous_notation_is_rejected():
+    position = Position.from_fen("4k3/8/8/8/8/8/8/1N2KN2 w - - 0 1")
+    assert position.move_from_notation("Nbd2") is not position.move_from_notation("Nfd2")
+    with pytest.raises(ValueError):
+        position.move_from_notation("Nd2")
+    assert position.move_from_notation("Na3").piece is position.piece("b1")
+
+
+def test_promotion_without_equal_sign():
+    position = Position.from_fen("4k3/P7/8/8/8/8/8/4K3 w - - 0 1")
+    assert position.move_from_notation("a8Q") is position.move_from_notation("a8=Q")
+    assert position.move_from_notation("a8=N").promoting_piece_str == "Knight"
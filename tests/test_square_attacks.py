@@ -0,0 +1,26 @@
+import pytest
+
+from chess import perft
+from chess.models.position import Position
+
+
+@pytest.mark.parametrize("name", list(perft.PERFT_POSITIONS))
+def test_is_square_attacked_matches_controlled_squares(name):
+    position = perft.build_position(name)
+    for color in ["white", "black"]:
+        controlled_squares = position._controlled_squares(color)
+        for square in position.squares:
+            assert position.is_square_attacked(square, color) == (square in controlled_squares), f"{square.name} by {color}"
+
+
+def test_attack_probes():
+    position = Position([["white", "King", "e1"], ["white", "Pawn", "d4"], ["black", "King", "e8"],
+                         ["black", "Rook", "a4"], ["black", "Knight", "f3"]], whose_move="white")
+    assert position.is_square_attacked("e5", "white")
+    assert not position.is_square_attacked("d5", "white")
+    assert position.is_square_attacked("e1", "black")
+    assert position.king_in_check(position.piece("e1"))
+    # The d4 pawn blocks the rook line
+    assert position.is_square_attacked("c4", "black")
+    assert position.is_square_attacked("d4", "black")
+    assert not position.is_square_attacked("e4", "black")
@@ -0,0 +1,118 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from chess import engine, retrograde, tablebase
+from chess.models.position import Position
+
+PIECE_LETTERS = {"KQK": "Q", "KRK": "R", "KPK": "P"}
+
+
+@pytest.fixture(scope="module")
+def directory(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("tables")
+    retrograde.generate_tables(directory)
+    return directory
+
+
+@pytest.fixture
+def tables(directory):
+    with tablebase.Tablebase(directory) as tables:
+        yield tables
+
+
+def _fen(pieces: dict[int, str], whose_move: str) -> str:
+    ranks = []
+    for row in range(7, -1, -1):
+        rank, empty = "", 0
+        for column in range(8):
+            letter = pieces.get(row * 8 + column)
+            if letter:
+                rank += (str(empty) if empty else "") + letter
+                empty = 0
+            else:
+                empty += 1
+        ranks.append(rank + (str(empty) if empty else ""))
+    return f"{'/'.join(ranks)} {whose_move} - - 0 1"
+
+
+def _expected(position: Position, tables: tablebase.Tablebase) -> tablebase.ProbeResult:
+    # Value of a position from the probes of the positions its legal moves lead to, through Position's own rules
+    moves = [move for moves in position.compute_legal_moves().values() for move in moves]
+    if not moves:
+        in_check = position.king_in_check(next(iter(position.pieces[position.whose_move]["King"])))
+        return tablebase.ProbeResult("loss", 0) if in_check else tablebase.ProbeResult("draw", None)
+    replies = []
+    for move in moves:
+        position.push(move)
+        # Out of the tables : bare kings or a single minor piece after a capture or an underpromotion
+        replies.append(tables.probe(position) or tablebase.ProbeResult("draw", None))
+        position.pop()
+    losses = [reply.plies for reply in replies if reply.result == "loss"]
+    if losses:
+        return tablebase.ProbeResult("win", min(losses) + 1)
+    if all(reply.result == "win" for reply in replies):
+        return tablebase.ProbeResult("loss", max(reply.plies for reply in replies) + 1)
+    return tablebase.ProbeResult("draw", None)
+
+
+def test_longest_mates(directory):
+    # Known longest mates : 10 moves for KQK, 16 for KRK and 28 for KPK, the strong side to move
+    for name, plies in (("KQK", 19), ("KRK", 31), ("KPK", 55)):
+        values = np.asarray(retrograde.load_table(directory, name))
+        distances = values[(values != tablebase.DRAW) & (values != tablebase.INVALID)].astype(np.int64) - 1
+        assert distances[distances % 2 == 1].max() == plies
+        assert distances.max() == plies + 1
+
+
+@pytest.mark.parametrize("name", tablebase.MATERIALS.keys())
+def test_values_follow_position_rules(name, tables):
+    generator = random.Random(name)
+    checked = 0
+    while checked < 60:
+        squares = generator.sample(range(64), 3)
+        pieces = dict(zip(squares, ("K", PIECE_LETTERS[name], "k")))
+        position = Position.from_fen(_fen(pieces, generator.choice("wb")))
+        probe = tables.probe(position)
+        if probe is None:
+            assert not position.is_valid_position()
+            continue
+        assert probe == _expected(position, tables)
+        checked += 1
+
+
+def test_black_strong_side_is_flipped(tables):
+    white = Position.from_fen("8/8/8/4k3/8/8/3PK3/8 w - - 0 1")
+    black = Position.from_fen("8/3pk3/8/8/4K3/8/8/8 b - - 0 1")
+    assert tables.probe(white) == tables.probe(black)
+    assert tables.probe(white).result == "win"
+
+
+def test_known_positions(tables):
+    assert tables.probe(Position.from_fen("7k/6Q1/6K1/8/8/8/8/8 b - - 0 1")) == tablebase.ProbeResult("loss", 0)
+    assert tables.probe(Position.from_fen("7k/8/6QK/8/8/8/8/8 b - - 0 1")) == tablebase.ProbeResult("draw", None)
+    # The king on the sixth rank in front of its pawn wins whoever is to move, not with a rook pawn
+    assert tables.probe(Position.from_fen("4k3/8/4K3/4P3/8/8/8/8 w - - 0 1")).result == "win"
+    assert tables.probe(Position.from_fen("4k3/8/4K3/4P3/8/8/8/8 b - - 0 1")).result == "loss"
+    assert tables.probe(Position.from_fen("k7/8/K7/P7/8/8/8/8 w - - 0 1")).result == "draw"
+    assert tables.probe(Position.from_fen("4k3/4P3/4K3/8/8/8/8/8 b - - 0 1")) == tablebase.ProbeResult("draw", None)
+    # Not covered
+    assert tables.probe(Position.from_fen("4k3/8/8/8/8/8/8/4K2R w K - 0 1")) is None
+    assert tables.probe(Position.from_fen("4k3/8/8/8/8/8/8/3BK3 w - - 0 1")) is None
+
+
+def test_rejects_foreign_file(tmp_path):
+    tablebase.table_path(tmp_path, "KQK").write_bytes(bytes(64))
+    with pytest.raises(ValueError):
+        tablebase.Tablebase(tmp_path)
+
+
+def test_engine_uses_tables(tables):
+    position = Position.from_fen("8/8/8/8/8/2k5/8/K6R w - - 0 1")
+    probe = tables.probe(position)
+    result = engine.Engine(tablebase=tables).search(position, max_depth=2)
+    assert result.score == engine.MATE_SCORE - probe.plies
+    position.push(result.move)
+    assert tables.probe(position) == tablebase.ProbeResult("loss", probe.plies - 1)
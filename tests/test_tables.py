@@ -0,0 +1,35 @@
+from chess.models import tables
+from chess.models.directions import Direction
+from chess.models.position import Position
+
+
+def names(position, indices):
+    return {position.squares[index].name for index in indices}
+
+
+def test_square_indices():
+    position = Position([])
+    assert position.squares[0].name == "a1"
+    assert position.squares[63].name == "h8"
+    assert all(square.index == index for index, square in enumerate(position.squares))
+
+
+def test_step_tables():
+    position = Position([])
+    assert names(position, tables.KNIGHT_TARGETS[position.square("a1").index]) == {"b3", "c2"}
+    assert names(position, tables.KING_TARGETS[position.square("h8").index]) == {"g8", "g7", "h7"}
+    assert names(position, tables.PAWN_ATTACKS["white"][position.square("a2").index]) == {"b3"}
+    assert names(position, tables.PAWN_ATTACKS["black"][position.square("e7").index]) == {"d6", "f6"}
+    assert tables.PAWN_PUSHES["white"][position.square("e8").index] is None
+
+
+def test_rays_are_ordered_from_the_closest_square():
+    position = Position([])
+    ray = tables.RAYS[position.square("c3").index][Direction(1, 1)]
+    assert [position.squares[index].name for index in ray] == ["d4", "e5", "f6", "g7", "h8"]
+    assert len(tables.LINE_RAYS[position.square("a1").index]) == 3
+
+
+def test_direction_sets_are_shared():
+    assert Direction.diagonals() is Direction.diagonals()
+    assert Direction.lines() == Direction.diagonals() | Direction.straights()
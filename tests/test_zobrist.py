@@ -0,0 +1,51 @@
+import pytest
+
+from chess import perft
+from chess.models.position import Position
+from chess.models import utils, zobrist
+
+
+def play(position, notations):
+    for notation in notations:
+        position.compute_legal_moves()
+        position = position.make_move(notation)[0]
+    return position
+
+
+def test_transpositions_share_key():
+    first = play(Position(utils.starting_position(), whose_move="white"), ["Nf3", "Nf6", "Nc3"])
+    second = play(Position(utils.starting_position(), whose_move="white"), ["Nc3", "Nf6", "Nf3"])
+    assert first.zobrist_key == second.zobrist_key
+    assert first.zobrist_key != play(first, ["Nc6"]).zobrist_key
+
+
+def test_side_to_move_castling_and_en_passant_change_key():
+    white = Position(utils.starting_position(), whose_move="white")
+    black = Position(utils.starting_position(), whose_move="black")
+    assert white.zobrist_key != black.zobrist_key
+    no_castling = Position(utils.starting_position(), whose_move="white",
+                           castling_rights={"white_kingside": False, "white_queenside": True, "black_kingside": True, "black_queenside": True})
+    assert no_castling.zobrist_key != white.zobrist_key
+
+    # The en passant target is only hashed when a capture is possible
+    capturable = play(white, ["e4", "a6", "e5", "d5"])
+    assert zobrist.en_passant_key(capturable)
+    same_board = Position(capturable.pieces, whose_move="white", castling_rights=capturable.castling_rights)
+    assert capturable.zobrist_key == same_board.zobrist_key ^ zobrist.en_passant_key(capturable)
+    not_capturable = play(white, ["e4"])
+    assert not_capturable.en_passant_target and not zobrist.en_passant_key(not_capturable)
+
+
+@pytest.mark.parametrize("name", list(perft.PERFT_POSITIONS))
+def test_incremental_key_matches_full_computation(name):
+    position = perft.build_position(name)
+    root_key = position.zobrist_key
+    assert root_key == zobrist.compute_key(position)
+    position.compute_legal_moves()
+    for moves in list(position.legal_moves_.values()):
+        for move in moves:
+            child_position = position.make_move(move)[0]
+            position.push(move)
+            assert position.zobrist_key == zobrist.compute_key(position) == child_position.zobrist_key
+            position.pop()
+            assert position.zobrist_key == root_key